@@ -1,3 +1,4 @@
+-- Serial version of `manage.py update_aggregates`; see `webservices/common/incremental.py`
 create or replace function update_aggregates() returns void as $$
 begin
     -- Update Schedule A aggregates in place
@@ -18,10 +19,16 @@ begin
     perform ofec_sched_b_update();
     perform ofec_sched_e_update();
 
+    -- Recompute totals and reports for changed committees and cycles
+    perform ofec_totals_reports_update();
+
     -- Clear queue tables
     delete from ofec_sched_a_queue_new;
     delete from ofec_sched_a_queue_old;
     delete from ofec_sched_b_queue_new;
     delete from ofec_sched_b_queue_old;
+    delete from ofec_sched_e_queue_new;
+    delete from ofec_sched_e_queue_old;
+    delete from ofec_totals_reports_queue;
 end
 $$ language plpgsql;
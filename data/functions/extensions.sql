@@ -0,0 +1,2 @@
+-- Trigram matching for fuzzy name searches; see `utils.search_name`
+create extension if not exists pg_trgm;
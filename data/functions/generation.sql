@@ -0,0 +1,20 @@
+-- Track the generation of derived data. API workers compare the generation to
+-- their cached value and flush in-process caches when it changes.
+create table if not exists ofec_refresh_generation (
+    generation int not null,
+    refreshed_at timestamp with time zone not null default now()
+);
+
+insert into ofec_refresh_generation (generation)
+select 0
+where not exists (select 1 from ofec_refresh_generation)
+;
+
+create or replace function bump_refresh_generation() returns int as $$
+    update ofec_refresh_generation
+    set
+        generation = generation + 1,
+        refreshed_at = now()
+    returning generation
+    ;
+$$ language sql;
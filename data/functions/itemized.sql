@@ -0,0 +1,49 @@
+-- Rename table `source` to `target`, along with any partitions inheriting
+-- from it; partitions are named `<parent>_<cycle>`
+create or replace function rename_partitioned(source text, target text) returns void as $$
+declare
+    child text;
+begin
+    for child in
+        select child_class.relname
+        from pg_inherits
+        join pg_class child_class on pg_inherits.inhrelid = child_class.oid
+        join pg_class parent_class on pg_inherits.inhparent = parent_class.oid
+        where parent_class.relname = source
+    loop
+        execute format(
+            'alter table %I rename to %I',
+            child, target || substr(child, length(source) + 1)
+        );
+    end loop;
+    execute format('alter table %I rename to %I', source, target);
+end
+$$ language plpgsql;
+
+-- Swap table `name` for its fully built `<name>_shadow` table, keeping the
+-- replaced table as `<name>_previous` for `rollback_shadow_table`
+create or replace function swap_shadow_table(name text) returns void as $$
+begin
+    if not exists (select 1 from pg_tables where tablename = name || '_shadow') then
+        raise exception 'No shadow table for %', name;
+    end if;
+    execute format('drop table if exists %I cascade', name || '_previous');
+    if exists (select 1 from pg_tables where tablename = name) then
+        perform rename_partitioned(name, name || '_previous');
+    end if;
+    perform rename_partitioned(name || '_shadow', name);
+end
+$$ language plpgsql;
+
+-- Restore the table replaced by the last `swap_shadow_table`; the rolled back
+-- table becomes the shadow table again
+create or replace function rollback_shadow_table(name text) returns void as $$
+begin
+    if not exists (select 1 from pg_tables where tablename = name || '_previous') then
+        raise exception 'No previous table for %', name;
+    end if;
+    execute format('drop table if exists %I cascade', name || '_shadow');
+    perform rename_partitioned(name, name || '_shadow');
+    perform rename_partitioned(name || '_previous', name);
+end
+$$ language plpgsql;
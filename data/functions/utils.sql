@@ -3,3 +3,28 @@ begin
     return year + year % 2;
 end
 $$ language plpgsql;
+
+-- Create view `<name>_vw` from the select statement `body`, along with the
+-- function `<name>_rows(filter_committee_ids text[], filter_cycles numeric[])`,
+-- which returns the rows of the view for the given committees and cycles.
+-- `body` refers to the arguments by name so that it can restrict its sources
+-- before grouping, since filters on the view are not pushed into its CTEs or
+-- aggregates; in the view, both arguments are null and every row is computed.
+create or replace function create_keyed_view(name text, body text) returns void as $$
+begin
+    execute format('drop view if exists %I cascade', name || '_vw');
+    execute format(
+        'create view %I as %s',
+        name || '_vw',
+        replace(
+            replace(body, 'filter_committee_ids', 'null::text[]'),
+            'filter_cycles', 'null::numeric[]'
+        )
+    );
+    execute format(
+        'create function %I(filter_committee_ids text[], filter_cycles numeric[])
+        returns setof %I as %L language sql stable',
+        name || '_rows', name || '_vw', body
+    );
+end
+$$ language plpgsql;
@@ -1,17 +1,40 @@
--- Remove suffix from names of all materialized views (defaults to '_tmp')
--- Note: This assumes that all temporary materialized views share a suffix
+-- Remove suffix from names of all materialized views and of the totals and
+-- reports tables (defaults to '_tmp')
+-- Note: This assumes that all temporary materialized views share a suffix.
+-- Tables are listed explicitly, so that other tables with the suffix, such as
+-- itemized partitions that are still being built, are left alone.
 
 CREATE OR REPLACE FUNCTION rename_temporary_views(schema_arg TEXT DEFAULT 'public', suffix TEXT DEFAULT '_tmp')
 RETURNS INT AS $$
   DECLARE
     view RECORD;
     view_name TEXT;
+    table_name TEXT;
   BEGIN
+    RAISE NOTICE 'Renaming temporary tables in schema %', schema_arg;
+    FOREACH table_name IN ARRAY ARRAY[
+      'ofec_totals_house_senate',
+      'ofec_totals_presidential',
+      'ofec_totals_pacs_parties',
+      'ofec_totals_ie_only',
+      'ofec_reports_house_senate',
+      'ofec_reports_presidential',
+      'ofec_reports_pacs_parties',
+      'ofec_reports_ie_only'
+    ]
+    LOOP
+      CONTINUE WHEN NOT EXISTS (
+        SELECT 1 FROM pg_tables WHERE schemaname = schema_arg AND tablename = table_name || suffix
+      );
+      RAISE NOTICE 'Renaming %.%', schema_arg, table_name || suffix;
+      EXECUTE format('DROP TABLE IF EXISTS %I.%I CASCADE', schema_arg, table_name);
+      EXECUTE format('ALTER TABLE %I.%I RENAME TO %I', schema_arg, table_name || suffix, table_name);
+    END LOOP;
     RAISE NOTICE 'Renaming temporary materialized views in schema %', schema_arg;
-    FOR view IN SELECT matviewname FROM pg_matviews WHERE schemaname = schema_arg AND matviewname LIKE '%' || suffix
+    FOR view IN SELECT matviewname FROM pg_matviews WHERE schemaname = schema_arg AND right(matviewname, length(suffix)) = suffix
     LOOP
       RAISE NOTICE 'Renaming %.%', schema_arg, view.matviewname;
-      view_name := replace(view.matviewname, suffix, '');
+      view_name := left(view.matviewname, length(view.matviewname) - length(suffix));
       EXECUTE 'DROP MATERIALIZED VIEW IF EXISTS ' || schema_arg || '.' || view_name || ' CASCADE';
       EXECUTE 'ALTER MATERIALIZED VIEW ' || schema_arg || '.' || view.matviewname || ' RENAME TO ' || view_name;
     END LOOP;
@@ -0,0 +1,213 @@
+-- Create queue table to hold committees and cycles with changed reports
+drop table if exists ofec_totals_reports_queue;
+create table ofec_totals_reports_queue (
+    form text,
+    committee_id text,
+    cycle numeric
+);
+
+-- Create trigger to maintain queue; the first argument is the form type of the
+-- source table, and the second is the first cycle to track
+create or replace function ofec_totals_reports_update_queue() returns trigger as $$
+declare
+    form text = TG_ARGV[0];
+    start_year int = TG_ARGV[1]::int;
+    committee_key numeric;
+begin
+    if tg_op = 'INSERT' or tg_op = 'UPDATE' then
+        if form = 'F5' then
+            committee_key := new.indv_org_sk;
+        else
+            committee_key := new.cmte_sk;
+        end if;
+        if new.two_yr_period_sk >= start_year then
+            insert into ofec_totals_reports_queue
+            select form, cmte_id, new.two_yr_period_sk
+            from dimcmte
+            where cmte_sk = committee_key
+            ;
+        end if;
+    end if;
+    if tg_op = 'UPDATE' or tg_op = 'DELETE' then
+        if form = 'F5' then
+            committee_key := old.indv_org_sk;
+        else
+            committee_key := old.cmte_sk;
+        end if;
+        if old.two_yr_period_sk >= start_year then
+            insert into ofec_totals_reports_queue
+            select form, cmte_id, old.two_yr_period_sk
+            from dimcmte
+            where cmte_sk = committee_key
+            ;
+        end if;
+    end if;
+    if tg_op = 'DELETE' then
+        return old;
+    end if;
+    return new;
+end
+$$ language plpgsql;
+
+drop trigger if exists ofec_totals_reports_queue_trigger on factpresidential_f3p;
+create trigger ofec_totals_reports_queue_trigger after insert or update or delete
+    on factpresidential_f3p for each row execute procedure ofec_totals_reports_update_queue('F3P', :START_YEAR)
+;
+
+drop trigger if exists ofec_totals_reports_queue_trigger on facthousesenate_f3;
+create trigger ofec_totals_reports_queue_trigger after insert or update or delete
+    on facthousesenate_f3 for each row execute procedure ofec_totals_reports_update_queue('F3', :START_YEAR)
+;
+
+drop trigger if exists ofec_totals_reports_queue_trigger on factpacsandparties_f3x;
+create trigger ofec_totals_reports_queue_trigger after insert or update or delete
+    on factpacsandparties_f3x for each row execute procedure ofec_totals_reports_update_queue('F3X', :START_YEAR)
+;
+
+drop trigger if exists ofec_totals_reports_queue_trigger on factindpexpcontb_f5;
+create trigger ofec_totals_reports_queue_trigger after insert or update or delete
+    on factindpexpcontb_f5 for each row execute procedure ofec_totals_reports_update_queue('F5', :START_YEAR)
+;
+
+-- Queue the committees and cycles of the reports in fact table `fact` of form
+-- type `form` that match `condition`, in which `$1` is the key of a changed
+-- dimension row; if `committee_id` is given, it is queued in place of the
+-- committee's current ID
+create or replace function ofec_totals_reports_queue_reports(
+    form text,
+    fact text,
+    condition text,
+    dimension_key numeric,
+    committee_id text,
+    start_year int
+) returns void as $$
+begin
+    execute format(
+        'insert into ofec_totals_reports_queue
+        select distinct $2, coalesce($3, c.cmte_id), f.two_yr_period_sk
+        from %I f
+        left join dimcmte c on c.cmte_sk = f.%I
+        where f.two_yr_period_sk >= $4
+            and coalesce($3, c.cmte_id) is not null
+            and (%s)',
+        fact,
+        case when form = 'F5' then 'indv_org_sk' else 'cmte_sk' end,
+        condition
+    ) using dimension_key, form, committee_id, start_year;
+end
+$$ language plpgsql;
+
+-- Create trigger to queue the reports that use changed rows of dimension tables;
+-- the first argument is the first cycle to track
+create or replace function ofec_totals_reports_dimension_update_queue() returns trigger as $$
+declare
+    start_year int = TG_ARGV[0]::int;
+    changes json[];
+    change json;
+    fact record;
+begin
+    if tg_op = 'INSERT' or tg_op = 'UPDATE' then
+        changes := array_append(changes, to_json(new));
+    end if;
+    if tg_op = 'UPDATE' or tg_op = 'DELETE' then
+        changes := array_append(changes, to_json(old));
+    end if;
+    foreach change in array changes loop
+        for fact in
+            select * from (values
+                ('F3P', 'factpresidential_f3p', 'cmte_sk'),
+                ('F3', 'facthousesenate_f3', 'cmte_sk'),
+                ('F3X', 'factpacsandparties_f3x', 'cmte_sk'),
+                ('F5', 'factindpexpcontb_f5', 'indv_org_sk')
+            ) facts (form, name, committee_column)
+        loop
+            if tg_table_name = 'dimcmte' then
+                perform ofec_totals_reports_queue_reports(
+                    fact.form, fact.name, format('f.%I = $1', fact.committee_column),
+                    (change->>'cmte_sk')::numeric, change->>'cmte_id', start_year
+                );
+            elsif tg_table_name = 'dimreporttype' then
+                perform ofec_totals_reports_queue_reports(
+                    fact.form, fact.name, 'f.reporttype_sk = $1',
+                    (change->>'reporttype_sk')::numeric, null, start_year
+                );
+            elsif tg_table_name = 'dimdates' then
+                perform ofec_totals_reports_queue_reports(
+                    fact.form, fact.name, '$1 in (f.cvg_start_dt_sk, f.cvg_end_dt_sk)',
+                    (change->>'date_sk')::numeric, null, start_year
+                );
+            end if;
+        end loop;
+    end loop;
+    if tg_op = 'DELETE' then
+        return old;
+    end if;
+    return new;
+end
+$$ language plpgsql;
+
+drop trigger if exists ofec_totals_reports_queue_trigger on dimcmte;
+create trigger ofec_totals_reports_queue_trigger after insert or update or delete
+    on dimcmte for each row execute procedure ofec_totals_reports_dimension_update_queue(:START_YEAR)
+;
+
+drop trigger if exists ofec_totals_reports_queue_trigger on dimreporttype;
+create trigger ofec_totals_reports_queue_trigger after update or delete
+    on dimreporttype for each row execute procedure ofec_totals_reports_dimension_update_queue(:START_YEAR)
+;
+
+drop trigger if exists ofec_totals_reports_queue_trigger on dimdates;
+create trigger ofec_totals_reports_queue_trigger after update or delete
+    on dimdates for each row execute procedure ofec_totals_reports_dimension_update_queue(:START_YEAR)
+;
+
+-- Recompute the rows of table `target` for queued committees and cycles of
+-- form type `form` with function `source`, which computes rows for the given
+-- committees and cycles; see `create_keyed_view`
+create or replace function ofec_totals_reports_patch(target text, source text, form text) returns void as $$
+declare
+    committee_ids text[];
+    cycles numeric[];
+begin
+    execute
+        'select array_agg(distinct committee_id), array_agg(distinct cycle)
+        from ofec_totals_reports_queue
+        where form = $1'
+    into committee_ids, cycles
+    using form;
+    if committee_ids is null then
+        return;
+    end if;
+    execute format(
+        'delete from %I t
+        using (select distinct committee_id, cycle from ofec_totals_reports_queue where form = $1) q
+        where (t.committee_id, t.cycle) = (q.committee_id, q.cycle)',
+        target
+    ) using form;
+    -- The function computes every pair of the queued committees and cycles;
+    -- keep only the queued pairs
+    execute format(
+        'insert into %I
+        select (select coalesce(max(idx), 0) from %I) + row_number() over (), v.*
+        from %I($2, $3) v
+        where (v.committee_id, v.cycle) in (
+            select committee_id, cycle from ofec_totals_reports_queue where form = $1
+        )',
+        target, target, source
+    ) using form, committee_ids, cycles;
+end
+$$ language plpgsql;
+
+-- Create update function
+create or replace function ofec_totals_reports_update() returns void as $$
+begin
+    perform ofec_totals_reports_patch('ofec_totals_presidential', 'ofec_totals_presidential_rows', 'F3P');
+    perform ofec_totals_reports_patch('ofec_reports_presidential', 'ofec_reports_presidential_rows', 'F3P');
+    perform ofec_totals_reports_patch('ofec_totals_house_senate', 'ofec_totals_house_senate_rows', 'F3');
+    perform ofec_totals_reports_patch('ofec_reports_house_senate', 'ofec_reports_house_senate_rows', 'F3');
+    perform ofec_totals_reports_patch('ofec_totals_pacs_parties', 'ofec_totals_pacs_parties_rows', 'F3X');
+    perform ofec_totals_reports_patch('ofec_reports_pacs_parties', 'ofec_reports_pacs_parties_rows', 'F3X');
+    perform ofec_totals_reports_patch('ofec_totals_ie_only', 'ofec_totals_ie_only_rows', 'F5');
+    perform ofec_totals_reports_patch('ofec_reports_ie_only', 'ofec_reports_ie_only_rows', 'F5');
+end
+$$ language plpgsql;
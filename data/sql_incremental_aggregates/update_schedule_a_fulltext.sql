@@ -1,17 +1,32 @@
+-- Apply queued changes to `ofec_sched_a`, and to `ofec_sched_a_shadow` if a
+-- rebuild is waiting to be swapped in, so that it does not miss changes
+-- made since it was built
 create or replace function ofec_sched_a_update() returns void as $$
+declare
+    target text;
 begin
-    delete from ofec_sched_a
-    where sched_a_sk = any(select sched_a_sk from ofec_sched_a_queue_old)
-    ;
-    insert into ofec_sched_a(
-        select
-            *,
-            to_tsvector(contbr_nm) as contributor_name_text,
-            to_tsvector(contbr_employer) as contributor_employer_text,
-            to_tsvector(contbr_occupation) as contributor_occupation_text,
-            is_individual(contb_receipt_amt, receipt_tp, line_num, memo_cd, memo_text)
-                as is_individual
-        from ofec_sched_a_queue_new
-    );
+    foreach target in array array['ofec_sched_a', 'ofec_sched_a_shadow'] loop
+        if not exists (select 1 from pg_tables where tablename = target) then
+            continue;
+        end if;
+        execute format(
+            'delete from %I
+            where sched_a_sk = any(select sched_a_sk from ofec_sched_a_queue_old)',
+            target
+        );
+        execute format(
+            'insert into %I(
+                select
+                    *,
+                    to_tsvector(contbr_nm) as contributor_name_text,
+                    to_tsvector(contbr_employer) as contributor_employer_text,
+                    to_tsvector(contbr_occupation) as contributor_occupation_text,
+                    is_individual(contb_receipt_amt, receipt_tp, line_num, memo_cd, memo_text)
+                        as is_individual
+                from ofec_sched_a_queue_new
+            )',
+            target
+        );
+    end loop;
 end
 $$ language plpgsql;
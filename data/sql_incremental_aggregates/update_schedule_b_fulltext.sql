@@ -1,15 +1,29 @@
+-- Apply queued changes to `ofec_sched_b`, and to `ofec_sched_b_shadow` if a
+-- rebuild is waiting to be swapped in
 create or replace function ofec_sched_b_update() returns void as $$
+declare
+    target text;
 begin
-    delete from ofec_sched_b
-    where sched_b_sk = any(select sched_b_sk from ofec_sched_b_queue_old)
-    ;
-    insert into ofec_sched_b(
-        select
-            *,
-            to_tsvector(recipient_nm) as recipient_name_text,
-            to_tsvector(disb_desc) as disbursement_description_text,
-            disbursement_purpose(disb_tp, disb_desc) as disbursement_purpose_category
-        from ofec_sched_b_queue_new
-    );
+    foreach target in array array['ofec_sched_b', 'ofec_sched_b_shadow'] loop
+        if not exists (select 1 from pg_tables where tablename = target) then
+            continue;
+        end if;
+        execute format(
+            'delete from %I
+            where sched_b_sk = any(select sched_b_sk from ofec_sched_b_queue_old)',
+            target
+        );
+        execute format(
+            'insert into %I(
+                select
+                    *,
+                    to_tsvector(recipient_nm) as recipient_name_text,
+                    to_tsvector(disb_desc) as disbursement_description_text,
+                    disbursement_purpose(disb_tp, disb_desc) as disbursement_purpose_category
+                from ofec_sched_b_queue_new
+            )',
+            target
+        );
+    end loop;
 end
 $$ language plpgsql;
@@ -1,13 +1,27 @@
+-- Apply queued changes to `ofec_sched_e`, and to `ofec_sched_e_shadow` if a
+-- rebuild is waiting to be swapped in
 create or replace function ofec_sched_e_update() returns void as $$
+declare
+    target text;
 begin
-    delete from ofec_sched_e
-    where sched_e_sk = any(select sched_e_sk from ofec_sched_e_queue_old)
-    ;
-    insert into ofec_sched_e (
-        select
-            *,
-            to_tsvector(pye_nm) as payee_name_text
-        from ofec_sched_e_queue_new
-    );
+    foreach target in array array['ofec_sched_e', 'ofec_sched_e_shadow'] loop
+        if not exists (select 1 from pg_tables where tablename = target) then
+            continue;
+        end if;
+        execute format(
+            'delete from %I
+            where sched_e_sk = any(select sched_e_sk from ofec_sched_e_queue_old)',
+            target
+        );
+        execute format(
+            'insert into %I (
+                select
+                    *,
+                    to_tsvector(pye_nm) as payee_name_text
+                from ofec_sched_e_queue_new
+            )',
+            target
+        );
+    end loop;
 end
 $$ language plpgsql;
@@ -1,6 +1,10 @@
--- Create Schedule A table
-drop table if exists ofec_sched_a;
-create table ofec_sched_a as
+-- Create Schedule A parent table; rows are stored in one child table per
+-- two-year cycle, so that rebuilding a cycle only rewrites that cycle's rows
+-- and indexes, and queries filtered by `rpt_yr` skip the other cycles. The
+-- tables are built under a `_shadow` name while the current tables keep
+-- serving requests, and swapped in by `swap_shadow_table`
+drop table if exists ofec_sched_a_shadow cascade;
+create table ofec_sched_a_shadow as
 select
     *,
     to_tsvector(contbr_nm) as contributor_name_text,
@@ -9,42 +13,116 @@ select
     is_individual(contb_receipt_amt, receipt_tp, line_num, memo_cd, memo_text)
         as is_individual
 from sched_a
-where rpt_yr >= :START_YEAR_ITEMIZED
+limit 0
 ;
 
-alter table ofec_sched_a add primary key (sched_a_sk);
+-- Add constraints and indices to partition `relation` for cycle `cycle`
+create or replace function ofec_sched_a_index_partition(relation text, cycle int) returns void as $$
+declare
+    columns text;
+begin
+    execute format('alter table %I add primary key (sched_a_sk)', relation);
+    execute format(
+        'alter table %I add check (rpt_yr in (%s, %s))',
+        relation, cycle - 1, cycle
+    );
 
--- Create simple indices on filtered columns
-create index on ofec_sched_a (rpt_yr);
-create index on ofec_sched_a (entity_tp);
-create index on ofec_sched_a (image_num);
-create index on ofec_sched_a (sched_a_sk);
-create index on ofec_sched_a (contbr_id);
-create index on ofec_sched_a (contbr_st);
-create index on ofec_sched_a (contbr_city);
-create index on ofec_sched_a (is_individual);
+    -- Create simple indices on filtered columns, composite indices on sortable
+    -- columns, and composite indices on `cmte_id`; else filtering by
+    -- committee can be very slow
+    foreach columns in array array[
+        'rpt_yr',
+        'entity_tp',
+        'image_num',
+        'sched_a_sk',
+        'contbr_id',
+        'contbr_st',
+        'contbr_city',
+        'is_individual',
+        'contb_receipt_dt, sched_a_sk',
+        'contb_receipt_amt, sched_a_sk',
+        'contb_aggregate_ytd, sched_a_sk',
+        'cmte_id, sched_a_sk',
+        'cmte_id, contb_receipt_dt, sched_a_sk',
+        'cmte_id, contb_receipt_amt, sched_a_sk',
+        'cmte_id, contb_aggregate_ytd, sched_a_sk'
+    ] loop
+        execute format('create index on %I (%s)', relation, columns);
+    end loop;
 
--- Create composite indices on sortable columns
-create index on ofec_sched_a (contb_receipt_dt, sched_a_sk);
-create index on ofec_sched_a (contb_receipt_amt, sched_a_sk);
-create index on ofec_sched_a (contb_aggregate_ytd, sched_a_sk);
+    -- Create indices on filtered fulltext columns
+    foreach columns in array array[
+        'contributor_name_text',
+        'contributor_employer_text',
+        'contributor_occupation_text'
+    ] loop
+        execute format('create index on %I using gin (%s)', relation, columns);
+    end loop;
+
+    -- Use smaller histogram bins on state column for faster queries on rare states (AS, PR)
+    execute format('alter table %I alter column contbr_st set statistics 1000', relation);
+end
+$$ language plpgsql;
 
--- Create composite indices on `cmte_id`; else filtering by committee can be very slow
-create index on ofec_sched_a (cmte_id, sched_a_sk);
-create index on ofec_sched_a (cmte_id, contb_receipt_dt, sched_a_sk);
-create index on ofec_sched_a (cmte_id, contb_receipt_amt, sched_a_sk);
-create index on ofec_sched_a (cmte_id, contb_aggregate_ytd, sched_a_sk);
+-- Build the partition for cycle `cycle` of table `parent` from `sched_a` and
+-- swap it in for the existing partition, if any
+drop function if exists ofec_sched_a_create_partition(int);
+create or replace function ofec_sched_a_create_partition(cycle int, parent text default 'ofec_sched_a') returns void as $$
+declare
+    child text = format('%s_%s', parent, cycle);
+    tmp text = format('%s_%s_tmp', parent, cycle);
+begin
+    execute format('drop table if exists %I', tmp);
+    execute format(
+        'create table %I as
+        select
+            *,
+            to_tsvector(contbr_nm) as contributor_name_text,
+            to_tsvector(contbr_employer) as contributor_employer_text,
+            to_tsvector(contbr_occupation) as contributor_occupation_text,
+            is_individual(contb_receipt_amt, receipt_tp, line_num, memo_cd, memo_text)
+                as is_individual
+        from sched_a
+        where rpt_yr in (%s, %s)',
+        tmp, cycle - 1, cycle
+    );
+    perform ofec_sched_a_index_partition(tmp, cycle);
+    execute format('analyze %I', tmp);
+    execute format('drop table if exists %I', child);
+    execute format('alter table %I rename to %I', tmp, child);
+    execute format('alter table %I inherit %I', child, parent);
+end
+$$ language plpgsql;
 
--- Create indices on filtered fulltext columns
-create index on ofec_sched_a using gin (contributor_name_text);
-create index on ofec_sched_a using gin (contributor_employer_text);
-create index on ofec_sched_a using gin (contributor_occupation_text);
+-- Route rows inserted into the parent table to the partition for their
+-- cycle, creating an empty partition for a new cycle
+create or replace function ofec_sched_a_insert_partition() returns trigger as $$
+declare
+    cycle int = get_cycle(new.rpt_yr);
+    child text = format('%s_%s', TG_TABLE_NAME, cycle);
+begin
+    if not exists (select 1 from pg_tables where tablename = child) then
+        execute format('create table %I (like %I)', child, TG_TABLE_NAME);
+        perform ofec_sched_a_index_partition(child, cycle);
+        execute format('alter table %I inherit %I', child, TG_TABLE_NAME);
+    end if;
+    execute format('insert into %I select ($1).*', child) using new;
+    return null;
+end
+$$ language plpgsql;
 
--- Use smaller histogram bins on state column for faster queries on rare states (AS, PR)
-alter table ofec_sched_a alter column contbr_st set statistics 1000;
+create trigger ofec_sched_a_partition_trigger before insert
+    on ofec_sched_a_shadow for each row execute procedure ofec_sched_a_insert_partition()
+;
 
--- Analyze tables
-analyze ofec_sched_a;
+-- Create partitions for each cycle
+select ofec_sched_a_create_partition(cycle, 'ofec_sched_a_shadow')
+from generate_series(
+    get_cycle(:START_YEAR_ITEMIZED),
+    (select max(get_cycle(rpt_yr)) from sched_a),
+    2
+) cycle
+;
 
 -- Create queue tables to hold changes to Schedule A
 drop table if exists ofec_sched_a_queue_new;
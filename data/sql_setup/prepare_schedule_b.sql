@@ -1,46 +1,119 @@
--- Create Schedule B table
-drop table if exists ofec_sched_b;
-create table ofec_sched_b as
+-- Create Schedule B parent table; rows are stored in one child table per
+-- two-year cycle and built under a `_shadow` name, as with Schedule A
+drop table if exists ofec_sched_b_shadow cascade;
+create table ofec_sched_b_shadow as
 select
     *,
     to_tsvector(recipient_nm) as recipient_name_text,
     to_tsvector(disb_desc) as disbursement_description_text,
     disbursement_purpose(disb_tp, disb_desc) as disbursement_purpose_category
 from sched_b
-where rpt_yr >= :START_YEAR_ITEMIZED
+limit 0
 ;
 
-alter table ofec_sched_b add primary key (sched_b_sk);
+-- Add constraints and indices to partition `relation` for cycle `cycle`
+create or replace function ofec_sched_b_index_partition(relation text, cycle int) returns void as $$
+declare
+    columns text;
+begin
+    execute format('alter table %I add primary key (sched_b_sk)', relation);
+    execute format(
+        'alter table %I add check (rpt_yr in (%s, %s))',
+        relation, cycle - 1, cycle
+    );
 
--- Create simple indices on filtered columns
-create index on ofec_sched_b (rpt_yr);
-create index on ofec_sched_b (image_num);
-create index on ofec_sched_b (sched_b_sk);
-create index on ofec_sched_b (recipient_st);
-create index on ofec_sched_b (recipient_city);
-create index on ofec_sched_b (recipient_cmte_id);
+    -- Create simple indices on filtered columns, composite indices on sortable
+    -- columns, and composite indices on `cmte_id`; else filtering by
+    -- committee can be very slow
+    foreach columns in array array[
+        'rpt_yr',
+        'image_num',
+        'sched_b_sk',
+        'recipient_st',
+        'recipient_city',
+        'recipient_cmte_id',
+        'disb_dt, sched_b_sk',
+        'disb_amt, sched_b_sk',
+        'cmte_id, sched_b_sk',
+        'cmte_id, disb_dt, sched_b_sk',
+        'cmte_id, disb_amt, sched_b_sk'
+    ] loop
+        execute format('create index on %I (%s)', relation, columns);
+    end loop;
 
--- Create composite indices on sortable columns
-create index on ofec_sched_b(disb_dt, sched_b_sk);
-create index on ofec_sched_b(disb_amt, sched_b_sk);
+    -- Create indices on fulltext columns
+    foreach columns in array array[
+        'recipient_name_text',
+        'disbursement_description_text'
+    ] loop
+        execute format('create index on %I using gin (%s)', relation, columns);
+    end loop;
 
--- Create composite indices on `cmte_id`; else filtering by committee can be very slow
-create index on ofec_sched_b (cmte_id, sched_b_sk);
-create index on ofec_sched_b (cmte_id, disb_dt, sched_b_sk);
-create index on ofec_sched_b (cmte_id, disb_amt, sched_b_sk);
+    -- Use smaller histogram bins on state column for faster queries on rare states (AS, PR)
+    execute format('alter table %I alter column recipient_st set statistics 1000', relation);
+end
+$$ language plpgsql;
 
--- Create indices on fulltext columns
-create index on ofec_sched_b using gin (recipient_name_text);
-create index on ofec_sched_b using gin (disbursement_description_text);
+-- Build the partition for cycle `cycle` of table `parent` from `sched_b` and
+-- swap it in for the existing partition, if any
+drop function if exists ofec_sched_b_create_partition(int);
+create or replace function ofec_sched_b_create_partition(cycle int, parent text default 'ofec_sched_b') returns void as $$
+declare
+    child text = format('%s_%s', parent, cycle);
+    tmp text = format('%s_%s_tmp', parent, cycle);
+begin
+    execute format('drop table if exists %I', tmp);
+    execute format(
+        'create table %I as
+        select
+            *,
+            to_tsvector(recipient_nm) as recipient_name_text,
+            to_tsvector(disb_desc) as disbursement_description_text,
+            disbursement_purpose(disb_tp, disb_desc) as disbursement_purpose_category
+        from sched_b
+        where rpt_yr in (%s, %s)',
+        tmp, cycle - 1, cycle
+    );
+    perform ofec_sched_b_index_partition(tmp, cycle);
+    execute format('analyze %I', tmp);
+    execute format('drop table if exists %I', child);
+    execute format('alter table %I rename to %I', tmp, child);
+    execute format('alter table %I inherit %I', child, parent);
+end
+$$ language plpgsql;
 
--- Create index for join on electioneering costs
-create index on sched_b (link_id);
+-- Route rows inserted into the parent table to the partition for their
+-- cycle, creating an empty partition for a new cycle
+create or replace function ofec_sched_b_insert_partition() returns trigger as $$
+declare
+    cycle int = get_cycle(new.rpt_yr);
+    child text = format('%s_%s', TG_TABLE_NAME, cycle);
+begin
+    if not exists (select 1 from pg_tables where tablename = child) then
+        execute format('create table %I (like %I)', child, TG_TABLE_NAME);
+        perform ofec_sched_b_index_partition(child, cycle);
+        execute format('alter table %I inherit %I', child, TG_TABLE_NAME);
+    end if;
+    execute format('insert into %I select ($1).*', child) using new;
+    return null;
+end
+$$ language plpgsql;
 
--- Use smaller histogram bins on state column for faster queries on rare states (AS, PR)
-alter table ofec_sched_b alter column recipient_st set statistics 1000;
+create trigger ofec_sched_b_partition_trigger before insert
+    on ofec_sched_b_shadow for each row execute procedure ofec_sched_b_insert_partition()
+;
+
+-- Create partitions for each cycle
+select ofec_sched_b_create_partition(cycle, 'ofec_sched_b_shadow')
+from generate_series(
+    get_cycle(:START_YEAR_ITEMIZED),
+    (select max(get_cycle(rpt_yr)) from sched_b),
+    2
+) cycle
+;
 
--- Analyze tables
-analyze ofec_sched_b;
+-- Create index for join on electioneering costs
+create index on sched_b (link_id);
 
 -- Create queue tables to hold changes to Schedule B
 drop table if exists ofec_sched_b_queue_new;
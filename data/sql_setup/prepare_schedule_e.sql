@@ -1,6 +1,7 @@
--- Create Schedule E table
-drop table if exists ofec_sched_e;
-create table ofec_sched_e as
+-- Create Schedule E table under a `_shadow` name, to be swapped in by
+-- `swap_shadow_table`
+drop table if exists ofec_sched_e_shadow;
+create table ofec_sched_e_shadow as
 select
     *,
     to_tsvector(pye_nm) as payee_name_text
@@ -8,19 +9,19 @@ from sched_e
 ;
 
 -- Create simple indices on filtered columns
-create index on ofec_sched_e (cmte_id);
-create index on ofec_sched_e (s_o_cand_id);
-create index on ofec_sched_e (entity_tp);
-create index on ofec_sched_e (image_num);
-create index on ofec_sched_e (rpt_yr);
+create index on ofec_sched_e_shadow (cmte_id);
+create index on ofec_sched_e_shadow (s_o_cand_id);
+create index on ofec_sched_e_shadow (entity_tp);
+create index on ofec_sched_e_shadow (image_num);
+create index on ofec_sched_e_shadow (rpt_yr);
 
 -- Create composite indices on sortable columns
-create index on ofec_sched_e (exp_dt, sched_e_sk);
-create index on ofec_sched_e (exp_amt, sched_e_sk);
-create index on ofec_sched_e (cal_ytd_ofc_sought, sched_e_sk);
+create index on ofec_sched_e_shadow (exp_dt, sched_e_sk);
+create index on ofec_sched_e_shadow (exp_amt, sched_e_sk);
+create index on ofec_sched_e_shadow (cal_ytd_ofc_sought, sched_e_sk);
 
 -- Create indices on filtered fulltext columns
-create index on ofec_sched_e using gin (payee_name_text);
+create index on ofec_sched_e_shadow using gin (payee_name_text);
 
 -- Create queue tables to hold changes to Schedule E
 drop table if exists ofec_sched_e_queue_new;
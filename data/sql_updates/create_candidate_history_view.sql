@@ -136,9 +136,38 @@ create index on ofec_candidate_detail_mv_tmp(incumbent_challenge);
 create index on ofec_candidate_detail_mv_tmp using gin (cycles);
 create index on ofec_candidate_detail_mv_tmp using gin (election_years);
 
+-- Create trigram index for substring and fuzzy name searches
+create index on ofec_candidate_detail_mv_tmp using gin (name gin_trgm_ops);
+
 drop table if exists dimcand_fulltext;
 drop materialized view if exists ofec_candidate_fulltext_mv_tmp;
 create materialized view ofec_candidate_fulltext_mv_tmp as
+with
+    -- Total receipts of linked committees over all reports, used to pick which
+    -- matches to rank in two-phase searches; see `utils.search_text_ranked`
+    committee_receipts as (
+        select cmte_sk, sum(receipts) as receipts
+        from (
+            select cmte_sk, greatest(ttl_receipts_per, ttl_receipts_sum_page_per) as receipts
+            from factpresidential_f3p
+            where expire_date is null
+            union all
+            select cmte_sk, greatest(ttl_receipts_per_i, ttl_receipts_ii) as receipts
+            from facthousesenate_f3
+            where expire_date is null
+        ) reports
+        group by cmte_sk
+    ),
+    receipts as (
+        select links.cand_id, sum(committee_receipts.receipts) as receipts
+        from (
+            select distinct cand_id, cmte_sk
+            from dimlinkages
+            where expire_date is null
+        ) links
+        join committee_receipts using (cmte_sk)
+        group by links.cand_id
+    )
 select distinct on (candidate_id)
     row_number() over () as idx,
     candidate_id as id,
@@ -150,9 +179,12 @@ select distinct on (candidate_id)
             setweight(to_tsvector(candidate_id), 'B')
         else null::tsvector
     end
-as fulltxt
-from ofec_candidate_detail_mv_tmp
+as fulltxt,
+    coalesce(receipts.receipts, 0) as receipts
+from ofec_candidate_detail_mv_tmp cd
+left join receipts on cd.candidate_id = receipts.cand_id
 ;
 
 create unique index on ofec_candidate_fulltext_mv_tmp(idx);
 create index on ofec_candidate_fulltext_mv_tmp using gin(fulltxt);
+create index on ofec_candidate_fulltext_mv_tmp(receipts);
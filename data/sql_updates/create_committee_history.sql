@@ -148,9 +148,32 @@ create index on ofec_committee_detail_mv_tmp(organization_type_full);
 create index on ofec_committee_detail_mv_tmp using gin (cycles);
 create index on ofec_committee_detail_mv_tmp using gin (candidate_ids);
 
+-- Create trigram index for substring and fuzzy name searches
+create index on ofec_committee_detail_mv_tmp using gin (name gin_trgm_ops);
+
 drop table if exists dimcmte_fulltext;
 drop materialized view if exists ofec_committee_fulltext_mv_tmp;
 create materialized view ofec_committee_fulltext_mv_tmp as
+with
+    -- Total receipts over all reports, used to pick which matches to rank in
+    -- two-phase searches; see `utils.search_text_ranked`
+    receipts as (
+        select cmte_sk, sum(receipts) as receipts
+        from (
+            select cmte_sk, greatest(ttl_receipts_per, ttl_receipts_sum_page_per) as receipts
+            from factpresidential_f3p
+            where expire_date is null
+            union all
+            select cmte_sk, greatest(ttl_receipts_per_i, ttl_receipts_ii) as receipts
+            from facthousesenate_f3
+            where expire_date is null
+            union all
+            select cmte_sk, greatest(ttl_receipts_sum_page_per, ttl_receipts_per) as receipts
+            from factpacsandparties_f3x
+            where expire_date is null
+        ) reports
+        group by cmte_sk
+    )
 select distinct on (committee_id)
     row_number() over () as idx,
     committee_id as id,
@@ -162,10 +185,13 @@ select distinct on (committee_id)
             setweight(to_tsvector(committee_id), 'B')
         else null::tsvector
     end
-as fulltxt
+as fulltxt,
+    coalesce(receipts.receipts, 0) as receipts
 from ofec_committee_detail_mv_tmp cd
 left join pacronyms pac on cd.committee_id = pac."ID NUMBER"
+left join receipts on cd.committee_key = receipts.cmte_sk
 ;
 
 create unique index on ofec_committee_fulltext_mv_tmp(idx);
 create index on ofec_committee_fulltext_mv_tmp using gin(fulltxt);
+create index on ofec_committee_fulltext_mv_tmp(receipts);
@@ -1,8 +1,11 @@
-drop view if exists ofec_reports_ie_only_vw;
-drop materialized view if exists ofec_reports_ie_only_mv_tmp;
-create materialized view ofec_reports_ie_only_mv_tmp as
+-- Rows are computed by `ofec_reports_ie_only_vw` and stored in a table so that
+-- `update_aggregates()` can patch changed committees and cycles in place using
+-- `ofec_reports_ie_only_rows`, which computes only the rows for the given committees
+-- and cycles; see `create_keyed_view` and
+-- `data/sql_incremental_aggregates/prepare_totals_reports_queue.sql`
+drop materialized view if exists ofec_reports_ie_only_mv cascade;
+select create_keyed_view('ofec_reports_ie_only', $body$
 select
-    row_number() over () as idx,
     cmte_id as committee_id,
     factindpexpcontb_f5_sk as key,
     form_5_sk as form_key,
@@ -35,14 +38,22 @@ from
 where
     two_yr_period_sk >= :START_YEAR
     and ief5.expire_date is null
+    and (filter_committee_ids is null or c.cmte_id = any(filter_committee_ids))
+    and (filter_cycles is null or two_yr_period_sk = any(filter_cycles))
+$body$);
+
+drop table if exists ofec_reports_ie_only_tmp;
+create table ofec_reports_ie_only_tmp as
+select row_number() over () as idx, *
+from ofec_reports_ie_only_vw
 ;
 
-create unique index on ofec_reports_ie_only_mv_tmp(idx);
+create unique index on ofec_reports_ie_only_tmp(idx);
 
-create index on ofec_reports_ie_only_mv_tmp(cycle);
-create index on ofec_reports_ie_only_mv_tmp(report_type);
-create index on ofec_reports_ie_only_mv_tmp(report_year);
-create index on ofec_reports_ie_only_mv_tmp(committee_id);
-create index on ofec_reports_ie_only_mv_tmp(coverage_end_date);
-create index on ofec_reports_ie_only_mv_tmp(coverage_start_date);
-create index on ofec_reports_ie_only_mv_tmp(beginning_image_number);
+create index on ofec_reports_ie_only_tmp(cycle);
+create index on ofec_reports_ie_only_tmp(report_type);
+create index on ofec_reports_ie_only_tmp(report_year);
+create index on ofec_reports_ie_only_tmp(committee_id);
+create index on ofec_reports_ie_only_tmp(coverage_end_date);
+create index on ofec_reports_ie_only_tmp(coverage_start_date);
+create index on ofec_reports_ie_only_tmp(beginning_image_number);
@@ -1,8 +1,11 @@
-drop view if exists ofec_reports_pacs_parties_vw;
-drop materialized view if exists ofec_reports_pacs_parties_mv_tmp;
-create materialized view ofec_reports_pacs_parties_mv_tmp as
+-- Rows are computed by `ofec_reports_pacs_parties_vw` and stored in a table so that
+-- `update_aggregates()` can patch changed committees and cycles in place using
+-- `ofec_reports_pacs_parties_rows`, which computes only the rows for the given committees
+-- and cycles; see `create_keyed_view` and
+-- `data/sql_incremental_aggregates/prepare_totals_reports_queue.sql`
+drop materialized view if exists ofec_reports_pacs_parties_mv cascade;
+select create_keyed_view('ofec_reports_pacs_parties', $body$
 select
-    row_number() over () as idx,
     factpacsandparties_f3x_sk as report_key,
     cmte_id as committee_id,
     cmte_sk as committee_key,
@@ -119,16 +122,24 @@ from
     left join dimdates end_date on cvg_end_dt_sk = end_date.date_sk and cvg_end_dt_sk != 1
 where
     two_yr_period_sk >= :START_YEAR
+    and (filter_committee_ids is null or c.cmte_id = any(filter_committee_ids))
+    and (filter_cycles is null or two_yr_period_sk = any(filter_cycles))
+$body$);
+
+drop table if exists ofec_reports_pacs_parties_tmp;
+create table ofec_reports_pacs_parties_tmp as
+select row_number() over () as idx, *
+from ofec_reports_pacs_parties_vw
 ;
 
-create unique index on ofec_reports_pacs_parties_mv_tmp(idx);
+create unique index on ofec_reports_pacs_parties_tmp(idx);
 
-create index on ofec_reports_pacs_parties_mv_tmp(cycle);
-create index on ofec_reports_pacs_parties_mv_tmp(expire_date);
-create index on ofec_reports_pacs_parties_mv_tmp(report_type);
-create index on ofec_reports_pacs_parties_mv_tmp(report_year);
-create index on ofec_reports_pacs_parties_mv_tmp(committee_id);
-create index on ofec_reports_pacs_parties_mv_tmp(committee_key);
-create index on ofec_reports_pacs_parties_mv_tmp(coverage_end_date);
-create index on ofec_reports_pacs_parties_mv_tmp(coverage_start_date);
-create index on ofec_reports_pacs_parties_mv_tmp(beginning_image_number);
+create index on ofec_reports_pacs_parties_tmp(cycle);
+create index on ofec_reports_pacs_parties_tmp(expire_date);
+create index on ofec_reports_pacs_parties_tmp(report_type);
+create index on ofec_reports_pacs_parties_tmp(report_year);
+create index on ofec_reports_pacs_parties_tmp(committee_id);
+create index on ofec_reports_pacs_parties_tmp(committee_key);
+create index on ofec_reports_pacs_parties_tmp(coverage_end_date);
+create index on ofec_reports_pacs_parties_tmp(coverage_start_date);
+create index on ofec_reports_pacs_parties_tmp(beginning_image_number);
@@ -1,7 +1,11 @@
-drop materialized view if exists ofec_totals_ie_only_mv_tmp;
-create materialized view ofec_totals_ie_only_mv_tmp as
+-- Rows are computed by `ofec_totals_ie_only_vw` and stored in a table so that
+-- `update_aggregates()` can patch changed committees and cycles in place using
+-- `ofec_totals_ie_only_rows`, which computes only the rows for the given committees
+-- and cycles; see `create_keyed_view` and
+-- `data/sql_incremental_aggregates/prepare_totals_reports_queue.sql`
+drop materialized view if exists ofec_totals_ie_only_mv cascade;
+select create_keyed_view('ofec_totals_ie_only', $body$
 select
-    row_number() over () as idx,
     cmte_id as committee_id,
     two_yr_period_sk as cycle,
     min(start_date.dw_date) as coverage_start_date,
@@ -16,10 +20,18 @@ from
 where
     two_yr_period_sk >= :START_YEAR
     and ief5.expire_date is null
+    and (filter_committee_ids is null or c.cmte_id = any(filter_committee_ids))
+    and (filter_cycles is null or two_yr_period_sk = any(filter_cycles))
 group by committee_id, cycle
+$body$);
+
+drop table if exists ofec_totals_ie_only_tmp;
+create table ofec_totals_ie_only_tmp as
+select row_number() over () as idx, *
+from ofec_totals_ie_only_vw
 ;
 
-create unique index on ofec_totals_ie_only_mv_tmp(idx);
+create unique index on ofec_totals_ie_only_tmp(idx);
 
-create index on ofec_totals_ie_only_mv_tmp(cycle);
-create index on ofec_totals_ie_only_mv_tmp(committee_id);
+create index on ofec_totals_ie_only_tmp(cycle);
+create index on ofec_totals_ie_only_tmp(committee_id);
@@ -1,17 +1,26 @@
-drop materialized view if exists ofec_totals_presidential_mv_tmp;
-create materialized view ofec_totals_presidential_mv_tmp as
+-- Rows are computed by `ofec_totals_presidential_vw` and stored in a table so that
+-- `update_aggregates()` can patch changed committees and cycles in place using
+-- `ofec_totals_presidential_rows`, which computes only the rows for the given committees
+-- and cycles; see `create_keyed_view` and
+-- `data/sql_incremental_aggregates/prepare_totals_reports_queue.sql`
+drop materialized view if exists ofec_totals_presidential_mv cascade;
+select create_keyed_view('ofec_totals_presidential', $body$
 with last as (
     select distinct on (cmte_sk, two_yr_period_sk) *
     from factpresidential_f3p
     inner join dimreporttype rt using (reporttype_sk)
     left join dimdates end_date on cvg_end_dt_sk = end_date.date_sk and cvg_end_dt_sk != 1
+    where
+        (filter_committee_ids is null or cmte_sk in (
+            select cmte_sk from dimcmte where cmte_id = any(filter_committee_ids)
+        ))
+        and (filter_cycles is null or two_yr_period_sk = any(filter_cycles))
     order by
         cmte_sk,
         two_yr_period_sk,
         dw_date desc
 )
 select
-    row_number() over () as idx,
     cmte_id as committee_id,
     two_yr_period_sk as cycle,
     min(start_date.dw_date) as coverage_start_date,
@@ -62,10 +71,18 @@ from
 where
     p.expire_date is null
     and two_yr_period_sk >= :START_YEAR
+    and (filter_committee_ids is null or c.cmte_id = any(filter_committee_ids))
+    and (filter_cycles is null or two_yr_period_sk = any(filter_cycles))
 group by c.cmte_id, p.two_yr_period_sk
+$body$);
+
+drop table if exists ofec_totals_presidential_tmp;
+create table ofec_totals_presidential_tmp as
+select row_number() over () as idx, *
+from ofec_totals_presidential_vw
 ;
 
-create unique index on ofec_totals_presidential_mv_tmp(idx);
+create unique index on ofec_totals_presidential_tmp(idx);
 
-create index on ofec_totals_presidential_mv_tmp(cycle);
-create index on ofec_totals_presidential_mv_tmp(committee_id);
+create index on ofec_totals_presidential_tmp(cycle);
+create index on ofec_totals_presidential_tmp(committee_id);
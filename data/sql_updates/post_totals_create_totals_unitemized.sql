@@ -8,7 +8,7 @@ with grouped as (
         0 as size,
         individual_unitemized_contributions as total,
         0 as count
-    from ofec_totals_pacs_parties_mv_tmp
+    from ofec_totals_pacs_parties_tmp
     where cycle >= :START_YEAR_AGGREGATE
     union all
     select
@@ -17,7 +17,7 @@ with grouped as (
         0 as size,
         individual_unitemized_contributions as total,
         0 as count
-    from ofec_totals_presidential_mv_tmp
+    from ofec_totals_presidential_tmp
     where cycle >= :START_YEAR_AGGREGATE
     union all
     select
@@ -26,7 +26,7 @@ with grouped as (
         0 as size,
         individual_unitemized_contributions as total,
         0 as count
-    from ofec_totals_house_senate_mv_tmp
+    from ofec_totals_house_senate_tmp
     where cycle >= :START_YEAR_AGGREGATE
     union all
     select *
@@ -1,7 +1,10 @@
 #!/usr/bin/env python
 
 import os
+import sys
 import glob
+import time
+import datetime
 import subprocess
 import multiprocessing
 
@@ -11,11 +14,16 @@ from sqlalchemy import text as sqla_text
 
 from webservices.rest import app, db
 from webservices.config import SQL_CONFIG
+from webservices.common import cache
+from webservices.common import matviews
+from webservices.common import incremental
 from webservices.common.util import get_full_path
 
 
 manager = Manager(app)
 
+SWAP_LOCK_TIMEOUT = os.getenv('FEC_SWAP_LOCK_TIMEOUT', '30s')
+
 # The Flask app server should only be used for local testing, so we default to
 # using debug mode and auto-reload. To disable debug mode locally, pass the
 # --no-debug flag to `runserver`.
@@ -118,6 +126,7 @@ def update_schemas(processes=1):
     load_election_dates()
     execute_sql_folder('data/sql_updates/', processes=processes)
     execute_sql_file('data/rename_temporary_views.sql')
+    bump_generation()
     print("Finished DB refresh.")
 
 @manager.command
@@ -125,11 +134,64 @@ def update_functions(processes=1):
     execute_sql_folder('data/functions/', processes=processes)
 
 @manager.command
-def update_itemized(schedule):
-    print('Updating Schedule {0} tables...'.format(schedule))
-    execute_sql_file('data/sql_setup/prepare_schedule_{0}.sql'.format(schedule))
+def update_itemized(schedule, cycle=None):
+    """Rebuild itemized tables for `schedule`. For Schedules A and B, pass
+    `cycle` to rebuild only the partition for a single two-year cycle, or
+    `current` for the current cycle.
+    """
+    if cycle is None:
+        print('Updating Schedule {0} tables...'.format(schedule))
+        execute_sql_file('data/sql_setup/prepare_schedule_{0}.sql'.format(schedule))
+        swap_itemized(schedule)
+        print('Finished Schedule {0} update.'.format(schedule))
+        return
+    if schedule not in ('a', 'b'):
+        raise ValueError('Schedule {0} is not partitioned by cycle'.format(schedule))
+    year = datetime.date.today().year if cycle == 'current' else int(cycle)
+    cycle = year + year % 2
+    print('Updating Schedule {0} partition for {1}...'.format(schedule, cycle))
+    with db.engine.begin() as connection:
+        connection.execute(
+            sqla_text('select ofec_sched_{0}_create_partition(:cycle)'.format(schedule)),
+            cycle=cycle,
+        )
+    print('Finished Schedule {0} partition update.'.format(schedule))
+
+def swap_itemized(schedule):
+    """Swap in the rebuilt shadow tables for `schedule`. Fails rather than
+    waiting if queries hold locks on the current tables for longer than
+    `SWAP_LOCK_TIMEOUT`, so that requests don't queue up behind the swap.
+    """
+    print('Swapping in Schedule {0} tables...'.format(schedule))
+    with db.engine.begin() as connection:
+        connection.execute(sqla_text("select set_config('lock_timeout', :timeout, true)"), timeout=SWAP_LOCK_TIMEOUT)
+        connection.execute(sqla_text('select swap_shadow_table(:name)'), name='ofec_sched_{0}'.format(schedule))
+
+@manager.command
+def resume_itemized(schedule):
+    """Finish an interrupted update of itemized tables for `schedule`: swap in
+    the shadow tables if they were built, else rebuild them.
+    """
+    count = db.engine.execute(
+        sqla_text('select count(*) from pg_tables where tablename = :name'),
+        name='ofec_sched_{0}_shadow'.format(schedule),
+    ).scalar()
+    if not count:
+        update_itemized(schedule)
+        return
+    swap_itemized(schedule)
     print('Finished Schedule {0} update.'.format(schedule))
 
+@manager.command
+def rollback_itemized(schedule):
+    """Restore the itemized tables for `schedule` replaced by the last update.
+    """
+    print('Rolling back Schedule {0} tables...'.format(schedule))
+    with db.engine.begin() as connection:
+        connection.execute(sqla_text("select set_config('lock_timeout', :timeout, true)"), timeout=SWAP_LOCK_TIMEOUT)
+        connection.execute(sqla_text('select rollback_shadow_table(:name)'), name='ofec_sched_{0}'.format(schedule))
+    print('Finished Schedule {0} rollback.'.format(schedule))
+
 @manager.command
 def rebuild_aggregates(processes=1):
     print('Rebuilding incremental aggregates...')
@@ -137,9 +199,15 @@ def rebuild_aggregates(processes=1):
     print('Finished rebuilding incremental aggregates.')
 
 @manager.command
-def update_aggregates():
+def update_aggregates(workers=incremental.WORKERS):
+    """Apply queued changes to incremental aggregates, running independent
+    update functions concurrently if the database allows prepared transactions;
+    see `webservices.common.incremental`.
+    """
     print('Updating incremental aggregates...')
-    db.engine.execute('select update_aggregates()')
+    durations = incremental.update(db.engine, workers=int(workers))
+    for function, seconds in sorted(durations.items(), key=lambda item: -item[1]):
+        print('Ran {0} in {1:.1f}s'.format(function, seconds))
     print('Finished updating incremental aggregates.')
 
 @manager.command
@@ -156,12 +224,29 @@ def update_all(processes=1):
     update_schemas(processes=processes)
 
 @manager.command
-def refresh_materialized():
-    """Refresh materialized views."""
+def refresh_materialized(workers=matviews.WORKERS):
+    """Refresh materialized views in dependency order, refreshing independent
+    views in parallel.
+    """
     print('Refreshing materialized views...')
-    execute_sql_file('data/refresh_materialized_views.sql')
+    start = time.time()
+    durations = matviews.refresh(db.engine, workers=int(workers))
+    for view, seconds in sorted(durations.items(), key=lambda item: -item[1]):
+        print('Refreshed {0} in {1:.1f}s'.format(view, seconds))
+    print('Refreshed {0} views in {1:.1f}s ({2:.1f}s serial)'.format(
+        len(durations),
+        time.time() - start,
+        sum(durations.values()),
+    ))
+    bump_generation()
     print('Finished refreshing materialized views.')
 
+@manager.command
+def bump_generation():
+    """Increment the refresh generation, invalidating cached API responses."""
+    execute_sql_file('data/functions/generation.sql')
+    cache.bump_generation()
+
 @manager.command
 def stop_beat():
     """Kill all celery beat workers.
@@ -181,6 +266,33 @@ def start_beat():
     stop_beat().wait()
     return subprocess.Popen(['python', 'cron.py'])
 
+
+IMPORT_BENCHMARK = """
+import time
+start = time.time()
+import webservices.rest
+imported = time.time()
+webservices.rest.spec.build()
+print(imported - start, time.time() - imported)
+"""
+
+@manager.command
+def benchmark_import(runs=5):
+    """Time importing the app, and building the Swagger spec on first request,
+    in fresh interpreters.
+    """
+    runs = int(runs)
+    timings = [
+        [float(each) for each in subprocess.check_output(
+            [sys.executable, '-c', IMPORT_BENCHMARK],
+            stderr=subprocess.DEVNULL,
+        ).split()[-2:]]
+        for _ in range(runs)
+    ]
+    for label, values in zip(('Import', 'Spec'), zip(*timings)):
+        values = sorted(values)
+        print('{0}: min {1:.3f}s, median {2:.3f}s'.format(label, values[0], values[len(values) // 2]))
+
 @manager.command
 def cf_startup():
     """Start celery beat and schema migration on `cf-push`. Services are only
@@ -0,0 +1,4 @@
+import os
+
+# Cursors must be signed with a secret outside of testing; see `webservices.cursors`
+os.environ.setdefault('FEC_CURSOR_SECRET', 'test')
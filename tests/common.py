@@ -7,6 +7,7 @@ import subprocess
 import manage
 from webservices import rest
 from webservices import __API_VERSION__
+from webservices.common import cache
 
 
 TEST_CONN = os.getenv('SQLA_TEST_CONN', 'postgresql:///cfdm-unit-test')
@@ -24,6 +25,10 @@ class BaseTestCase(unittest.TestCase):
         rest.app.config['TESTING'] = True
         rest.app.config['SQLALCHEMY_DATABASE_URI'] = TEST_CONN
         rest.app.config['PRESERVE_CONTEXT_ON_EXCEPTION'] = False
+        rest.app.config['RESPONSE_CACHE_ENABLED'] = False
+        # Parallel counts run on separate connections, which cannot see rows
+        # created inside the test transaction
+        rest.app.config['PARALLEL_COUNTS'] = False
         cls.app = rest.app.test_client()
         cls.app_context = rest.app.app_context()
         cls.app_context.push()
@@ -55,6 +60,8 @@ class ApiBaseTest(BaseTestCase):
 
     def setUp(self):
         super(ApiBaseTest, self).setUp()
+        cache.reset_generation()
+        cache.clear_all()
         self.longMessage = True
         self.maxDiff = None
         self.request_context = rest.app.test_request_context()
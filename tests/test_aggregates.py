@@ -1,5 +1,9 @@
+import io
+import csv
+import decimal
+
 from webservices import schemas
-from webservices.rest import db, api
+from webservices.rest import db, api, export_resources
 from webservices.resources.aggregates import (
     ScheduleBByPurposeView,
     ScheduleEByCandidateView,
@@ -97,6 +101,53 @@ class TestAggregates(ApiBaseTest):
             self.assertEqual(results[0]['candidate']['candidate_id'], candidate.candidate_id)
 
 
+class TestAggregateExports(ApiBaseTest):
+
+    def _url(self, view, **kwargs):
+        export = next(each for each in export_resources if each.view is view)
+        return api.url_for(export, **kwargs)
+
+    def _rows(self, url):
+        response = self.app.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/csv')
+        return list(csv.DictReader(io.StringIO(response.data.decode('utf-8'))))
+
+    def test_export(self):
+        committee = factories.CommitteeHistoryFactory(cycle=2012)
+        [
+            factories.ScheduleBByPurposeFactory(
+                committee_id=committee.committee_id,
+                cycle=2012,
+                purpose='ADMINISTRATIVE',
+                total=decimal.Decimal('10.50'),
+                count=2,
+            ),
+            factories.ScheduleBByPurposeFactory(
+                committee_id=committee.committee_id,
+                cycle=2012,
+                purpose='CONTRIBUTIONS',
+            ),
+        ]
+        db.session.flush()
+        rows = self._rows(self._url(ScheduleBByPurposeView, purpose='ADMINISTRATIVE'))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['committee_id'], committee.committee_id)
+        self.assertEqual(rows[0]['purpose'], 'ADMINISTRATIVE')
+        self.assertEqual(rows[0]['total'], '10.50')
+        self.assertEqual(rows[0]['count'], '2')
+
+    def test_export_committee(self):
+        committees = [factories.CommitteeHistoryFactory(cycle=2012) for _ in range(2)]
+        [
+            factories.ScheduleBByPurposeFactory(committee_id=committee.committee_id, cycle=2012)
+            for committee in committees
+        ]
+        db.session.flush()
+        rows = self._rows(self._url(ScheduleBByPurposeView, committee_id=committees[0].committee_id))
+        self.assertEqual([row['committee_id'] for row in rows], [committees[0].committee_id])
+
+
 class TestCandidateAggregates(ApiBaseTest):
 
     def setUp(self):
@@ -187,3 +238,25 @@ class TestCandidateAggregates(ApiBaseTest):
             'state_full': 'New York',
         }
         self.assertEqual(results[0], expected)
+
+    def test_by_size_streaming(self):
+        [
+            factories.ScheduleABySizeFactory(
+                committee_id=self.committees[0].committee_id,
+                cycle=2012,
+                total=50,
+                size=size,
+            )
+            for size in [0, 200, 500]
+        ]
+        response = self._response(
+            api.url_for(
+                ScheduleABySizeCandidateView,
+                candidate_id=self.candidate.candidate_id,
+                cycle=2012,
+                per_page=0,
+                sort='size',
+            )
+        )
+        self.assertEqual([each['size'] for each in response['results']], [0, 200, 500])
+        self.assertEqual(response['pagination']['count'], 3)
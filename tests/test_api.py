@@ -4,6 +4,9 @@ from tests import factories
 from tests.common import ApiBaseTest
 
 from webservices import rest
+from webservices import utils
+from webservices.common import models
+from webservices.common import typeahead
 from webservices.rest import api
 from webservices.rest import CandidateNameSearch
 from webservices.rest import CommitteeNameSearch
@@ -84,6 +87,66 @@ class OverallTest(ApiBaseTest):
         for itm in page_two:
             self.assertIn(itm, page_one_and_two)
 
+    def test_full_text_search_ranked(self):
+        documents = [
+            ('Bartlet for America', 'D', 300),
+            ('Josiah Bartlet', 'A', 100),
+            ('Bartlet Bartlet', 'D', 200),
+            ('Abbey Bartlet', 'A', 50),
+        ]
+        for name, weight, receipts in documents:
+            candidate = factories.CandidateFactory(name=name)
+            factories.CandidateSearchFactory(
+                id=candidate.candidate_id,
+                name=name,
+                fulltxt=sa.func.setweight(sa.func.to_tsvector(name), weight),
+                receipts=receipts,
+            )
+        rest.db.session.flush()
+        results = self._results(api.url_for(CandidateList, q='bartlet'))
+        self.assertEqual(
+            [each['name'] for each in results],
+            ['Josiah Bartlet', 'Abbey Bartlet', 'Bartlet Bartlet', 'Bartlet for America'],
+        )
+        query = utils.search_text_ranked(
+            models.Candidate.query,
+            models.Candidate.candidate_id,
+            models.CandidateSearch,
+            'bartlet',
+            candidates=2,
+        )
+        self.assertEqual(
+            [each.name for each in query],
+            ['Bartlet Bartlet', 'Bartlet for America', 'Josiah Bartlet', 'Abbey Bartlet'],
+        )
+
+    def test_full_text_search_ranked_filtered(self):
+        documents = [
+            ('Bartlet for America', 'NH', 300),
+            ('Josiah Bartlet', 'NH', 200),
+            ('Abbey Bartlet', 'VT', 50),
+        ]
+        for name, state, receipts in documents:
+            candidate = factories.CandidateFactory(name=name, state=state)
+            factories.CandidateSearchFactory(
+                id=candidate.candidate_id,
+                name=name,
+                fulltxt=sa.func.to_tsvector(name),
+                receipts=receipts,
+            )
+        rest.db.session.flush()
+        response = self._response(api.url_for(CandidateList, q='bartlet', state='VT'))
+        self.assertEqual([each['name'] for each in response['results']], ['Abbey Bartlet'])
+        self.assertEqual(response['pagination']['count'], 1)
+        query = utils.search_text_ranked(
+            models.Candidate.query.filter(models.Candidate.state == 'VT'),
+            models.Candidate.candidate_id,
+            models.CandidateSearch,
+            'bartlet',
+            candidates=1,
+        )
+        self.assertEqual([each.name for each in query], ['Abbey Bartlet'])
+
     # Typeahead name search
     def test_typeahead_candidate_search(self):
         [
@@ -101,6 +164,43 @@ class OverallTest(ApiBaseTest):
         for each in results:
             self.assertIn('bartlet', each['name'].lower())
 
+    def test_typeahead_index_matches_database(self):
+        documents = [
+            ('Josiah Bartlet', 'A'),
+            ('Bartlet for America', 'D'),
+            ('Friends of Bartlet America Bartlet', 'B'),
+            ('Josiah Smith', 'D'),
+        ]
+        for name, weight in documents:
+            factories.CommitteeSearchFactory(
+                name=name,
+                fulltxt=sa.func.setweight(sa.func.to_tsvector(name), weight),
+            )
+        rest.db.session.flush()
+        for query in ['bartlet', 'bartlet am', 'josiah', 'friends bart']:
+            expected = rest.search_typeahead_text(models.CommitteeSearch, query)['results']
+            observed = typeahead.search(models.CommitteeSearch, query)
+            self.assertEqual(
+                [each.name for each in observed],
+                [each.name for each in expected],
+            )
+
+    def test_typeahead_index_normalizes_unindexed_words(self):
+        for name in ['Committee to Elect Bartlet', 'Josiah for America']:
+            factories.CommitteeSearchFactory(
+                name=name,
+                fulltxt=sa.func.to_tsvector(name),
+            )
+        rest.db.session.flush()
+        for query in ['the bartlet', 'elected bartlet', 'bartlet elected', 'bartlet the']:
+            expected = rest.search_typeahead_text(models.CommitteeSearch, query)['results']
+            observed = typeahead.search(models.CommitteeSearch, query)
+            self.assertTrue(expected)
+            self.assertEqual(
+                [each.name for each in observed],
+                [each.name for each in expected],
+            )
+
     def test_typeahead_committee_search(self):
         [
             factories.CommitteeSearchFactory(
@@ -0,0 +1,100 @@
+import json
+from unittest import mock
+
+from tests import factories
+from tests.common import ApiBaseTest
+
+from webservices.rest import db
+from webservices.rest import api
+from webservices.resources import batch
+from webservices.resources.batch import BatchView
+from webservices.resources.committees import CommitteeView
+
+
+class TestBatch(ApiBaseTest):
+
+    def _post(self, requests):
+        return self.app.post(
+            api.url_for(BatchView),
+            data=json.dumps({'requests': requests}),
+            content_type='application/json',
+        )
+
+    def test_batch(self):
+        candidate = factories.CandidateDetailFactory()
+        committees = [factories.CommitteeDetailFactory() for _ in range(3)]
+        db.session.flush()
+        paths = ['/candidate/{0}/'.format(candidate.candidate_id)] + [
+            '/committee/{0}/'.format(committee.committee_id)
+            for committee in committees
+        ]
+        response = self._post(paths + ['/committee/C00000000/?per_page=200'])
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.data.decode('utf-8'))['results']
+        self.assertEqual(set(results), set(paths + ['/committee/C00000000/?per_page=200']))
+        self.assertEqual(results[paths[0]]['status'], 200)
+        self.assertEqual(results[paths[0]]['data']['results'][0]['candidate_id'], candidate.candidate_id)
+        for path, committee in zip(paths[1:], committees):
+            self.assertEqual(results[path]['data']['results'][0]['committee_id'], committee.committee_id)
+        self.assertEqual(results['/committee/C00000000/?per_page=200']['status'], 422)
+
+    def test_unknown_path(self):
+        response = self._post(['/nope/'])
+        self.assertEqual(response.status_code, 422)
+
+    def test_max_requests(self):
+        response = self._post(['/candidates/'] * (batch.MAX_REQUESTS + 1))
+        self.assertEqual(response.status_code, 422)
+
+    def test_export_rejected(self):
+        paths = [
+            '/schedules/schedule_a/?export=csv',
+            '/candidates/?per_page=0',
+            '/candidates/?per_page=00',
+            '/candidates/?per_page=-1',
+            '/schedules/schedule_b/by_purpose/export/',
+        ]
+        for path in paths:
+            response = self._post([path])
+            self.assertEqual(response.status_code, 422)
+
+    def test_failed_request(self):
+        candidate = factories.CandidateDetailFactory()
+        committee = factories.CommitteeDetailFactory()
+        db.session.flush()
+
+        def fail(*args, **kwargs):
+            db.session.execute('select 1 / 0')
+
+        failed = '/committee/{0}/'.format(committee.committee_id)
+        path = '/candidate/{0}/'.format(candidate.candidate_id)
+        with mock.patch.object(CommitteeView, 'get_committee', side_effect=fail):
+            response = self._post([failed, path])
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.data.decode('utf-8'))['results']
+        self.assertEqual(results[failed]['status'], 500)
+        self.assertEqual(results[path]['status'], 200)
+        self.assertEqual(results[path]['data']['results'][0]['candidate_id'], candidate.candidate_id)
+
+    def test_failed_response(self):
+        candidate = factories.CandidateDetailFactory()
+        committee = factories.CommitteeDetailFactory()
+        db.session.flush()
+
+        failed = '/committee/{0}/'.format(committee.committee_id)
+        path = '/candidate/{0}/'.format(candidate.candidate_id)
+        loads = batch.ujson.loads
+        calls = []
+
+        def fail(body):
+            calls.append(body)
+            if len(calls) == 1:
+                raise ValueError('Invalid JSON')
+            return loads(body)
+
+        with mock.patch.object(batch.ujson, 'loads', side_effect=fail):
+            response = self._post([failed, path])
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.data.decode('utf-8'))['results']
+        self.assertEqual(results[failed]['status'], 500)
+        self.assertEqual(results[path]['status'], 200)
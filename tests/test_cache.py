@@ -0,0 +1,104 @@
+import unittest
+from unittest import mock
+
+from tests import factories
+from tests.common import ApiBaseTest
+
+from webservices import rest
+from webservices.rest import api
+from webservices.common import cache
+from webservices.resources.candidates import CandidateList
+
+
+class TestLocalCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used(self):
+        store = cache.LocalCache(maxsize=2)
+        store.set('a', 1)
+        store.set('b', 2)
+        store.get('a')
+        store.set('c', 3)
+        self.assertEqual(store.get('a'), 1)
+        self.assertIsNone(store.get('b'))
+        self.assertEqual(store.get('c'), 3)
+
+    def test_expires(self):
+        store = cache.LocalCache(ttl=10)
+        with mock.patch('time.time', return_value=100):
+            store.set('a', 1)
+        with mock.patch('time.time', return_value=105):
+            self.assertEqual(store.get('a'), 1)
+        with mock.patch('time.time', return_value=111):
+            self.assertIsNone(store.get('a'))
+
+    def test_make_key_normalizes_order(self):
+        self.assertEqual(
+            cache.make_key('/v1/candidates/', {'party': ['DEM'], 'page': 1}),
+            cache.make_key('/v1/candidates/', {'page': 1, 'party': ['DEM']}),
+        )
+        self.assertNotEqual(
+            cache.make_key('/v1/candidates/', {'sort': ['name', 'party']}),
+            cache.make_key('/v1/candidates/', {'sort': ['party', 'name']}),
+        )
+
+
+class TestResponseCache(ApiBaseTest):
+
+    def setUp(self):
+        super().setUp()
+        rest.app.config['RESPONSE_CACHE_ENABLED'] = True
+
+    def tearDown(self):
+        rest.app.config['RESPONSE_CACHE_ENABLED'] = False
+        super().tearDown()
+
+    def test_cached_until_refresh(self):
+        factories.CandidateFactory()
+        self.assertEqual(len(self._results(api.url_for(CandidateList))), 1)
+        factories.CandidateFactory()
+        self.assertEqual(len(self._results(api.url_for(CandidateList))), 1)
+        cache.bump_generation()
+        self.assertEqual(len(self._results(api.url_for(CandidateList))), 2)
+
+    def test_cached_by_arguments(self):
+        factories.CandidateFactory(party='DEM')
+        factories.CandidateFactory(party='REP')
+        self.assertEqual(len(self._results(api.url_for(CandidateList, party='DEM'))), 1)
+        self.assertEqual(len(self._results(api.url_for(CandidateList))), 2)
+
+
+class TestConditionalRequests(ApiBaseTest):
+
+    def test_etag_not_modified(self):
+        factories.CandidateFactory()
+        url = api.url_for(CandidateList)
+        response = self.app.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertIn('Last-Modified', response.headers)
+        response = self.app.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.data, b'')
+
+    def test_etag_changes_with_arguments(self):
+        url = api.url_for(CandidateList)
+        etag = self.app.get(url).headers['ETag']
+        response = self.app.get(api.url_for(CandidateList, party='DEM'), headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_etag_changes_with_generation(self):
+        url = api.url_for(CandidateList)
+        etag = self.app.get(url).headers['ETag']
+        cache.bump_generation()
+        response = self.app.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since(self):
+        url = api.url_for(CandidateList)
+        last_modified = self.app.get(url).headers['Last-Modified']
+        response = self.app.get(url, headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 304)
+        response = self.app.get(url, headers={'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'})
+        self.assertEqual(response.status_code, 200)
@@ -184,6 +184,21 @@ class CandidateFormatTest(ApiBaseTest):
             response = self._response(page)
             self.assertGreater(original_count, response['pagination']['count'])
 
+    def test_name_fuzzy(self):
+        bartlet = factories.CandidateFactory(name='BARTLET, JOSIAH')
+        factories.CandidateFactory(name='BARTLETT, JOSIAH')
+        factories.CandidateFactory(name='HOYNES, JOHN')
+        results = self._results(api.url_for(CandidateList, name='bartlet'))
+        self.assertEqual(len(results), 2)
+        results = self._results(api.url_for(CandidateList, name='bartlet, josiah', name_fuzzy=True))
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['candidate_id'], bartlet.candidate_id)
+        results = self._results(api.url_for(CandidateList, name='bartlwt josiah', name_fuzzy=True))
+        self.assertEqual(
+            set(each['name'] for each in results),
+            {'BARTLET, JOSIAH', 'BARTLETT, JOSIAH'},
+        )
+
     def test_candidate_history_by_year(self):
         key = 0
         id = 'id0'
@@ -1,3 +1,4 @@
+import json
 import datetime
 
 from webservices.rest import api
@@ -32,6 +33,22 @@ class TestFilings(ApiBaseTest):
         results = self._results(api.url_for(FilingsList))
         self.assertEqual(len(results), 2)
 
+    def test_filings_post(self):
+        [
+            factories.FilingsFactory(committee_id='C001'),
+            factories.FilingsFactory(committee_id='C002'),
+            factories.FilingsFactory(committee_id='C003'),
+        ]
+        committee_ids = ['C001', 'C002'] + ['C{0:08d}'.format(idx) for idx in range(2000)]
+        response = self.app.post(
+            api.url_for(FilingsList),
+            data=json.dumps({'committee_id': committee_ids, 'sort': 'committee_id'}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.data.decode('utf-8'))['results']
+        self.assertEqual([each['committee_id'] for each in results], ['C001', 'C002'])
+
     def test_filter_date(self):
         [
             factories.FilingsFactory(receipt_date=datetime.date(2012, 1, 1)),
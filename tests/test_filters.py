@@ -2,6 +2,7 @@ from tests import factories
 from tests.common import ApiBaseTest
 
 from webservices import filters
+from webservices.common import util
 from webservices.common import models
 
 
@@ -46,3 +47,23 @@ class TestFilter(ApiBaseTest):
             {'contributor_type': ['individual', 'committee']},
         )
         self.assertEqual(set(query.all()), set(self.receipts))
+
+    def test_filter_multi_binds_array(self):
+        query = filters.filter_multi(
+            models.ScheduleA.query,
+            {'entity_type': ['IND', 'PAC']},
+            [('entity_type', models.ScheduleA.entity_type)],
+        )
+        self.assertEqual(
+            set(query.all()),
+            set(each for each in self.receipts if each.entity_type in ['IND', 'PAC'])
+        )
+
+    def test_any_of_statement_independent_of_length(self):
+        column = models.ScheduleA.entity_type
+        statements = [
+            str(models.ScheduleA.query.filter(util.any_of(column, values)).statement)
+            for values in (['IND'], ['IND', 'PAC', 'COM'])
+        ]
+        self.assertEqual(statements[0], statements[1])
+        self.assertIn('= any(', statements[0].lower())
@@ -1,5 +1,6 @@
 import datetime
 import unittest
+from unittest import mock
 
 import sqlalchemy as sa
 from sqlalchemy.ext.automap import automap_base
@@ -12,8 +13,13 @@ from apispec import utils, exceptions
 import manage
 from tests import common
 from webservices.rest import db
-from webservices.spec import spec
+from webservices import spec
+from webservices import utils as api_utils
+from webservices.common import views
 from webservices.common import models
+from webservices.common import matviews
+from webservices.common import incremental
+from webservices.resources.sched_a import ScheduleAView
 
 
 def make_factory():
@@ -61,7 +67,7 @@ class TestSwagger(unittest.TestCase):
 
     def test_swagger_valid(self):
         try:
-            utils.validate_swagger(spec)
+            utils.validate_swagger(spec.build())
         except exceptions.SwaggerError as error:
             self.fail(str(error))
 
@@ -81,7 +87,9 @@ class TestViews(common.IntegrationTestCase):
             self.assertGreater(model.query.count(), 0)
 
     def test_refresh_materialized(self):
-        db.session.execute('select refresh_materialized()')
+        durations = matviews.refresh(db.engine, workers=2)
+        views = db.engine.execute("select matviewname from pg_matviews where schemaname = 'public'").fetchall()
+        self.assertEqual(set(durations), set(row[0] for row in views))
 
     def test_committee_year_filter(self):
         self._check_entity_model(models.Committee, 'committee_key')
@@ -182,6 +190,77 @@ class TestViews(common.IntegrationTestCase):
             0,
         )
 
+    def test_sched_a_partitions(self):
+        query = models.ScheduleA.query.filter(models.ScheduleA.report_year.in_([2015, 2016]))
+        count = query.count()
+        db.session.commit()
+        manage.update_itemized('a', cycle=2016)
+        self.assertEqual(query.count(), count)
+        plan = db.session.execute('explain select * from ofec_sched_a where rpt_yr = 2016').fetchall()
+        plan = '\n'.join(row[0] for row in plan)
+        self.assertIn('ofec_sched_a_2016', plan)
+        self.assertNotIn('ofec_sched_a_2014', plan)
+
+    def test_sched_a_fulltext_ordered_scans(self):
+        per_page = 20
+        kwargs = {
+            'contributor_name': 'john',
+            'cycle': [2016],
+            'sort': '-contribution_receipt_date',
+            'sort_hide_null': False,
+            'sort_nulls_large': True,
+            'per_page': per_page,
+            'last_index': None,
+            'last_contribution_receipt_date': None,
+        }
+        view = ScheduleAView()
+        query = view.build_query(_apply_options=False, **kwargs)
+        query = api_utils.fetch_seek_page(query, kwargs, view.index_column, count=-1, eager=False).results
+        compiled = query.statement.compile(dialect=db.engine.dialect)
+        with views.ordered_scans(db.session):
+            plan = db.session.connection().execute(
+                'explain (analyze, format json) {0}'.format(compiled),
+                compiled.params,
+            ).scalar()
+        nodes = list(self._plan_nodes(plan[0]['Plan']))
+        for node in nodes:
+            self.assertFalse(node['Node Type'].startswith('Bitmap'))
+            self.assertNotEqual(node['Node Type'], 'Sort')
+        scans = [node for node in nodes if node['Node Type'].endswith('Scan')]
+        self.assertTrue(scans)
+        for node in scans:
+            self.assertNotEqual(node.get('Relation Name'), 'ofec_sched_a_2014')
+            # Each partition scan stops after a page, plus the row that Merge
+            # Append reads ahead
+            self.assertLessEqual(node['Actual Rows'], per_page + 1)
+
+    def _plan_nodes(self, node):
+        yield node
+        for child in node.get('Plans', []):
+            yield from self._plan_nodes(child)
+
+    def _table_exists(self, name):
+        return db.session.execute(
+            'select count(*) from pg_tables where tablename = :name',
+            {'name': name},
+        ).scalar() > 0
+
+    def test_itemized_swap(self):
+        count = models.ScheduleE.query.count()
+        db.session.commit()
+        manage.update_itemized('e')
+        self.assertTrue(self._table_exists('ofec_sched_e_previous'))
+        self.assertFalse(self._table_exists('ofec_sched_e_shadow'))
+        self.assertEqual(models.ScheduleE.query.count(), count)
+        db.session.commit()
+        manage.rollback_itemized('e')
+        self.assertTrue(self._table_exists('ofec_sched_e_shadow'))
+        self.assertFalse(self._table_exists('ofec_sched_e_previous'))
+        db.session.commit()
+        manage.resume_itemized('e')
+        self.assertFalse(self._table_exists('ofec_sched_e_shadow'))
+        self.assertEqual(models.ScheduleE.query.count(), count)
+
     def _check_update_aggregate_create(self, item_key, total_key, total_model, value):
         filing = self.SchedAFactory(**{
             'rpt_yr': 2015,
@@ -340,13 +419,70 @@ class TestViews(common.IntegrationTestCase):
         db.session.execute(ins)
         db.session.flush()
         db.session.execute('select update_aggregates()')
-        db.session.execute('refresh materialized view ofec_totals_house_senate_mv')
         db.session.execute('refresh materialized view ofec_sched_a_aggregate_size_merged_mv')
         db.session.refresh(existing)
         # Updated total includes new Schedule A filing and new report
         self.assertAlmostEqual(existing.total, total + 75 + 20)
         self.assertEqual(existing.count, None)
 
+    def test_update_totals_reports(self):
+        dc = sa.Table('dimcmte', db.metadata, autoload=True, autoload_with=db.engine)
+        db.session.execute(
+            dc.insert().values(
+                cmte_sk=8,
+                cmte_id='C00000008',
+                load_date=datetime.datetime.now(),
+            )
+        )
+        rep = sa.Table('facthousesenate_f3', db.metadata, autoload=True, autoload_with=db.engine)
+        db.session.execute(
+            rep.insert().values(
+                cmte_sk=8,
+                indv_unitem_contb_per=20,
+                facthousesenate_f3_sk=8,
+                two_yr_period_sk=2016,
+                load_date=datetime.datetime.now(),
+            )
+        )
+        db.session.flush()
+        db.session.execute('select update_aggregates()')
+        totals = models.CommitteeTotalsHouseSenate.query.filter_by(committee_id='C00000008', cycle=2016).all()
+        self.assertEqual(len(totals), 1)
+        self.assertEqual(totals[0].individual_unitemized_contributions, 20)
+        reports = models.CommitteeReportsHouseSenate.query.filter_by(committee_id='C00000008', cycle=2016).all()
+        self.assertEqual(len(reports), 1)
+        self.assertEqual(db.session.execute('select count(*) from ofec_totals_reports_queue').scalar(), 0)
+
+    def test_update_totals_reports_dimension(self):
+        dc = sa.Table('dimcmte', db.metadata, autoload=True, autoload_with=db.engine)
+        db.session.execute(
+            dc.insert().values(
+                cmte_sk=9,
+                cmte_id='C00000009',
+                load_date=datetime.datetime.now(),
+            )
+        )
+        rep = sa.Table('facthousesenate_f3', db.metadata, autoload=True, autoload_with=db.engine)
+        db.session.execute(
+            rep.insert().values(
+                cmte_sk=9,
+                indv_unitem_contb_per=20,
+                facthousesenate_f3_sk=9,
+                two_yr_period_sk=2016,
+                load_date=datetime.datetime.now(),
+            )
+        )
+        db.session.flush()
+        db.session.execute('select update_aggregates()')
+        db.session.execute(dc.update().where(dc.c.cmte_sk == 9).values(cmte_id='C00000010'))
+        db.session.flush()
+        db.session.execute('select update_aggregates()')
+        query = models.CommitteeTotalsHouseSenate.query.filter_by(cycle=2016)
+        self.assertEqual(query.filter_by(committee_id='C00000009').count(), 0)
+        totals = query.filter_by(committee_id='C00000010').all()
+        self.assertEqual(len(totals), 1)
+        self.assertEqual(totals[0].individual_unitemized_contributions, 20)
+
     def test_update_aggregate_purpose_create(self):
         filing = self.SchedBFactory(
             rpt_yr=2015,
@@ -379,6 +515,129 @@ class TestViews(common.IntegrationTestCase):
         self.assertEqual(rows[0].total, 0)
         self.assertEqual(rows[0].count, 0)
 
+    def test_update_aggregates_concurrently(self):
+        self.SchedBFactory(
+            rpt_yr=2015,
+            cmte_id='C12346',
+            disb_amt=538,
+            disb_desc='CAMPAIGN BUTTONS',
+        )
+        db.session.commit()
+        durations = incremental.update(db.engine, workers=2)
+        self.assertEqual(set(durations), set(incremental.UPDATERS))
+        rows = models.ScheduleBByPurpose.query.filter_by(
+            cycle=2016,
+            committee_id='C12346',
+            purpose='MATERIALS',
+        ).all()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0].total, 538)
+        for queue in incremental.QUEUES:
+            self.assertEqual(db.session.execute('select count(*) from {0}'.format(queue)).scalar(), 0)
+
+    def _fail_commit_prepared(self, fail):
+        commit = sa.engine.Connection._commit_twophase_impl
+
+        def commit_twophase(connection, xid, is_prepared):
+            if fail(xid):
+                raise sa.exc.OperationalError('commit prepared', {}, Exception(xid))
+            return commit(connection, xid, is_prepared)
+        return mock.patch.object(sa.engine.Connection, '_commit_twophase_impl', commit_twophase)
+
+    def _purpose_totals(self, committee_id):
+        return [
+            row.total for row in models.ScheduleBByPurpose.query.filter_by(
+                cycle=2016,
+                committee_id=committee_id,
+                purpose='MATERIALS',
+            )
+        ]
+
+    def test_update_aggregates_recover(self):
+        if incremental.prepared_capacity(db.engine) <= len(incremental.UPDATERS):
+            self.skipTest('Prepared transactions are not enabled')
+        self.SchedBFactory(
+            rpt_yr=2015,
+            cmte_id='C12347',
+            disb_amt=538,
+            disb_desc='CAMPAIGN BUTTONS',
+        )
+        db.session.commit()
+        # Stop after the queue transaction commits
+        with self._fail_commit_prepared(lambda xid: not xid.endswith(':queues')):
+            with self.assertRaises(sa.exc.OperationalError):
+                incremental.update(db.engine, workers=2)
+        db.session.commit()
+        self.assertEqual(self._purpose_totals('C12347'), [])
+        self.assertEqual(list(incremental.recover(db.engine).values()), [True])
+        self.assertEqual(self._purpose_totals('C12347'), [538])
+        incremental.update(db.engine, workers=2)
+        db.session.commit()
+        self.assertEqual(self._purpose_totals('C12347'), [538])
+
+    def test_update_aggregates_recover_rollback(self):
+        if incremental.prepared_capacity(db.engine) <= len(incremental.UPDATERS):
+            self.skipTest('Prepared transactions are not enabled')
+        self.SchedBFactory(
+            rpt_yr=2015,
+            cmte_id='C12348',
+            disb_amt=538,
+            disb_desc='CAMPAIGN BUTTONS',
+        )
+        db.session.commit()
+        # Stop before the queue transaction commits
+        with self._fail_commit_prepared(lambda xid: True):
+            with self.assertRaises(sa.exc.OperationalError):
+                incremental.update(db.engine, workers=2)
+        db.session.commit()
+        self.assertEqual(incremental.recover(db.engine), {})
+        self.assertEqual(self._purpose_totals('C12348'), [])
+        incremental.update(db.engine, workers=2)
+        db.session.commit()
+        self.assertEqual(self._purpose_totals('C12348'), [538])
+
+    def test_update_aggregates_recover_crash(self):
+        if incremental.prepared_capacity(db.engine) <= len(incremental.UPDATERS):
+            self.skipTest('Prepared transactions are not enabled')
+        self.SchedBFactory(
+            rpt_yr=2015,
+            cmte_id='C12349',
+            disb_amt=538,
+            disb_desc='CAMPAIGN BUTTONS',
+        )
+        db.session.commit()
+        prepare = sa.engine.Connection._prepare_twophase_impl
+
+        def prepare_twophase(connection, xid):
+            if xid.endswith(':' + incremental.UPDATERS[1]):
+                raise sa.exc.OperationalError('prepare', {}, Exception(xid))
+            return prepare(connection, xid)
+
+        def rollback_twophase(connection, xid, is_prepared):
+            raise sa.exc.OperationalError('rollback', {}, Exception(xid))
+
+        # Stop after some updaters are prepared, leaving them prepared as if
+        # the process had died
+        with mock.patch.object(sa.engine.Connection, '_prepare_twophase_impl', prepare_twophase):
+            with mock.patch.object(sa.engine.Connection, '_rollback_twophase_impl', rollback_twophase):
+                with self.assertRaises(sa.exc.OperationalError):
+                    incremental.update(db.engine, workers=2)
+        db.session.commit()
+        self.assertEqual(list(incremental.recover(db.engine).values()), [False])
+        self.assertEqual(self._purpose_totals('C12349'), [])
+        incremental.update(db.engine, workers=2)
+        db.session.commit()
+        self.assertEqual(self._purpose_totals('C12349'), [538])
+
+    def test_update_aggregates_locked(self):
+        with db.engine.connect() as connection:
+            connection.execute(sa.text(incremental.LOCK_SQL), name=incremental.XID_PREFIX)
+            try:
+                with self.assertRaises(RuntimeError):
+                    incremental.update(db.engine, workers=2)
+            finally:
+                connection.execute(sa.text(incremental.UNLOCK_SQL), name=incremental.XID_PREFIX)
+
     def test_update_aggregate_purpose_existing(self):
         existing = models.ScheduleBByPurpose.query.filter_by(
             purpose='CONTRIBUTIONS',
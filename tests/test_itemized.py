@@ -1,4 +1,8 @@
+import io
+import csv
+import json
 import datetime
+from unittest import mock
 
 import sqlalchemy as sa
 
@@ -6,6 +10,8 @@ from tests import factories
 from tests.common import ApiBaseTest
 
 from webservices.rest import api
+from webservices.common import views
+from webservices.common import counts
 from webservices.schemas import ScheduleASchema
 from webservices.schemas import ScheduleBSchema
 from webservices.resources.sched_a import ScheduleAView
@@ -80,6 +86,55 @@ class TestItemized(ApiBaseTest):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]['contributor_name'], 'George Soros')
 
+    def test_filter_fulltext_ordered_scans(self):
+        dates = [datetime.date(2015, 1, day) for day in (3, 1, 2)]
+        [
+            factories.ScheduleAFactory(
+                contributor_name='George Soros',
+                contributor_name_text=sa.func.to_tsvector('George Soros'),
+                contribution_receipt_date=date,
+            )
+            for date in dates
+        ]
+        factories.ScheduleAFactory(
+            contributor_name='David Koch',
+            contributor_name_text=sa.func.to_tsvector('David Koch'),
+            contribution_receipt_date=datetime.date(2015, 1, 4),
+        )
+        with mock.patch('webservices.common.views.FULLTEXT_SEEK_THRESHOLD', 0):
+            with mock.patch('webservices.common.views.ordered_scans', wraps=views.ordered_scans) as ordered:
+                results = self._results(
+                    api.url_for(
+                        ScheduleAView,
+                        contributor_name='soros',
+                        sort='-contribution_receipt_date',
+                    )
+                )
+        self.assertTrue(ordered.called)
+        self.assertEqual(
+            [each['contribution_receipt_date'] for each in results],
+            ['2015-01-03', '2015-01-02', '2015-01-01'],
+        )
+
+    def test_filter_fulltext_skip_count(self):
+        factories.ScheduleAFactory(
+            contributor_name='George Soros',
+            contributor_name_text=sa.func.to_tsvector('George Soros'),
+        )
+        with mock.patch('webservices.common.views.FULLTEXT_SEEK_THRESHOLD', 0):
+            with mock.patch.object(counts, 'explain', wraps=counts.explain) as explain:
+                results = self._results(api.url_for(ScheduleAView, contributor_name='soros', skip_count=True))
+        self.assertFalse(explain.called)
+        self.assertEqual(len(results), 1)
+
+    def test_filter_cycle(self):
+        [
+            factories.ScheduleAFactory(report_year=year)
+            for year in (2013, 2014, 2015, 2016)
+        ]
+        results = self._results(api.url_for(ScheduleAView, cycle=2016))
+        self.assertEqual(sorted(each['report_year'] for each in results), [2015, 2016])
+
     def test_filter_fulltext_employer(self):
         employers = ['Acme Corporation', 'Vandelay Industries']
         filings = [
@@ -124,6 +179,118 @@ class TestItemized(ApiBaseTest):
             [each.sched_a_sk for each in filings[20:]],
         )
 
+    def test_pagination_cursor(self):
+        receipts = [
+            factories.ScheduleAFactory(contribution_receipt_date=datetime.date(2012, 1, day % 28 + 1))
+            for day in range(30)
+        ]
+
+        def url(**kwargs):
+            return api.url_for(ScheduleAView, sort='contribution_receipt_date', **kwargs)
+
+        page1 = self._response(url())
+        self.assertEqual(len(page1['results']), 20)
+        page2 = self._response(url(cursor=page1['pagination']['next_cursor']))
+        self.assertEqual(len(page2['results']), 10)
+        self.assertIsNone(page2['pagination']['next_cursor'])
+        self.assertEqual(
+            set(each['sched_a_sk'] for each in page1['results'] + page2['results']),
+            set(each.sched_a_sk for each in receipts),
+        )
+
+    def test_pagination_cursor_mismatch(self):
+        [factories.ScheduleAFactory() for _ in range(30)]
+        page1 = self._response(api.url_for(ScheduleAView))
+        cursor = page1['pagination']['next_cursor']
+        response = self.app.get(api.url_for(ScheduleAView, contributor_state='CA', cursor=cursor))
+        self.assertEqual(response.status_code, 422)
+        self.assertIn(b'does not match', response.data)
+        response = self.app.get(api.url_for(ScheduleAView, cursor=cursor[:-2] + 'xx'))
+        self.assertEqual(response.status_code, 422)
+
+    def test_pagination_count_cached(self):
+        [factories.ScheduleAFactory() for _ in range(30)]
+        with mock.patch.object(counts, 'explain', wraps=counts.explain) as explain:
+            page1 = self._response(api.url_for(ScheduleAView))
+            page2 = self._response(api.url_for(ScheduleAView, last_index=page1['results'][-1]['sched_a_sk']))
+        self.assertEqual(explain.call_count, 1)
+        self.assertEqual(page1['pagination']['count'], 30)
+        self.assertEqual(page2['pagination']['count'], 30)
+
+    def test_pagination_skip_count(self):
+        [factories.ScheduleAFactory() for _ in range(3)]
+        with mock.patch.object(counts, 'explain', wraps=counts.explain) as explain:
+            response = self._response(api.url_for(ScheduleAView, skip_count=True))
+        self.assertFalse(explain.called)
+        self.assertEqual(len(response['results']), 3)
+        self.assertEqual(response['pagination']['count'], -1)
+
+    def test_multiple_committees(self):
+        committee_ids = ['C{0:08d}'.format(each) for each in range(6)]
+        [
+            factories.ScheduleAFactory(committee_id=committee_id)
+            for committee_id in committee_ids
+            for _ in range(2)
+        ]
+        response = self._response(api.url_for(ScheduleAView, committee_id=committee_ids))
+        self.assertEqual(len(response['results']), 12)
+        self.assertEqual(response['pagination']['count'], 12)
+
+    def test_multiple_committees_cap(self):
+        committee_ids = ['C{0:08d}'.format(each) for each in range(51)]
+        response = self.app.get(api.url_for(ScheduleAView, committee_id=committee_ids))
+        self.assertEqual(response.status_code, 422)
+
+    def test_multiple_committees_post(self):
+        committee_ids = ['C{0:08d}'.format(each) for each in range(views.MAX_COMMITTEES + 10)]
+        [
+            factories.ScheduleAFactory(committee_id=committee_id)
+            for committee_id in committee_ids[:3] + ['C99999999']
+        ]
+        response = self.app.post(
+            api.url_for(ScheduleAView),
+            data=json.dumps({'committee_id': committee_ids, 'fields': ['committee_id']}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.data.decode('utf-8'))['results']
+        self.assertEqual(
+            sorted(results, key=lambda each: each['committee_id']),
+            [{'committee_id': committee_id} for committee_id in committee_ids[:3]],
+        )
+
+    def test_export_ndjson(self):
+        receipts = [
+            factories.ScheduleAFactory(contributor_state='CA', contribution_receipt_date=datetime.date(2012, 1, day))
+            for day in range(1, 4)
+        ]
+        factories.ScheduleAFactory(contributor_state='NY')
+        response = self.app.get(
+            api.url_for(ScheduleAView, contributor_state='CA', export='ndjson', sort='-contribution_receipt_date')
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        self.assertEqual(
+            [each['sched_a_sk'] for each in lines],
+            [each.sched_a_sk for each in receipts[::-1]],
+        )
+        self.assertNotIn('pagination', lines[0])
+
+    def test_export_csv(self):
+        [factories.ScheduleAFactory(contributor_name='Jed Bartlet') for _ in range(3)]
+        response = self.app.get(api.url_for(ScheduleAView, export='csv', fields='sched_a_sk,contributor_name'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(response.data.decode('utf-8'))))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(set(rows[0].keys()), {'sched_a_sk', 'contributor_name'})
+        self.assertEqual(rows[0]['contributor_name'], 'Jed Bartlet')
+
+    def test_export_bad_format(self):
+        response = self.app.get(api.url_for(ScheduleAView, export='xml'))
+        self.assertEqual(response.status_code, 422)
+
     def test_pagination_bad_per_page(self):
         response = self.app.get(api.url_for(ScheduleAView, per_page=999))
         self.assertEqual(response.status_code, 422)
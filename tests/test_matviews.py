@@ -0,0 +1,62 @@
+import time
+import threading
+import unittest
+
+from webservices.common import matviews
+
+
+class TestMatviews(unittest.TestCase):
+
+    def test_view_dependencies(self):
+        edges = [
+            ('ofec_filings_mv', 'ofec_committee_detail_mv'),
+            ('ofec_filings_mv', 'ofec_filings_v'),
+            ('ofec_filings_v', 'ofec_candidate_detail_mv'),
+            ('ofec_committee_detail_mv', 'ofec_committee_detail_mv'),
+        ]
+        views = ['ofec_filings_mv', 'ofec_committee_detail_mv', 'ofec_candidate_detail_mv']
+        self.assertEqual(
+            matviews.view_dependencies(views, edges),
+            {
+                'ofec_filings_mv': {'ofec_committee_detail_mv', 'ofec_candidate_detail_mv'},
+                'ofec_committee_detail_mv': set(),
+                'ofec_candidate_detail_mv': set(),
+            },
+        )
+
+    def test_run_order(self):
+        dependencies = {
+            'totals': set(),
+            'committees': set(),
+            'elections': {'totals', 'committees'},
+            'filings': {'committees'},
+        }
+        finished = []
+        lock = threading.Lock()
+
+        def refresh(view):
+            for dependency in dependencies[view]:
+                self.assertIn(dependency, finished)
+            time.sleep(0.01)
+            with lock:
+                finished.append(view)
+
+        durations = matviews.run(dependencies, refresh, workers=2)
+        self.assertEqual(set(durations), set(dependencies))
+        self.assertEqual(sorted(finished), sorted(dependencies))
+
+    def test_run_failure(self):
+        refreshed = []
+
+        def refresh(view):
+            if view == 'committees':
+                raise RuntimeError('failed')
+            refreshed.append(view)
+
+        with self.assertRaises(RuntimeError):
+            matviews.run({'committees': set(), 'filings': {'committees'}}, refresh, workers=1)
+        self.assertEqual(refreshed, [])
+
+    def test_run_cycle(self):
+        with self.assertRaises(ValueError):
+            matviews.run({'a': {'b'}, 'b': {'a'}}, lambda view: None)
@@ -0,0 +1,61 @@
+import datetime
+import decimal
+
+import marshmallow_sqlalchemy as ma_sqla
+
+from tests import factories
+from tests.common import ApiBaseTest
+
+from webservices import schemas
+from webservices.rest import db
+
+
+class TestSerializers(ApiBaseTest):
+
+    def assertParity(self, schema, objs):
+        fast = schema().dump(objs, many=True).data
+        slow = ma_sqla.ModelSchema.dump(schema(), objs, many=True).data
+        self.assertEqual(fast, slow)
+        self.assertEqual([list(each.keys()) for each in fast], [list(each.keys()) for each in slow])
+        self.assertEqual(schema().dump(objs[0]).data, slow[0])
+
+    def test_schedule_a(self):
+        committee = factories.CommitteeHistoryFactory()
+        db.session.flush()
+        receipts = [
+            factories.ScheduleAFactory(
+                committee_id=committee.committee_id,
+                contribution_receipt_date=datetime.date(2012, 1, 1),
+                contribution_receipt_amount=decimal.Decimal('100.505'),
+                contributor_name='Robert Ford',
+            ),
+            factories.ScheduleAFactory(),
+        ]
+        db.session.flush()
+        self.assertParity(schemas.ScheduleASchema, receipts)
+
+    def test_committee_totals(self):
+        totals = [
+            factories.TotalsPresidentialFactory(cycle=2012, receipts=decimal.Decimal('12.34')),
+            factories.TotalsPresidentialFactory(cycle=2016),
+        ]
+        db.session.flush()
+        self.assertParity(schemas.CommitteeTotalsPresidentialSchema, totals)
+
+    def test_candidate_search(self):
+        candidate = factories.CandidateFactory(election_years=[2012, 2016])
+        db.session.flush()
+        self.assertParity(schemas.CandidateSearchSchema, [candidate])
+
+    def test_aggregates(self):
+        aggregates = [
+            factories.ScheduleEByCandidateFactory(total=decimal.Decimal('5.5')),
+            factories.ScheduleEByCandidateFactory(),
+        ]
+        db.session.flush()
+        self.assertParity(schemas.ScheduleEByCandidateSchema, aggregates)
+
+    def test_fallback_for_other_objects(self):
+        data = {'cycle': 2012, 'receipts': 5}
+        schema = schemas.CommitteeTotalsPresidentialSchema(only=('cycle', 'receipts'))
+        self.assertEqual(schema.dump(data).data, {'cycle': 2012, 'receipts': 5})
@@ -2,6 +2,7 @@ import json
 
 from webservices import utils
 from webservices.rest import api
+from webservices.common import committee_types
 from webservices.resources.totals import TotalsView
 
 from tests import factories
@@ -182,3 +183,30 @@ class TestTotals(ApiBaseTest):
         self.assertEqual(resp.content_type, 'application/json')
         data = json.loads(resp.data.decode('utf-8'))
         self.assertIn('not found', data['message'].lower())
+
+    def test_committee_type_by_cycle(self):
+        committee = factories.CommitteeDetailFactory(committee_type='H')
+        committee_id = committee.committee_id
+        factories.CommitteeHistoryFactory(committee_id=committee_id, committee_type='H', cycle=2010)
+        factories.CommitteeHistoryFactory(committee_id=committee_id, committee_type='P', cycle=2012)
+        self.assertEqual(committee_types.resolve(committee_id), 'P')
+        self.assertEqual(committee_types.resolve(committee_id, [2010]), 'H')
+        self.assertEqual(committee_types.resolve(committee_id, [2008]), 'H')
+        self.assertIn(committee_id, committee_types.entries)
+
+    def test_committee_type_missing(self):
+        committee = factories.CommitteeDetailFactory(committee_type=None)
+        factories.CommitteeHistoryFactory(committee_id=committee.committee_id, committee_type='S', cycle=2012)
+        self.assertEqual(committee_types.resolve(committee.committee_id, [2012]), 'S')
+        self.assertIsNone(committee_types.resolve(committee.committee_id, [2010]))
+        resp = self.app.get(api.url_for(TotalsView, committee_id=committee.committee_id, cycle=2010))
+        self.assertEqual(resp.status_code, 200)
+
+    def test_committee_type_preload(self):
+        committee = factories.CommitteeDetailFactory(committee_type='S')
+        factories.CommitteeHistoryFactory(committee_id=committee.committee_id, committee_type='S', cycle=2012)
+        committee_types.preload()
+        self.assertEqual(
+            committee_types.entries.get(committee.committee_id),
+            committee_types.Entry(((2012, 'S'), ), 'S', True),
+        )
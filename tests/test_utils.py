@@ -1,5 +1,9 @@
 import unittest
+from unittest import mock
 
+import sqlalchemy as sa
+
+import flask
 from flask import request
 from webargs import flaskparser
 
@@ -8,8 +12,16 @@ from tests.common import ApiBaseTest
 
 from webservices import args
 from webservices import rest
+from webservices import utils
+from webservices import cursors
+from webservices import spec
 from webservices import sorting
+from webservices import exceptions
+from webservices.common import cache
 from webservices.common import models
+from webservices.rest import api
+from webservices.resources.sched_a import ScheduleAView
+from webservices.resources.candidates import CandidateList
 
 
 class TestSort(ApiBaseTest):
@@ -63,9 +75,149 @@ class TestSort(ApiBaseTest):
         self.assertEqual(query.all(), [candidates[1], candidates[0], candidates[2]])
 
 
+class TestCursorPagination(ApiBaseTest):
+
+    def _walk(self, sort, nulls_large=True, per_page=2):
+        kwargs = {
+            'sort': sort,
+            'sort_hide_null': False,
+            'sort_nulls_large': nulls_large,
+            'per_page': per_page,
+            'page': 1,
+            'cursor': '',
+        }
+        results = []
+        while kwargs['cursor'] is not None:
+            page = utils.fetch_page(models.Candidate.query, kwargs, model=models.Candidate)
+            self.assertLessEqual(len(page.results), per_page)
+            results.extend(page.results)
+            kwargs['cursor'] = page.info['next_cursor']
+        return results
+
+    def test_multi_column_with_nulls(self):
+        [
+            factories.CandidateFactory(district=district, party=party)
+            for district in ['01', '02', None]
+            for party in ['DEM', 'REP', None]
+            for _ in range(2)
+        ]
+        for sort in (['district', '-party'], ['-district', 'party']):
+            for nulls_large in (True, False):
+                expected, _ = sorting.sort(
+                    models.Candidate.query, sort, model=models.Candidate, nulls_large=nulls_large
+                )
+                expected = expected.order_by(models.Candidate.idx).all()
+                self.assertEqual(self._walk(sort, nulls_large=nulls_large), expected)
+
+    def test_invalid_cursor(self):
+        kwargs = {'sort': ['district'], 'sort_nulls_large': True, 'per_page': 2, 'page': 1, 'cursor': 'invalid'}
+        with self.assertRaises(exceptions.ApiError):
+            utils.fetch_page(models.Candidate.query, kwargs, model=models.Candidate)
+
+    def test_cursor_api(self):
+        [factories.CandidateFactory() for _ in range(3)]
+        response = self._response(api.url_for(CandidateList, per_page=2, cursor=''))
+        self.assertEqual(len(response['results']), 2)
+        self.assertEqual(response['pagination']['count'], 3)
+        response = self._response(api.url_for(CandidateList, per_page=2, cursor=response['pagination']['next_cursor']))
+        self.assertEqual(len(response['results']), 1)
+        self.assertIsNone(response['pagination']['next_cursor'])
+
+    def test_cursor_api_invalid(self):
+        response = self.app.get(api.url_for(CandidateList, cursor='invalid'))
+        self.assertEqual(response.status_code, 422)
+
+    def test_cursor_secret_required(self):
+        app = flask.Flask(__name__)
+        with mock.patch.object(cursors, 'SECRET', b''):
+            with app.test_request_context('/'):
+                with self.assertRaises(RuntimeError):
+                    cursors.encode([1], {})
+                app.config['TESTING'] = True
+                cursor = cursors.encode([1], {})
+                self.assertEqual(cursors.decode(cursor, {}), [1])
+
+
+class TestSparseFields(ApiBaseTest):
+
+    def test_requested_fields(self):
+        self.assertEqual(utils.requested_fields(['name,party', 'state']), {'name', 'party', 'state'})
+        self.assertIsNone(utils.requested_fields(['']))
+        self.assertIsNone(utils.requested_fields(None))
+
+    def test_load_fields(self):
+        query = str(utils.load_fields(models.Candidate.query, models.Candidate, {'name'}).statement)
+        self.assertIn('name', query)
+        self.assertNotIn('party', query)
+
+    def test_load_fields_computed(self):
+        query = utils.load_fields(models.ScheduleA.query, models.ScheduleA, {'pdf_url'})
+        self.assertEqual(str(query), str(models.ScheduleA.query))
+
+    def test_filter_options(self):
+        options = [sa.orm.joinedload(models.ScheduleA.committee), sa.orm.joinedload(models.ScheduleA.contributor)]
+        self.assertEqual(utils.filter_options(options, {'committee', 'sub_id'}), options[:1])
+
+    def test_fields_api(self):
+        factories.CandidateFactory(name='Jed Bartlet', party='DEM')
+        results = self._results(api.url_for(CandidateList, fields='name,party'))
+        self.assertEqual(results, [{'name': 'Jed Bartlet', 'party': 'DEM'}])
+
+
+class TestIndexedColumns(ApiBaseTest):
+
+    def test_indexed_columns(self):
+        columns = args.indexed_columns(models.Candidate)
+        self.assertIn('district', columns)
+        self.assertIn('candidate_status', columns)
+
+    def test_indexed_columns_cached(self):
+        args.indexed_columns(models.Candidate)
+        with mock.patch.object(args.sa, 'inspect') as inspect:
+            args.indexed_columns(models.Candidate)
+        self.assertFalse(inspect.called)
+
+    def test_preload_matches_inspector(self):
+        expected = args.indexed_columns(models.Candidate)
+        cache.clear_all()
+        args.preload_indexed_columns()
+        with mock.patch.object(args.sa, 'inspect') as inspect:
+            self.assertEqual(sorted(args.indexed_columns(models.Candidate)), sorted(expected))
+        self.assertFalse(inspect.called)
+
+
 class TestArgs(unittest.TestCase):
 
     def test_currency(self):
         with rest.app.test_request_context('?dollars=$24.50'):
             parsed = flaskparser.parser.parse({'dollars': args.Currency()}, request)
             self.assertEqual(parsed, {'dollars': 24.50})
+
+
+class TestDeferredSpec(unittest.TestCase):
+
+    def test_build_runs_deferred_in_order(self):
+        calls = []
+        with mock.patch.object(spec, '_deferred', []):
+            spec.defer(calls.append, 1)
+            spec.defer(calls.append, 2)
+            self.assertEqual(calls, [])
+            self.assertIs(spec.build(), spec.spec)
+            self.assertEqual(calls, [1, 2])
+            spec.build()
+        self.assertEqual(calls, [1, 2])
+
+    def test_swagger_builds_spec(self):
+        response = rest.app.test_client().get('/swagger')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(spec._deferred, [])
+        data = spec.spec.to_dict()
+        self.assertIn('Candidate', data['definitions'])
+        self.assertTrue(any(path.endswith('/candidates/') for path in data['paths']))
+
+    def test_fields_api_nested(self):
+        committee = factories.CommitteeHistoryFactory(name='Bartlet for America', cycle=2016)
+        factories.ScheduleAFactory(committee_id=committee.committee_id, report_year=2016)
+        results = self._results(api.url_for(ScheduleAView, fields='committee,contributor_name'))
+        self.assertEqual(set(results[0]), {'committee', 'contributor_name'})
+        self.assertEqual(results[0]['committee']['name'], 'Bartlet for America')
@@ -6,6 +6,7 @@ from webargs import fields, validate, ValidationError
 from marshmallow.compat import text_type
 
 from webservices import docs
+from webservices.common import cache
 from webservices.common.models import db
 
 
@@ -55,9 +56,23 @@ class District(fields.Str):
     def _deserialize(self, value, attr, data):
         return '{0:0>2}'.format(value)
 
+
+sparse_fields = fields.List(
+    fields.Str,
+    description='Names of fields to include in results, separated by commas. '
+                'Defaults to all fields.',
+)
+
 paging = {
     'page': Natural(missing=1, description='For paginating through results, starting at page 1'),
     'per_page': per_page,
+    'fields': sparse_fields,
+    'cursor': fields.Str(
+        missing=None,
+        description='Opt in to cursor pagination, which is faster for deep pages. Pass an '
+                    'empty value for the first page, then `next_cursor` from the previous '
+                    'page; `page` is ignored.',
+    ),
 }
 
 class OptionValidator(object):
@@ -85,20 +100,63 @@ class IndexValidator(OptionValidator):
 
     @property
     def values(self):
-        inspector = sa.inspect(db.engine)
-        column_map = {
-            column.key: label
-            for label, column in self.model.__mapper__.columns.items()
-        }
         return [
-            column_map[column['column_names'][0]]
-            for column in inspector.get_indexes(self.model.__tablename__)
-            if not self._is_excluded(column_map.get(column['column_names'][0]))
+            column for column in indexed_columns(self.model)
+            if not self._is_excluded(column)
         ] + self.extra
 
     def _is_excluded(self, value):
         return not value or value in self.exclude
 
+
+_indexed_columns = cache.register(cache.LocalCache(maxsize=512))
+
+INDEXED_COLUMNS_SQL = """
+select cls.relname, att.attname
+from pg_index idx
+join pg_class cls on cls.oid = idx.indrelid
+join pg_namespace nsp on nsp.oid = cls.relnamespace
+join pg_attribute att on att.attrelid = cls.oid and att.attnum = idx.indkey[0]
+where nsp.nspname = current_schema() and not idx.indisprimary
+"""
+
+def _column_labels(model, column_names):
+    column_map = {
+        column.key: label
+        for label, column in model.__mapper__.columns.items()
+    }
+    return tuple(
+        column_map[name] for name in column_names
+        if name in column_map
+    )
+
+def indexed_columns(model):
+    """Get labels of the columns on `model` that lead a non-primary index.
+    Catalog lookups are cached per model until the next data refresh.
+
+    :param Base model: SQLALchemy model.
+    """
+    columns = _indexed_columns.get(model)
+    if columns is None:
+        inspector = sa.inspect(db.engine)
+        columns = _column_labels(
+            model,
+            [index['column_names'][0] for index in inspector.get_indexes(model.__tablename__)],
+        )
+        _indexed_columns.set(model, columns)
+    return columns
+
+def preload_indexed_columns():
+    """Cache indexed columns for all mapped models with a single catalog query."""
+    indexes = {}
+    for table_name, column_name in db.engine.execute(INDEXED_COLUMNS_SQL):
+        indexes.setdefault(table_name, []).append(column_name)
+    _indexed_columns.update(
+        (model, _column_labels(model, indexes.get(model.__tablename__, [])))
+        for model in db.Model._decl_class_registry.values()
+        if hasattr(model, '__tablename__')
+    )
+
 def make_sort_args(default=None, multiple=True, validator=None, default_hide_null=False, default_nulls_large=True):
     description = 'Provide a field to sort by. Use - for descending order.'
     if multiple:
@@ -128,10 +186,21 @@ def make_sort_args(default=None, multiple=True, validator=None, default_hide_nul
 def make_seek_args(field=fields.Int, description=None):
     return {
         'per_page': per_page,
+        'fields': sparse_fields,
         'last_index': field(
             missing=None,
             description=description or 'Index of last result from previous page',
         ),
+        'cursor': fields.Str(
+            missing=None,
+            description='Value of `next_cursor` from the previous page. Replaces `last_index` '
+                        'and `last_` sort values; must be used with the same filters.',
+        ),
+        'skip_count': fields.Bool(
+            missing=False,
+            description='Skip counting results; `count` is reported as -1. '
+                        'Useful when only following `last_indexes` to the next page.',
+        ),
     }
 
 names = {
@@ -164,6 +233,7 @@ candidate_list = {
     'q': fields.Str(description='Text to search all fields for'),
     'candidate_id': fields.List(IStr, description=docs.CANDIDATE_ID),
     'name': fields.Str(description="Candidate's name (full or partial)"),
+    'name_fuzzy': fields.Bool(missing=False, description=docs.NAME_FUZZY),
 }
 
 committee = {
@@ -221,6 +291,7 @@ committee_list = {
     'name': fields.Str(description="Candidate's name (full or partial)"),
     'state': fields.List(IStr, description='Two-character U.S. state or territory in which the committee is registered.'),
     'name': fields.Str(description="Committee's name (full or partial)"),
+    'name_fuzzy': fields.Bool(missing=False, description=docs.NAME_FUZZY),
     'party': fields.List(IStr, description='Three-letter code for the party. For example: DEM=Democrat REP=Republican'),
     'min_first_file_date': fields.Date(description='Minimum date of the first form filed by the committee.'),
     'max_first_file_date': fields.Date(description='Maximum date of the first form filed by the committee.'),
@@ -277,6 +348,20 @@ itemized = {
     'max_amount': Currency(description='Filter for all amounts less than a value.'),
     'min_date': fields.Date(description='Minimum date'),
     'max_date': fields.Date(description='Maximum date'),
+    'export': fields.Str(
+        validate=validate.OneOf(['', 'ndjson', 'csv']),
+        description='Stream all matching records as newline-delimited JSON or CSV '
+                    'instead of returning a page of results.',
+    ),
+}
+
+batch = {
+    'requests': fields.List(
+        fields.Str,
+        required=True,
+        description='Paths of the resources to fetch, relative to the API root, '
+                    'including any query string; for example, "/candidate/P80003338/history/"',
+    ),
 }
 
 reporting_dates = {
@@ -306,6 +391,7 @@ election_dates = {
 schedule_a = {
     'committee_id': fields.List(IStr, description=docs.COMMITTEE_ID),
     'contributor_id': fields.List(IStr, description='The FEC identifier should be represented here the contributor is registered with the FEC.'),
+    'cycle': fields.List(fields.Int, description=docs.RECORD_CYCLE),
     'contributor_name': fields.Str(description='Name of contributor.'),
     'contributor_city': fields.List(IStr, description='City of contributor'),
     'contributor_state': fields.List(IStr, description='State of contributor'),
@@ -0,0 +1,165 @@
+"""In-process caches keyed on the refresh generation of derived data.
+
+Derived tables and materialized views only change when `manage.py refresh_materialized`
+runs, which bumps the generation counter in `ofec_refresh_generation`. Workers
+poll the counter at most once per `FEC_GENERATION_TTL` seconds and flush all
+registered caches when it changes.
+"""
+
+import os
+import time
+import json
+import hashlib
+import datetime
+import threading
+import collections
+import importlib
+
+import sqlalchemy as sa
+
+
+GENERATION_TTL = int(os.getenv('FEC_GENERATION_TTL', 60))
+
+Generation = collections.namedtuple('Generation', ['number', 'refreshed_at'])
+
+_registry = []
+_generation = {'value': None, 'checked': None}
+_missing = object()
+
+
+class LocalCache(object):
+    """Bounded, thread-safe LRU cache with optional expiry. Stands in for a
+    shared store such as memcached or redis: alternative backends need only
+    implement `get`, `set`, and `clear`.
+
+    :param int maxsize: Maximum number of entries
+    :param int ttl: Optional lifetime of entries, in seconds
+    """
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, expires = self._data[key]
+            except KeyError:
+                return default
+            if expires is not None and expires < time.time():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def update(self, items):
+        for key, value in items:
+            self.set(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key, _missing) is not _missing
+
+    def __len__(self):
+        return len(self._data)
+
+
+def register(cache):
+    """Register a cache to be flushed when the refresh generation changes."""
+    _registry.append(cache)
+    return cache
+
+
+def clear_all():
+    for cache in _registry:
+        cache.clear()
+
+
+def load_backend(path, **kwargs):
+    """Instantiate a cache backend from a dotted path, e.g.
+    `webservices.common.cache.LocalCache`.
+    """
+    if not path:
+        return LocalCache(**kwargs)
+    module_name, class_name = path.rsplit('.', 1)
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)(**kwargs)
+
+
+def fetch_generation():
+    from webservices.common.models import db
+    try:
+        row = db.engine.execute(
+            'select generation, refreshed_at from ofec_refresh_generation limit 1'
+        ).first()
+    except sa.exc.SQLAlchemyError:
+        return None
+    return Generation(*row) if row else None
+
+
+def current_generation():
+    """Get the current refresh generation, flushing registered caches if it
+    has changed since the last check. Returns `None` if the generation table
+    has not been created.
+    """
+    now = time.time()
+    checked = _generation['checked']
+    if checked is None or now - checked >= GENERATION_TTL:
+        previous = _generation['value']
+        generation = fetch_generation()
+        _generation.update({'value': generation, 'checked': now})
+        if previous is not None and generation != previous:
+            clear_all()
+    return _generation['value']
+
+
+def bump_generation():
+    """Increment the refresh generation; called after derived data is rebuilt."""
+    from webservices.common.models import db
+    db.engine.execute('select bump_refresh_generation()')
+    _generation['checked'] = None
+    clear_all()
+
+
+def reset_generation():
+    _generation.update({'value': None, 'checked': None})
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return sorted((key, _normalize(each)) for key, each in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return [_normalize(each) for each in value]
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def make_key(*parts):
+    """Build a stable hash from request components such as the route and
+    parsed arguments.
+    """
+    dumped = json.dumps(_normalize(parts), sort_keys=True)
+    return hashlib.sha1(dumped.encode('utf-8')).hexdigest()
+
+
+responses = register(
+    load_backend(
+        os.getenv('FEC_RESPONSE_CACHE_BACKEND'),
+        maxsize=int(os.getenv('FEC_RESPONSE_CACHE_SIZE', 2048)),
+    )
+)
@@ -0,0 +1,101 @@
+"""Resolve the committee type used to pick totals and reports models.
+
+Committee histories are cached per committee as `(cycle, committee_type)` pairs
+in descending cycle order, along with the type from the committee detail view
+and whether the committee has a detail row, so that any set of requested cycles
+can be resolved without a round trip. The cache is preloaded in bulk when a
+worker starts and flushed on refresh.
+"""
+
+import os
+import collections
+
+import sqlalchemy as sa
+from flask import abort
+
+from webservices.common import cache
+from webservices.common import models
+
+
+Entry = collections.namedtuple('Entry', ['history', 'committee_type', 'has_detail'])
+
+entries = cache.register(
+    cache.LocalCache(
+        maxsize=int(os.getenv('FEC_COMMITTEE_TYPE_CACHE_SIZE', 50000)),
+        ttl=int(os.getenv('FEC_COMMITTEE_TYPE_CACHE_TTL', 3600)),
+    )
+)
+
+
+def resolve(committee_id, cycles=None):
+    """Get the type of committee `committee_id` in the latest of `cycles`,
+    falling back to the type on the committee detail, which may be `None`.
+    Aborts with a 404 if no history matches and the committee has no detail.
+    """
+    entry = entries.get(committee_id)
+    if entry is None:
+        entry = load(committee_id)
+        if entry is None:
+            abort(404)
+        entries.set(committee_id, entry)
+    cycles = set(cycles or [])
+    for cycle, committee_type in entry.history:
+        if not cycles or cycle in cycles:
+            return committee_type
+    if not entry.has_detail:
+        abort(404)
+    return entry.committee_type
+
+
+def load(committee_id):
+    history = models.db.session.query(
+        models.CommitteeHistory.cycle,
+        models.CommitteeHistory.committee_type,
+    ).filter(
+        models.CommitteeHistory.committee_id == committee_id,
+    ).order_by(
+        sa.desc(models.CommitteeHistory.cycle),
+    ).all()
+    detail = models.db.session.query(
+        models.CommitteeDetail.committee_type,
+    ).filter(
+        models.CommitteeDetail.committee_id == committee_id,
+    ).first()
+    if not history and detail is None:
+        return None
+    return Entry(
+        tuple((cycle, committee_type) for cycle, committee_type in history),
+        detail.committee_type if detail else None,
+        detail is not None,
+    )
+
+
+def preload():
+    """Load committee types for all committees in two queries, up to the size
+    of the cache.
+    """
+    histories = collections.defaultdict(list)
+    rows = models.db.session.query(
+        models.CommitteeHistory.committee_id,
+        models.CommitteeHistory.cycle,
+        models.CommitteeHistory.committee_type,
+    ).order_by(
+        models.CommitteeHistory.committee_id,
+        sa.desc(models.CommitteeHistory.cycle),
+    )
+    for committee_id, cycle, committee_type in rows:
+        histories[committee_id].append((cycle, committee_type))
+    details = dict(
+        models.db.session.query(
+            models.CommitteeDetail.committee_id,
+            models.CommitteeDetail.committee_type,
+        )
+    )
+    committee_ids = set(histories) | set(details)
+    entries.update(
+        (
+            committee_id,
+            Entry(tuple(histories.get(committee_id, ())), details.get(committee_id), committee_id in details),
+        )
+        for committee_id in sorted(committee_ids)[:entries.maxsize]
+    )
@@ -4,23 +4,48 @@ Count logic borrowed from https://wiki.postgresql.org/wiki/Count_estimate
 ANALYZE borrowed from https://bitbucket.org/zzzeek/sqlalchemy/wiki/UsageRecipes/Explain
 """
 
+import os
 import re
 
 from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.sql.expression import Executable, ClauseElement, _literal_as_text
 
+from webservices.common import cache
+
 
 count_pattern = re.compile(r'rows=(\d+)')
 
+counts = cache.register(
+    cache.LocalCache(
+        maxsize=int(os.getenv('FEC_COUNT_CACHE_SIZE', 4096)),
+        ttl=int(os.getenv('FEC_COUNT_CACHE_TTL', 3600)),
+    )
+)
+
 
 def count_estimate(query, session, threshold=None):
-    rows = session.execute(explain(query)).fetchall()
-    count = extract_analyze_count(rows)
-    if threshold is not None and count < threshold:
-        return query.count()
+    """Estimate the number of rows matched by `query`, falling back to an exact
+    count below `threshold`. Ordering and limits are ignored, and results are
+    cached on the compiled statement until the next data refresh, so that
+    paging through the same filter only counts once.
+    """
+    query = query.order_by(None).limit(None).offset(None)
+    key = count_key(query, session, threshold)
+    count = counts.get(key)
+    if count is None:
+        rows = session.execute(explain(query)).fetchall()
+        count = extract_analyze_count(rows)
+        if threshold is not None and count < threshold:
+            count = query.count()
+        counts.set(key, count)
     return count
 
 
+def count_key(query, session, threshold=None):
+    compiled = query.statement.compile(dialect=session.get_bind().dialect)
+    return cache.make_key(str(compiled), compiled.params, threshold)
+
+
 def extract_analyze_count(rows):
     for row in rows:
         match = count_pattern.search(row[0])
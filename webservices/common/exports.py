@@ -0,0 +1,153 @@
+"""Stream query results as newline-delimited JSON or CSV.
+
+Rows are fetched through a server-side cursor in batches of `CHUNK_SIZE` and
+serialized one at a time, so memory use does not grow with the size of the
+result set.
+
+Tables of plain columns can instead be exported with `copy_export`, which has
+PostgreSQL write the CSV with `COPY ... TO STDOUT`. Values keep their database
+types, so that numeric totals are exact decimals and counts are integers.
+"""
+
+import io
+import os
+import csv
+import tempfile
+
+import flask
+import ujson
+import sqlalchemy as sa
+from marshmallow import fields
+
+
+CHUNK_SIZE = 1000
+
+# COPY output is spooled to disk past this many bytes
+COPY_SPOOL_SIZE = int(os.getenv('FEC_COPY_SPOOL_SIZE', 16 * 1024 * 1024))
+COPY_CHUNK_SIZE = 64 * 1024
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def stream_query(query, chunk_size=CHUNK_SIZE):
+    """Iterate over query results using a named cursor."""
+    return query.execution_options(stream_results=True).yield_per(chunk_size)
+
+
+def iter_ndjson(rows, schema):
+    for row in rows:
+        yield ujson.dumps(schema.dump(row).data) + '\n'
+
+
+def csv_columns(schema):
+    """Get CSV column names for `schema`, flattening nested schemas to dotted
+    column names.
+    """
+    columns = []
+    for key, field in schema.fields.items():
+        if isinstance(field, fields.Nested):
+            columns.extend('{0}.{1}'.format(key, each) for each in field.schema.fields)
+        else:
+            columns.append(key)
+    return columns
+
+
+def flatten(data):
+    ret = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            ret.update(('{0}.{1}'.format(key, each), nested) for each, nested in value.items())
+        else:
+            ret[key] = value
+    return ret
+
+
+def iter_csv(rows, schema):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, csv_columns(schema), extrasaction='ignore')
+    writer.writeheader()
+    for index, row in enumerate(rows):
+        writer.writerow(flatten(schema.dump(row).data))
+        if index % 100 == 99:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export(query, schema, export_format, filename):
+    """Build a chunked response streaming the results of `query`.
+
+    :param query: Sorted query to export
+    :param schema: Schema instance used to serialize each row
+    :param str export_format: One of `FORMATS`
+    :param str filename: Base name of the attachment
+    """
+    rows = stream_query(query)
+    iterator = iter_csv(rows, schema) if export_format == 'csv' else iter_ndjson(rows, schema)
+    response = flask.Response(
+        flask.stream_with_context(iterator),
+        mimetype=FORMATS[export_format],
+    )
+    response.headers['Content-Disposition'] = 'attachment; filename={0}.{1}'.format(filename, export_format)
+    return response
+
+
+def model_columns(model):
+    """Get the mapped columns of `model`, labeled with their attribute names."""
+    return [
+        getattr(model, prop.key).label(prop.key)
+        for prop in sa.inspect(model).column_attrs
+    ]
+
+
+def copy_csv(query, session, output):
+    """Write the results of `query` to the file-like `output` as CSV with a
+    header row, using `COPY ... TO STDOUT` on the connection of `session`.
+    """
+    compiled = query.statement.compile(dialect=session.get_bind().dialect)
+    cursor = session.connection().connection.cursor()
+    try:
+        # Bind with the driver, since array parameters cannot be rendered as literals
+        sql = cursor.mogrify(str(compiled), compiled.params).decode('utf-8')
+        cursor.copy_expert('COPY ({0}) TO STDOUT WITH CSV HEADER'.format(sql), output)
+    finally:
+        cursor.close()
+
+
+def iter_file(output, chunk_size=COPY_CHUNK_SIZE):
+    try:
+        output.seek(0)
+        while True:
+            chunk = output.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        output.close()
+
+
+def copy_export(query, model, session, filename):
+    """Build a response with the mapped columns of `model` for all rows
+    matching `query` as CSV. The COPY runs to completion on the request's
+    connection before the response is sent, spooling to a temporary file
+    past `COPY_SPOOL_SIZE` bytes.
+
+    :param query: Filtered query over `model`
+    :param model: SQLAlchemy model
+    :param session: Session whose connection runs the export
+    :param str filename: Base name of the attachment
+    """
+    query = query.with_entities(*model_columns(model)).order_by(None)
+    output = tempfile.SpooledTemporaryFile(max_size=COPY_SPOOL_SIZE)
+    try:
+        copy_csv(query, session, output)
+    except Exception:
+        output.close()
+        raise
+    response = flask.Response(iter_file(output), mimetype=FORMATS['csv'])
+    response.headers['Content-Disposition'] = 'attachment; filename={0}.csv'.format(filename)
+    return response
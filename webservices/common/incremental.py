@@ -0,0 +1,251 @@
+"""Apply queued changes to incrementally maintained aggregate and full-text
+tables.
+
+This is the concurrent counterpart of the `update_aggregates()` database
+function. A coordinating transaction exports a snapshot of the queue tables,
+and each update function runs in its own transaction on its own connection
+with that snapshot, so every updater sees the same queued rows regardless of
+changes that arrive in the meantime. Rows queued since the snapshot are left
+for the next run.
+
+Updates must be applied exactly once, since aggregates add queued changes to
+their existing totals. Updater transactions and the transaction that clears the
+queues are therefore committed with two-phase commit: the queue transaction is
+prepared first, then the updaters, then the queue transaction is committed,
+then the updaters. Committing the queue transaction is the point of no return.
+Since it is prepared before and rolled back after every updater, prepared
+updaters without a prepared queue transaction always belong to a committed
+run. `recover` at the start of the next run commits the prepared transactions
+of committed runs and rolls back the rest. Runs hold an advisory lock, so that
+only one run is in progress at a time.
+
+Two-phase commit requires `max_prepared_transactions` to allow a prepared
+transaction for each updater and the queues. Otherwise, the update functions
+run one after another in a single transaction.
+"""
+
+import os
+import time
+import uuid
+import collections
+from concurrent import futures
+
+import sqlalchemy as sa
+
+
+WORKERS = int(os.getenv('FEC_UPDATE_WORKERS', 4))
+
+# Prefix of global transaction identifiers, which are formatted as
+# `<prefix>:<run>:<function>`
+XID_PREFIX = 'ofec_update'
+QUEUES_XID = 'queues'
+
+# Advisory lock held for the duration of a run
+LOCK_SQL = 'select pg_try_advisory_lock(hashtext(:name))'
+UNLOCK_SQL = 'select pg_advisory_unlock(hashtext(:name))'
+
+UPDATERS = [
+    'ofec_sched_a_update_aggregate_zip',
+    'ofec_sched_a_update_aggregate_size',
+    'ofec_sched_a_update_aggregate_state',
+    'ofec_sched_a_update_aggregate_employer',
+    'ofec_sched_a_update_aggregate_occupation',
+    'ofec_sched_a_update_aggregate_contributor',
+    'ofec_sched_b_update_aggregate_purpose',
+    'ofec_sched_b_update_aggregate_recipient',
+    'ofec_sched_b_update_aggregate_recipient_id',
+    'ofec_sched_a_update',
+    'ofec_sched_b_update',
+    'ofec_sched_e_update',
+    'ofec_totals_reports_update',
+]
+
+QUEUES = [
+    'ofec_sched_a_queue_new',
+    'ofec_sched_a_queue_old',
+    'ofec_sched_b_queue_new',
+    'ofec_sched_b_queue_old',
+    'ofec_sched_e_queue_new',
+    'ofec_sched_e_queue_old',
+    'ofec_totals_reports_queue',
+]
+
+
+def make_xid(run, name):
+    return ':'.join([XID_PREFIX, run, name])
+
+
+def begin_snapshot(connection, snapshot=None, xid=None):
+    """Begin a repeatable read transaction on `connection`, importing
+    `snapshot` if given. If `xid` is given, the transaction is begun as a
+    two-phase transaction with that identifier.
+    """
+    transaction = connection.begin_twophase(xid) if xid else connection.begin()
+    connection.execute(sa.text('set transaction isolation level repeatable read'))
+    if snapshot is not None:
+        connection.execute(sa.text('set transaction snapshot :snapshot'), snapshot=snapshot)
+    return transaction
+
+
+def connect_snapshot(engine, snapshot, xid=None):
+    """Open a connection with a transaction using `snapshot`.
+
+    :returns: Tuple of (connection, transaction)
+    """
+    connection = engine.connect()
+    try:
+        return connection, begin_snapshot(connection, snapshot, xid=xid)
+    except Exception:
+        connection.close()
+        raise
+
+
+def run_updater(engine, snapshot, function, xid=None):
+    """Run `function` in an open transaction using `snapshot`.
+
+    :returns: Tuple of (connection, transaction, seconds); the caller must
+        commit or roll back the transaction and close the connection
+    """
+    connection, transaction = connect_snapshot(engine, snapshot, xid=xid)
+    try:
+        start = time.time()
+        connection.execute(sa.text('select {0}()'.format(function)))
+        return connection, transaction, time.time() - start
+    except Exception:
+        connection.close()
+        raise
+
+
+def clear_queues(connection, queues):
+    for queue in queues:
+        connection.execute(sa.text('delete from {0}'.format(queue)))
+
+
+def prepared_capacity(engine):
+    with engine.connect() as connection:
+        return int(connection.execute(sa.text('show max_prepared_transactions')).scalar())
+
+
+def recover(engine):
+    """Resolve prepared transactions left by interrupted runs: roll back runs
+    that stopped before committing their queue transaction, and commit runs
+    that stopped after. A run without a prepared queue transaction has
+    committed it, since it is prepared before and rolled back after the
+    updaters. Must not run concurrently with `update_concurrent`; `update`
+    holds the run lock while recovering.
+
+    :returns: Mapping of run identifiers to whether they were committed
+    """
+    resolved = {}
+    with engine.connect() as connection:
+        runs = collections.defaultdict(list)
+        for xid in engine.dialect.do_recover_twophase(connection):
+            prefix, _, rest = xid.partition(':')
+            if prefix == XID_PREFIX:
+                run, _, name = rest.partition(':')
+                runs[run].append((xid, name))
+        for run, xids in runs.items():
+            commit = QUEUES_XID not in [name for _, name in xids]
+            # Roll back the queue transaction last, as `update_concurrent` does
+            for xid, _ in sorted(xids, key=lambda pair: pair[1] == QUEUES_XID):
+                if commit:
+                    connection.commit_prepared(xid, recover=True)
+                else:
+                    connection.rollback_prepared(xid, recover=True)
+            resolved[run] = commit
+    return resolved
+
+
+def update(engine, updaters=UPDATERS, queues=QUEUES, workers=WORKERS):
+    """Run `updaters` against a snapshot of `queues`, then clear the rows in
+    the snapshot. Updaters run concurrently when the server allows enough
+    prepared transactions, and serially otherwise.
+
+    :returns: Mapping of update functions to durations in seconds
+    :raises: RuntimeError if another run is in progress; otherwise the first
+        updater error, in which case no updates are committed and the queues
+        are left intact
+    """
+    with engine.connect() as connection:
+        if not connection.execute(sa.text(LOCK_SQL), name=XID_PREFIX).scalar():
+            raise RuntimeError('Another aggregate update is in progress')
+        try:
+            recover(engine)
+            if prepared_capacity(engine) > len(updaters):
+                return update_concurrent(engine, updaters, queues, workers)
+            return update_serial(engine, updaters, queues)
+        finally:
+            connection.execute(sa.text(UNLOCK_SQL), name=XID_PREFIX)
+
+
+def update_serial(engine, updaters=UPDATERS, queues=QUEUES):
+    """Run `updaters` and clear `queues` in a single transaction."""
+    durations = {}
+    with engine.connect() as connection:
+        transaction = begin_snapshot(connection)
+        try:
+            for function in updaters:
+                start = time.time()
+                connection.execute(sa.text('select {0}()'.format(function)))
+                durations[function] = time.time() - start
+            clear_queues(connection, queues)
+            transaction.commit()
+        except Exception:
+            transaction.rollback()
+            raise
+    return durations
+
+
+def update_concurrent(engine, updaters=UPDATERS, queues=QUEUES, workers=WORKERS):
+    """Run `updaters` concurrently and clear `queues`, committing all of them
+    with two-phase commit.
+    """
+    run = uuid.uuid4().hex
+    coordinator = engine.connect()
+    results = {}
+    claim = None
+    decided = False
+    try:
+        exporter = begin_snapshot(coordinator)
+        snapshot = coordinator.execute(sa.text('select pg_export_snapshot()')).scalar()
+        errors = []
+        with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            jobs = {
+                executor.submit(run_updater, engine, snapshot, function, make_xid(run, function)): function
+                for function in updaters
+            }
+            for job in futures.as_completed(jobs):
+                try:
+                    results[jobs[job]] = job.result()
+                except Exception as error:
+                    errors.append(error)
+        if errors:
+            raise errors[0]
+        # A transaction that has exported a snapshot cannot be prepared, so the
+        # queues are cleared in a separate transaction using the snapshot
+        claim = connect_snapshot(engine, snapshot, xid=make_xid(run, QUEUES_XID))
+        clear_queues(claim[0], queues)
+        claim[1].prepare()
+        for _, transaction, _ in results.values():
+            transaction.prepare()
+        exporter.rollback()
+        claim[1].commit()
+        decided = True
+        for _, transaction, _ in results.values():
+            transaction.commit()
+    finally:
+        # Once the queue transaction commits, any transactions still prepared
+        # are left for `recover` to commit. Otherwise the queue transaction is
+        # rolled back last, so that `recover` never mistakes prepared updaters
+        # of an undecided run for those of a committed run.
+        pending = list(results.values()) + ([claim + (None, )] if claim else [])
+        try:
+            if not decided:
+                for _, transaction, _ in pending:
+                    if transaction.is_active:
+                        transaction.rollback()
+        finally:
+            for connection, _, _ in pending:
+                connection.close()
+            coordinator.close()
+    return {function: seconds for function, (_, _, seconds) in results.items()}
@@ -0,0 +1,126 @@
+"""Refresh materialized views in dependency order.
+
+Views are refreshed as soon as every materialized view they read from has been
+refreshed, up to `workers` at a time, each on its own connection. Total
+refresh time is bounded by the slowest chain of dependent views rather than
+the sum of all views.
+"""
+
+import os
+import time
+from concurrent import futures
+
+import sqlalchemy as sa
+
+
+WORKERS = int(os.getenv('FEC_REFRESH_WORKERS', 4))
+
+VIEWS_SQL = '''
+select matviewname from pg_matviews where schemaname = :schema
+'''
+
+# Pairs of (dependent, dependency) for views and materialized views, read from
+# the rewrite rules that define each view
+DEPENDENCIES_SQL = '''
+select distinct dependent.relname, dependency.relname
+from pg_depend
+join pg_rewrite on pg_depend.objid = pg_rewrite.oid
+join pg_class dependent on pg_rewrite.ev_class = dependent.oid
+join pg_class dependency on pg_depend.refobjid = dependency.oid
+join pg_namespace on dependent.relnamespace = pg_namespace.oid
+where pg_namespace.nspname = :schema
+  and dependent.relkind in ('m', 'v')
+  and dependency.relkind in ('m', 'v')
+  and dependent.oid != dependency.oid
+'''
+
+
+def view_dependencies(views, edges):
+    """Get the materialized views that each materialized view depends on,
+    following dependencies through plain views.
+
+    :param views: Names of materialized views
+    :param edges: Pairs of (dependent, dependency) relation names
+    :returns: Mapping of each view in `views` to a set of views in `views`
+    """
+    views = set(views)
+    graph = {}
+    for dependent, dependency in edges:
+        graph.setdefault(dependent, set()).add(dependency)
+    ret = {}
+    for view in views:
+        found, stack, seen = set(), list(graph.get(view, ())), set()
+        while stack:
+            relation = stack.pop()
+            if relation in seen:
+                continue
+            seen.add(relation)
+            if relation in views:
+                found.add(relation)
+            else:
+                stack.extend(graph.get(relation, ()))
+        found.discard(view)
+        ret[view] = found
+    return ret
+
+
+def run(dependencies, refresh, workers=WORKERS):
+    """Call `refresh` on each view once all of its dependencies have been
+    refreshed, running up to `workers` refreshes concurrently. If a refresh
+    fails, no further refreshes are started and the error is raised once
+    running refreshes finish.
+
+    :param dict dependencies: Mapping of views to sets of views they depend on
+    :param refresh: Function that refreshes a single view
+    :returns: Mapping of views to refresh durations in seconds
+    """
+    pending = {view: set(deps) & set(dependencies) for view, deps in dependencies.items()}
+    durations = {}
+    running = {}
+    error = None
+
+    def timed(view):
+        start = time.time()
+        refresh(view)
+        return time.time() - start
+
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            if error is None:
+                ready = sorted(view for view, deps in pending.items() if not deps)
+                for view in ready:
+                    del pending[view]
+                    running[executor.submit(timed, view)] = view
+            if not running:
+                if error is None:
+                    error = ValueError('Circular dependency among views: {0}'.format(', '.join(sorted(pending))))
+                break
+            done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                view = running.pop(future)
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                durations[view] = future.result()
+                for deps in pending.values():
+                    deps.discard(view)
+    if error is not None:
+        raise error
+    return durations
+
+
+def refresh_view(engine, view):
+    name = engine.dialect.identifier_preparer.quote(view)
+    with engine.begin() as connection:
+        connection.execute(sa.text('refresh materialized view concurrently {0}'.format(name)))
+
+
+def refresh(engine, schema='public', workers=WORKERS):
+    """Refresh all materialized views in `schema`.
+
+    :returns: Mapping of views to refresh durations in seconds
+    """
+    views = [row[0] for row in engine.execute(sa.text(VIEWS_SQL), schema=schema)]
+    edges = engine.execute(sa.text(DEPENDENCIES_SQL), schema=schema).fetchall()
+    dependencies = view_dependencies(views, edges)
+    return run(dependencies, lambda view: refresh_view(engine, view), workers=workers)
@@ -69,7 +69,7 @@ class CommitteeReports(PdfMixin, BaseModel):
 
 
 class CommitteeReportsHouseSenate(CommitteeReports):
-    __tablename__ = 'ofec_reports_house_senate_mv'
+    __tablename__ = 'ofec_reports_house_senate'
 
     aggregate_amount_personal_contributions_general = db.Column(db.Integer)
     aggregate_contributions_personal_funds_primary = db.Column(db.Integer)
@@ -126,7 +126,7 @@ class CommitteeReportsHouseSenate(CommitteeReports):
 
 
 class CommitteeReportsPacParty(CommitteeReports):
-    __tablename__ = 'ofec_reports_pacs_parties_mv'
+    __tablename__ = 'ofec_reports_pacs_parties'
 
     all_loans_received_period = db.Column(db.Integer)
     all_loans_received_ytd = db.Column(db.Integer)
@@ -192,7 +192,7 @@ class CommitteeReportsPacParty(CommitteeReports):
 
 
 class CommitteeReportsPresidential(CommitteeReports):
-    __tablename__ = 'ofec_reports_presidential_mv'
+    __tablename__ = 'ofec_reports_presidential'
 
     candidate_contribution_period = db.Column(db.Integer)
     candidate_contribution_ytd = db.Column(db.Integer)
@@ -239,7 +239,7 @@ class CommitteeReportsPresidential(CommitteeReports):
 
 
 class CommitteeReportsIEOnly(PdfMixin, BaseModel):
-    __tablename__ = 'ofec_reports_ie_only_mv'
+    __tablename__ = 'ofec_reports_ie_only'
 
     beginning_image_number = db.Column(db.BigInteger)
     committee_id = db.Column(db.String)
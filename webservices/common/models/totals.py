@@ -31,7 +31,7 @@ class CommitteeTotals(BaseModel):
 
 
 class CommitteeTotalsPacParty(CommitteeTotals):
-    __tablename__ = 'ofec_totals_pacs_parties_mv'
+    __tablename__ = 'ofec_totals_pacs_parties'
 
     all_loans_received = db.Column(db.Integer)
     allocated_federal_election_levin_share = db.Column(db.Integer)
@@ -63,7 +63,7 @@ class CommitteeTotalsPacParty(CommitteeTotals):
 
 
 class CommitteeTotalsPresidential(CommitteeTotals):
-    __tablename__ = 'ofec_totals_presidential_mv'
+    __tablename__ = 'ofec_totals_presidential'
 
     candidate_contribution = db.Column(db.Integer)
     exempt_legal_accounting_disbursement = db.Column(db.Integer)
@@ -84,7 +84,7 @@ class CommitteeTotalsPresidential(CommitteeTotals):
 
 
 class CommitteeTotalsHouseSenate(CommitteeTotals):
-    __tablename__ = 'ofec_totals_house_senate_mv'
+    __tablename__ = 'ofec_totals_house_senate'
 
     all_other_loans = db.Column(db.Integer)
     candidate_contribution = db.Column(db.Integer)
@@ -101,7 +101,7 @@ class CommitteeTotalsHouseSenate(CommitteeTotals):
 
 
 class CommitteeTotalsIEOnly(BaseModel):
-    __tablename__ = 'ofec_totals_ie_only_mv'
+    __tablename__ = 'ofec_totals_ie_only'
 
     committee_id = db.Column(db.String, index=True)
     cycle = db.Column(db.Integer, index=True)
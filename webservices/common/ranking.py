@@ -0,0 +1,110 @@
+"""Rank fulltext matches in Python, following PostgreSQL's `ts_rank_cd`.
+
+Used where ranking every match in the database would be too slow: typeahead
+indexes rank matches held in memory, and two-phase searches rank a bounded set
+of candidate rows fetched from the database.
+"""
+
+import re
+import collections
+
+
+# Default weights for ts_rank_cd, keyed on tsvector weight labels
+WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+_lexeme_re = re.compile(r"'((?:[^']|'')*)'(?::([0-9A-D,]+))?")
+_position_re = re.compile(r'(\d+)([A-D]?)')
+_query_re = re.compile(r"'((?:[^']|'')*)'(:\*)?")
+
+
+def parse_vector(text):
+    """Parse the text representation of a tsvector.
+
+    :returns: Mapping of lexemes to lists of (position, weight) pairs
+    """
+    vector = {}
+    for match in _lexeme_re.finditer(text or ''):
+        lexeme = match.group(1).replace("''", "'")
+        positions = match.group(2)
+        vector[lexeme] = [
+            (int(position), weight or 'D')
+            for position, weight in _position_re.findall(positions or '')
+        ]
+    return vector
+
+
+def parse_query(text):
+    """Parse the text representation of a tsquery of terms joined by `&`.
+
+    :returns: List of (lexeme, prefix) query items
+    """
+    return [
+        (match.group(1).replace("''", "'"), bool(match.group(2)))
+        for match in _query_re.finditer(text or '')
+    ]
+
+
+def cover_density(entries, count):
+    """Rank a document by cover density, following `calc_rank_cd` in
+    PostgreSQL's `tsrank.c` without normalization.
+
+    :param entries: Sorted (position, weight, items) tuples for positions that
+        match any query item
+    :param int count: Number of query items, all of which a cover must contain
+    """
+    rank = 0.0
+    start = 0
+    while True:
+        seen = set()
+        end = None
+        for idx in range(start, len(entries)):
+            seen.update(entries[idx][2])
+            if len(seen) == count:
+                end = idx
+                break
+        if end is None:
+            return rank
+        seen = set()
+        for idx in range(end, start - 1, -1):
+            seen.update(entries[idx][2])
+            if len(seen) == count:
+                begin = idx
+                break
+        inverse = sum(1.0 / WEIGHTS[entries[idx][1]] for idx in range(begin, end + 1))
+        noise = (entries[end][0] - entries[begin][0]) - (end - begin)
+        if noise < 0:
+            noise = (end - begin) // 2
+        rank += (end - begin + 1) / inverse / (1 + noise)
+        start = begin + 1
+
+
+def rank(vector, matches):
+    """Rank a parsed tsvector against a query.
+
+    :param vector: Mapping returned by `parse_vector`
+    :param matches: For each query item, the lexemes of `vector` it matches
+    """
+    positions = collections.defaultdict(set)
+    weights = {}
+    for item, lexemes in enumerate(matches):
+        for lexeme in lexemes:
+            for position, weight in vector.get(lexeme, ()):
+                positions[position].add(item)
+                weights[position] = weight
+    entries = [
+        (position, weights[position], positions[position])
+        for position in sorted(positions)
+    ]
+    return cover_density(entries, len(matches))
+
+
+def rank_items(vector, items):
+    """Rank a parsed tsvector against (lexeme, prefix) query items."""
+    matches = [
+        [
+            each for each in vector
+            if each == lexeme or (prefix and each.startswith(lexeme))
+        ]
+        for lexeme, prefix in items
+    ]
+    return rank(vector, matches)
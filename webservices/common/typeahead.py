@@ -0,0 +1,178 @@
+"""In-memory prefix indexes for typeahead name searches.
+
+Each index holds the rows of a fulltext materialized view along with the
+lexemes, positions, and weights of its `fulltxt` vector. Queries are matched
+the way `utils.search_text` matches them in PostgreSQL, with every term but
+the last matched exactly and the last matched as a prefix, and ranked with the
+port of `ts_rank_cd` in `ranking`. Indexes are loaded on first use, preloaded
+when a worker starts, and dropped when the refresh generation changes.
+"""
+
+import re
+import bisect
+import functools
+import heapq
+import threading
+import collections
+
+import sqlalchemy as sa
+
+from webservices.common import cache
+from webservices.common import models
+from webservices.common import ranking
+
+
+_word_re = re.compile(r'[^\W_]+')
+_max_char = chr(0x10ffff)
+
+# Lexemes for each word in the indexed names, so that query terms can be
+# normalized without a round trip
+STEMS_SQL = r'''
+select word, to_tsvector(word)::text
+from (
+    select distinct regexp_split_to_table(lower(name), '(\W|_)+') as word
+    from {0}
+) words
+where word != ''
+'''
+
+
+STEM_SQL = 'select to_tsvector(:word)::text'
+
+
+@functools.lru_cache(maxsize=4096)
+def stem(word):
+    """Get the lexemes for a `word` that does not appear in the indexed
+    names from the database, so that it is stemmed, or dropped as a stop word,
+    with the same text search configuration as `to_tsquery`.
+    """
+    vector = models.db.session.execute(STEM_SQL, {'word': word}).scalar()
+    return list(ranking.parse_vector(vector))
+
+
+class TypeaheadIndex(object):
+    """Prefix index over the rows of a fulltext model.
+
+    :param model: Model with `fulltxt` and `name` columns
+    :param columns: Names of columns to include in results
+    """
+    def __init__(self, model, columns):
+        self.model = model
+        self.columns = columns
+        self.row_type = collections.namedtuple(model.__name__ + 'Row', columns)
+        self.rows = []
+        self.vectors = []
+        self.lexemes = []
+        self.postings = {}
+        self.stems = {}
+
+    def load(self, session):
+        columns = [getattr(self.model, column) for column in self.columns]
+        columns.append(sa.cast(self.model.fulltxt, sa.Text))
+        rows = session.query(
+            *columns
+        ).filter(
+            self.model.fulltxt != None,  # noqa
+        ).order_by(
+            self.model.idx,
+        )
+        postings = collections.defaultdict(list)
+        for row in rows:
+            vector = ranking.parse_vector(row[-1])
+            for lexeme in vector:
+                postings[lexeme].append(len(self.rows))
+            self.rows.append(self.row_type(*row[:-1]))
+            self.vectors.append(vector)
+        self.lexemes = sorted(postings)
+        self.postings = dict(postings)
+        stems = session.execute(STEMS_SQL.format(self.model.__tablename__))
+        for word, vector in stems:
+            self.stems[word] = list(ranking.parse_vector(vector))
+        return self
+
+    def normalize(self, word):
+        """Get the lexemes for `word`, as `to_tsquery` would. Words that do
+        not appear in the indexed names are looked up with `stem`.
+        """
+        lexemes = self.stems.get(word)
+        return stem(word) if lexemes is None else lexemes
+
+    def parse(self, text):
+        """Get (lexeme, prefix) query items for `text`."""
+        words = _word_re.findall(text.lower())
+        items = []
+        for idx, word in enumerate(words):
+            for lexeme in self.normalize(word):
+                items.append((lexeme, idx == len(words) - 1))
+        return items
+
+    def match(self, lexeme, prefix):
+        """Get the lexemes in the index matching a query item."""
+        if not prefix:
+            return [lexeme] if lexeme in self.postings else []
+        start = bisect.bisect_left(self.lexemes, lexeme)
+        stop = bisect.bisect_left(self.lexemes, lexeme + _max_char, lo=start)
+        return self.lexemes[start:stop]
+
+    def search(self, text, limit=20):
+        items = self.parse(text)
+        if not items:
+            return []
+        matches = [self.match(lexeme, prefix) for lexeme, prefix in items]
+        candidates = None
+        for lexemes in sorted(matches, key=len):
+            docs = set()
+            for lexeme in lexemes:
+                docs.update(self.postings[lexeme])
+            candidates = docs if candidates is None else candidates & docs
+            if not candidates:
+                return []
+        ranked = heapq.nlargest(
+            limit,
+            candidates,
+            key=lambda doc: (self.rank(doc, matches), -doc),
+        )
+        return [self.rows[doc] for doc in ranked]
+
+    def rank(self, doc, matches):
+        return ranking.rank(self.vectors[doc], matches)
+
+
+class IndexCache(object):
+    """Registry of loaded indexes, cleared with the other refresh caches."""
+
+    def __init__(self):
+        self.indexes = {}
+        self.lock = threading.Lock()
+
+    def get(self, model, columns):
+        index = self.indexes.get(model)
+        if index is None:
+            with self.lock:
+                index = self.indexes.get(model)
+                if index is None:
+                    index = TypeaheadIndex(model, columns).load(models.db.session)
+                    self.indexes[model] = index
+        return index
+
+    def clear(self):
+        with self.lock:
+            self.indexes = {}
+
+
+indexes = cache.register(IndexCache())
+
+COLUMNS = {
+    models.CandidateSearch: ['id', 'name', 'office_sought'],
+    models.CommitteeSearch: ['id', 'name'],
+}
+
+
+def search(model, text, limit=20):
+    """Get the top `limit` rows of `model` matching `text`."""
+    return indexes.get(model, COLUMNS[model]).search(text, limit)
+
+
+def preload():
+    for model, columns in COLUMNS.items():
+        indexes.get(model, columns)
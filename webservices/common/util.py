@@ -2,6 +2,8 @@ import os
 
 import flask
 import ujson
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
 
 
 dirname = os.path.dirname
@@ -12,18 +14,44 @@ def get_full_path(*path):
     return os.path.join(MAIN_DIRECTORY, *path)
 
 
+def any_of(column, values):
+    """Build `column = ANY(:values)`, binding `values` as a single array
+    parameter. Unlike `column IN (...)`, the statement is the same for any
+    number of values.
+    """
+    values = sa.bindparam('values', list(values), type_=ARRAY(column.type), unique=True)
+    return column == sa.func.any(values)
+
+
 def filter_query(model, query, fields, kwargs):
     for field, value in kwargs.items():
         if field not in fields or not value:
             continue
         column = getattr(model, field)
-        query = query.filter(column.in_(value))
+        query = query.filter(any_of(column, value))
     return query
 
 
+class StreamingJson(object):
+    """JSON document built incrementally from an iterable of encoded chunks.
+    Returned by schemas that serialize results as they are fetched, and
+    streamed to the client by `output_json`.
+    """
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+
 def output_json(data, code, headers=None):
     """Makes a Flask response with a JSON encoded body"""
 
+    if isinstance(data, StreamingJson):
+        resp = flask.Response(flask.stream_with_context(data), code, mimetype='application/json')
+        resp.headers.extend(headers or {})
+        return resp
+
     settings = flask.current_app.config.get('RESTFUL_JSON', {})
 
     # always end the json dumps with a new line
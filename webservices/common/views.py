@@ -1,3 +1,9 @@
+import os
+import functools
+import contextlib
+from concurrent import futures
+
+import flask
 import sqlalchemy as sa
 
 from webservices import utils
@@ -5,9 +11,60 @@ from webservices import filters
 from webservices import sorting
 from webservices import exceptions
 from webservices.common import counts
+from webservices.common import exports
 from webservices.common import models
 
 
+# Maximum number of committees for which itemized queries are combined
+MAX_COMMITTEES = 50
+
+# Above this many estimated matches, fulltext searches read rows in the order of
+# the sort index and stop after a page of matches, rather than collecting every
+# match from the GIN index and sorting them
+FULLTEXT_SEEK_THRESHOLD = int(os.getenv('FEC_FULLTEXT_SEEK_THRESHOLD', 10000))
+
+_executor = futures.ThreadPoolExecutor(
+    max_workers=int(os.getenv('FEC_COUNT_WORKERS', 8)),
+)
+
+
+def _count_with_session(engine, query):
+    session = sa.orm.Session(bind=engine)
+    try:
+        return counts.count_estimate(query.with_session(session), session, threshold=5000)
+    finally:
+        session.close()
+
+
+def count_all(queries):
+    """Estimate counts for several queries. If `PARALLEL_COUNTS` is enabled,
+    run the counts concurrently, each on its own pooled connection.
+    """
+    if len(queries) > 1 and flask.current_app.config.get('PARALLEL_COUNTS'):
+        count = functools.partial(_count_with_session, models.db.engine)
+        return list(_executor.map(count, queries))
+    return [
+        counts.count_estimate(query, models.db.session, threshold=5000)
+        for query in queries
+    ]
+
+
+@contextlib.contextmanager
+def ordered_scans(session):
+    """Steer the planner away from bitmap scans and explicit sorts for queries
+    run in this block, so that limited queries read rows in index order and
+    stop after a page. Settings are local to the current transaction and
+    restored on exit.
+    """
+    session.execute('set local enable_bitmapscan = off')
+    session.execute('set local enable_sort = off')
+    try:
+        yield
+    finally:
+        session.execute('reset enable_bitmapscan')
+        session.execute('reset enable_sort')
+
+
 class ApiResource(utils.Resource):
 
     model = None
@@ -21,13 +78,13 @@ class ApiResource(utils.Resource):
         query = self.build_query(**kwargs)
         return utils.fetch_page(query, kwargs, model=self.model, join_columns=self.join_columns)
 
-    def build_query(self, _apply_options=True, **kwargs):
+    def build_query(self, _apply_options=True, fields=None, **kwargs):
         query = self.model.query
         query = filters.filter_match(query, kwargs, self.filter_match_fields)
         query = filters.filter_multi(query, kwargs, self.filter_multi_fields)
         query = filters.filter_range(query, kwargs, self.filter_range_fields)
         if _apply_options:
-            query = query.options(*self.query_options)
+            query = query.options(*utils.filter_options(self.query_options, utils.requested_fields(fields)))
         return query
 
 
@@ -36,24 +93,40 @@ class ItemizedResource(ApiResource):
     year_column = None
     index_column = None
     filter_fulltext_fields = []
+    # Schema for a single result; used for exports
+    schema = None
 
     def get(self, **kwargs):
-        """Get itemized resources. If multiple values are passed for `committee_id`,
-        create a subquery for each and combine with `UNION ALL`. This is necessary
-        to avoid slow queries when one or more relevant committees has many
-        records.
+        """Get itemized resources, accepting up to `MAX_COMMITTEES` values for
+        `committee_id`; see `search`.
         """
         committee_ids = kwargs.get('committee_id', [])
-        if len(committee_ids) > 5:
+        if len(committee_ids) > MAX_COMMITTEES:
             raise exceptions.ApiError(
-                'Can only specify up to five values for "committee_id".',
+                'Can only specify up to {0} values for "committee_id".'.format(MAX_COMMITTEES),
                 status_code=422,
             )
-        if len(committee_ids) > 1:
+        return self.search(kwargs)
+
+    def search(self, kwargs):
+        """Search itemized resources. If up to `MAX_COMMITTEES` values are passed
+        for `committee_id`, create a subquery for each and combine with `UNION ALL`.
+        This is necessary to avoid slow queries when one or more relevant committees
+        has many records. Longer lists, which can only be passed in a JSON body,
+        are matched in a single query. If `export` is passed, stream all matching
+        records instead.
+        """
+        committee_ids = kwargs.get('committee_id', [])
+        if kwargs.get('export'):
+            return self.export(kwargs)
+        if 1 < len(committee_ids) <= MAX_COMMITTEES:
             query, count = self.join_committee_queries(kwargs)
             return utils.fetch_seek_page(query, kwargs, self.index_column, count=count)
         query = self.build_query(**kwargs)
-        count = counts.count_estimate(query, models.db.session, threshold=5000)
+        count = self.count(query, kwargs)
+        if self.use_ordered_scans(kwargs, count):
+            with ordered_scans(models.db.session):
+                return utils.fetch_seek_page(query, kwargs, self.index_column, count=count)
         return utils.fetch_seek_page(query, kwargs, self.index_column, count=count)
 
     def build_query(self, **kwargs):
@@ -62,31 +135,64 @@ class ItemizedResource(ApiResource):
         return query
 
     def join_committee_queries(self, kwargs):
-        """Build and compose per-committee subqueries using `UNION ALL`.
+        """Build and compose per-committee subqueries using `UNION ALL`. Counts
+        for each committee are estimated concurrently.
         """
         queries = []
-        total = 0
+        count_queries = []
         for committee_id in kwargs.get('committee_id', []):
-            query, count = self.build_committee_query(kwargs, committee_id)
-            queries.append(query.subquery().select())
-            total += count
+            page_query, count_query = self.build_committee_query(kwargs, committee_id)
+            queries.append(page_query.subquery().select())
+            count_queries.append(count_query)
         query = models.db.session.query(
             self.model
         ).select_entity_from(
             sa.union_all(*queries)
         )
-        query = query.options(*self.query_options)
-        return query, total
+        names = utils.requested_fields(kwargs.get('fields'))
+        query = query.options(*utils.filter_options(self.query_options, names))
+        if kwargs.get('skip_count'):
+            return query, -1
+        return query, sum(count_all(count_queries))
 
     def build_committee_query(self, kwargs, committee_id):
-        """Build a subquery by committee.
+        """Build a subquery by committee, along with the query to count.
         """
         query = self.build_query(_apply_options=False, **utils.extend(kwargs, {'committee_id': [committee_id]}))
         sort, hide_null, nulls_large = kwargs['sort'], kwargs['sort_hide_null'], kwargs['sort_nulls_large']
         query, _ = sorting.sort(query, sort, model=self.model, hide_null=hide_null, nulls_large=nulls_large)
         page_query = utils.fetch_seek_page(query, kwargs, self.index_column, count=-1, eager=False).results
-        count = counts.count_estimate(query, models.db.session, threshold=5000)
-        return page_query, count
+        return page_query, query
+
+    def export(self, kwargs):
+        """Stream all matching records in the requested format, sorted by
+        the requested sort column and index, without pagination or counts.
+        """
+        query = self.build_query(**kwargs)
+        sort, hide_null, nulls_large = kwargs['sort'], kwargs['sort_hide_null'], kwargs['sort_nulls_large']
+        query, columns = sorting.sort(query, sort, model=self.model, hide_null=hide_null, nulls_large=nulls_large)
+        query = query.order_by(self.index_column)
+        names = utils.requested_fields(kwargs.get('fields'))
+        extra = [self.index_column.key] + [column.key for column, _ in columns]
+        query = utils.load_fields(query, self.model, names, extra=extra)
+        schema = self.schema(only=tuple(name for name in names or () if name in self.schema._declared_fields))
+        return exports.export(query, schema, kwargs['export'], self.model.__tablename__)
+
+    def count(self, query, kwargs):
+        if kwargs.get('skip_count'):
+            return -1
+        return counts.count_estimate(query, models.db.session, threshold=5000)
+
+    def use_ordered_scans(self, kwargs, count):
+        """Whether to page through a fulltext search by walking the index on the
+        sort column. Worthwhile only for common terms: the walk stops as soon as
+        a page of matches is found, but rare terms would walk most of the
+        index. Searches that skip counts have no estimate to go by, and use the
+        default plan.
+        """
+        if not any(kwargs.get(key) for key, _ in self.filter_fulltext_fields):
+            return False
+        return count >= FULLTEXT_SEEK_THRESHOLD
 
     def filter_fulltext(self, query, kwargs):
         for key, column in self.filter_fulltext_fields:
@@ -0,0 +1,105 @@
+"""Opaque, signed pagination cursors.
+
+A cursor is a URL-safe base64 encoding of the sort key values of the last
+result on a page, along with a hash of the request path and filters that
+produced it, followed by an HMAC signature. Cursors are rejected if they have
+been tampered with or are replayed against different filters.
+"""
+
+import os
+import hmac
+import json
+import base64
+import decimal
+import hashlib
+import binascii
+import datetime
+
+import flask
+
+from webservices import exceptions
+from webservices.common import cache
+
+
+SECRET = os.getenv('FEC_CURSOR_SECRET', '').encode('utf-8')
+
+# Arguments that select a page or output fields rather than filter results
+PAGING_ARGS = ('cursor', 'page', 'per_page', 'last_index', 'skip_count', 'fields', 'api_key')
+
+
+def _secret():
+    """Get the key used to sign cursors. A secret is required outside of
+    testing, since anyone could forge cursors signed with a known key; it is
+    checked here rather than on startup so that commands that never sign
+    cursors can run without one.
+    """
+    testing = flask.has_app_context() and flask.current_app.config.get('TESTING')
+    if not SECRET and not testing:
+        raise RuntimeError('FEC_CURSOR_SECRET must be set to sign pagination cursors')
+    return SECRET
+
+
+def _default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError('Cannot encode value {0!r}'.format(value))
+
+
+def _b64encode(value):
+    return base64.urlsafe_b64encode(value).decode('ascii').rstrip('=')
+
+
+def _b64decode(value):
+    padded = value + '=' * (-len(value) % 4)
+    return base64.urlsafe_b64decode(padded.encode('ascii'))
+
+
+def _sign(body):
+    digest = hmac.new(_secret(), body.encode('utf-8'), hashlib.sha256).digest()
+    return _b64encode(digest[:12])
+
+
+def filter_hash(kwargs):
+    """Hash the request path and filtering arguments in `kwargs`."""
+    filters = {
+        key: value
+        for key, value in kwargs.items()
+        if key not in PAGING_ARGS and not key.startswith('last_')
+    }
+    path = flask.request.path if flask.has_request_context() else None
+    return cache.make_key(path, filters)[:16]
+
+
+def encode(values, kwargs):
+    """Encode sort key values as a cursor bound to the filters in `kwargs`."""
+    payload = {'v': values, 'f': filter_hash(kwargs)}
+    dumped = json.dumps(payload, default=_default, separators=(',', ':'))
+    body = _b64encode(dumped.encode('utf-8'))
+    return '{0}.{1}'.format(body, _sign(body))
+
+
+def decode(cursor, kwargs, length=None):
+    """Decode a cursor to a list of sort key values.
+
+    :param str cursor: Encoded cursor
+    :param dict kwargs: Parsed request arguments; must match the arguments
+        used to encode the cursor
+    :param int length: Expected number of values
+    :raises: ApiError if the cursor is malformed, tampered with, or was
+        issued for different filters
+    """
+    body, _, signature = cursor.partition('.')
+    if not hmac.compare_digest(signature.encode('utf-8'), _sign(body).encode('utf-8')):
+        raise exceptions.ApiError('Invalid cursor', status_code=422)
+    try:
+        payload = json.loads(_b64decode(body).decode('utf-8'))
+        values, filters = payload['v'], payload['f']
+    except (ValueError, TypeError, KeyError, UnicodeError, binascii.Error):
+        raise exceptions.ApiError('Invalid cursor', status_code=422)
+    if not isinstance(values, list) or (length is not None and len(values) != length):
+        raise exceptions.ApiError('Invalid cursor', status_code=422)
+    if filters != filter_hash(kwargs):
+        raise exceptions.ApiError('Cursor does not match request filters', status_code=422)
+    return values
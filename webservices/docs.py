@@ -88,6 +88,11 @@ particular person or group, using a name to find the `candidate_id` or `committe
 this endpoint can be a helpful first step.
 '''
 
+NAME_FUZZY = '''
+Also match names similar to `name`, such as misspellings, and sort results by similarity
+to `name` before any other sort.
+'''
+
 CANDIDATE_LIST = '''
 Fetch basic information about candidates, and use parameters to filter results to the
 candidates you're looking for.
@@ -285,6 +290,9 @@ pagination: {
 To fetch the next page of results, append "last_index=230880619&last_contribution_receipt_date=2014-01-01"
 to the URL.
 
+Alternatively, pass the value of `next_cursor` from `pagination` as the
+`cursor` argument, keeping the other arguments of your last request the same.
+
 Note: because the Schedule A data includes many records, counts for
 large result sets are approximate.
 '''
@@ -318,6 +326,9 @@ pagination: {
 To fetch the next page of results, append "last_index=230906248&amp;last_disbursement_date=2014-07-04"
 to the URL.
 
+Alternatively, pass the value of `next_cursor` from `pagination` as the
+`cursor` argument, keeping the other arguments of your last request the same.
+
 Note: because the Schedule A data includes many records, counts for
 large result sets are approximate.
 '''
@@ -362,6 +373,19 @@ Note: because the Schedule E data includes many records, counts for
 large result sets are approximate.
 '''
 
+AGGREGATE_EXPORT = '''
+Export all aggregates matching the given filters as CSV, with a header row.
+Values keep their database types: totals are exact decimals and counts are
+integers. Results are not paginated.
+'''
+
+BATCH = '''
+Fetch up to 100 resources in a single request. Post a JSON object with a list of
+resource paths, such as `{"requests": ["/candidate/P80003338/", "/committee/C00431445/totals/"]}`.
+Results are keyed by path, and include the status code and body of each response.
+Exports and streamed results (`per_page=0`) cannot be requested in a batch.
+'''
+
 SIZE_DESCRIPTION = '''
 This endpoint aggregates Schedule A donations based on size:
 
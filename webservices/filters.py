@@ -2,6 +2,7 @@ import sqlalchemy as sa
 
 from webservices import utils
 from webservices import exceptions
+from webservices.common import util
 from webservices.common import models
 
 
@@ -15,7 +16,7 @@ def filter_match(query, kwargs, fields):
 def filter_multi(query, kwargs, fields):
     for key, column in fields:
         if kwargs.get(key):
-            query = query.filter(column.in_(kwargs[key]))
+            query = query.filter(util.any_of(column, kwargs[key]))
     return query
 
 
@@ -10,6 +10,7 @@ from webservices import filters
 from webservices import schemas
 from webservices.common import counts
 from webservices.common import models
+from webservices.common import exports
 from webservices.utils import use_kwargs
 from webservices.common.views import ApiResource
 
@@ -38,6 +39,36 @@ class AggregateResource(ApiResource):
         return query
 
 
+class AggregateExportResource(utils.Resource):
+    """Export all aggregates matching the filters of `view` as CSV; see
+    `exports.copy_export`.
+    """
+
+    view = None
+    # Exports stream files rather than JSON, and cannot be batched
+    streamed = True
+
+    @property
+    def query_args(self):
+        return self.view.query_args
+
+    @use_kwargs(Ref('query_args'))
+    def get(self, committee_id=None, **kwargs):
+        query = self.view().build_query(committee_id=committee_id, _apply_options=False, **kwargs)
+        model = self.view.model
+        return exports.copy_export(query, model, models.db.session, model.__tablename__)
+
+
+def make_export_resource(view, tags):
+    """Create an export resource for the aggregate resource `view`."""
+    resource = type(
+        '{0}Export'.format(view.__name__),
+        (AggregateExportResource, ),
+        {'view': view},
+    )
+    return doc(tags=tags, description=docs.AGGREGATE_EXPORT)(resource)
+
+
 @doc(
     tags=['schedules/schedule_a'],
     description=docs.SIZE_DESCRIPTION,
@@ -0,0 +1,114 @@
+import logging
+from urllib import parse
+
+import flask
+import ujson
+from werkzeug.exceptions import HTTPException
+from flask_apispec import doc, marshal_with
+
+from webservices import args
+from webservices import docs
+from webservices import utils
+from webservices import schemas
+from webservices import exceptions
+from webservices.common import models
+from webservices.utils import use_kwargs
+
+
+logger = logging.getLogger(__name__)
+
+
+# Maximum number of sub-requests per batch
+MAX_REQUESTS = 100
+
+# Headers forwarded from the batch request to each sub-request
+FORWARDED_HEADERS = ('X-Api-Key', 'X-Forwarded-For', 'User-Agent')
+
+
+def unpaged(values):
+    """Check whether any of the `per_page` `values` disables pagination.
+    Values that are not integers are left for the resource to reject.
+    """
+    for value in values:
+        try:
+            if int(value) <= 0:
+                return True
+        except ValueError:
+            continue
+    return False
+
+
+def resolve(path):
+    """Get the full path for a sub-request `path`, relative to the blueprint
+    of the current request.
+
+    :raises: ApiError if `path` does not match a resource that can be batched,
+        or requests an export or streamed response
+    """
+    prefix = flask.current_app.blueprints[flask.request.blueprint].url_prefix or ''
+    full_path = path if path.startswith(prefix + '/') else prefix + '/' + path.lstrip('/')
+    base, _, query = full_path.partition('?')
+    adapter = flask.current_app.create_url_adapter(flask.request)
+    try:
+        endpoint, _ = adapter.match(base, method='GET')
+    except HTTPException:
+        raise exceptions.ApiError('No resource found for "{0}"'.format(path), status_code=422)
+    view_class = getattr(flask.current_app.view_functions.get(endpoint), 'view_class', None)
+    params = parse.parse_qs(query)
+    streamed = getattr(view_class, 'streamed', False)
+    if streamed or any(params.get('export', [])) or unpaged(params.get('per_page', [])):
+        raise exceptions.ApiError(
+            'Cannot export or stream results for "{0}" in a batch'.format(path),
+            status_code=422,
+        )
+    return full_path
+
+
+def fetch(full_path):
+    """Dispatch a `GET` request for `full_path` within the current request,
+    sharing its application context and database session. Each sub-request
+    runs in its own savepoint, so that a database error in one sub-request is
+    rolled back without aborting the others; unexpected errors are reported as
+    the result of the failed sub-request only.
+    """
+    app = flask.current_app
+    headers = [
+        (key, flask.request.headers[key])
+        for key in FORWARDED_HEADERS
+        if key in flask.request.headers
+    ]
+    environ = {'REMOTE_ADDR': flask.request.remote_addr}
+    savepoint = models.db.session.begin_nested()
+    try:
+        with app.test_request_context(full_path, method='GET', headers=headers, environ_base=environ):
+            response = app.full_dispatch_request()
+            body = response.get_data(as_text=True)
+        data = ujson.loads(body) if response.mimetype == 'application/json' else None
+    except Exception:
+        logger.exception('Batch request for "%s" failed', full_path)
+        return {'status': 500, 'data': {'message': 'Internal server error'}}
+    finally:
+        # Sub-requests are read-only, so their savepoints are always discarded
+        if savepoint.is_active:
+            savepoint.rollback()
+    return {'status': response.status_code, 'data': data}
+
+
+@doc(
+    tags=['batch'],
+    description=docs.BATCH,
+)
+class BatchView(utils.Resource):
+
+    @use_kwargs(args.batch, locations=('json', ))
+    @marshal_with(schemas.BatchSchema())
+    def post(self, requests, **kwargs):
+        if len(requests) > MAX_REQUESTS:
+            raise exceptions.ApiError(
+                'Can only specify up to {0} requests.'.format(MAX_REQUESTS),
+                status_code=422,
+            )
+        resolved = [(path, resolve(path)) for path in requests]
+        return {
+            'results': {path: fetch(full_path) for path, full_path in resolved},
+        }
@@ -49,25 +49,29 @@ class CandidateList(utils.Resource):
 
         candidates = self.query
 
-        if kwargs.get('q'):
-            candidates = utils.search_text(
-                candidates.join(
-                    models.CandidateSearch,
-                    models.Candidate.candidate_id == models.CandidateSearch.id,
-                ),
-                models.CandidateSearch.fulltxt,
-                kwargs['q'],
-            ).distinct()
-
         candidates = filter_query(models.Candidate, candidates, filter_fields, kwargs)
 
         if kwargs.get('name'):
-            candidates = candidates.filter(models.Candidate.name.ilike('%{}%'.format(kwargs['name'])))
+            candidates = utils.search_name(
+                candidates,
+                models.Candidate.name,
+                kwargs['name'],
+                fuzzy=kwargs.get('name_fuzzy'),
+            )
 
         # TODO(jmcarp) Reintroduce year filter pending accurate `load_date` and `expire_date` values
         if kwargs.get('cycle'):
             candidates = candidates.filter(models.Candidate.cycles.overlap(kwargs['cycle']))
 
+        # Search last, so that ranked candidates are drawn from filtered rows
+        if kwargs.get('q'):
+            candidates = utils.search_text_ranked(
+                candidates,
+                models.Candidate.candidate_id,
+                models.CandidateSearch,
+                kwargs['q'],
+            )
+
         return candidates
 
 
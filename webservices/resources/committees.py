@@ -58,18 +58,13 @@ class CommitteeList(utils.Resource):
                 models.Committee.candidate_ids.overlap(kwargs['candidate_id'])
             )
 
-        if kwargs.get('q'):
-            committees = utils.search_text(
-                committees.join(
-                    models.CommitteeSearch,
-                    models.Committee.committee_id == models.CommitteeSearch.id,
-                ),
-                models.CommitteeSearch.fulltxt,
-                kwargs['q'],
-            ).distinct()
-
         if kwargs.get('name'):
-            committees = committees.filter(models.Committee.name.ilike('%{}%'.format(kwargs['name'])))
+            committees = utils.search_name(
+                committees,
+                models.Committee.name,
+                kwargs['name'],
+                fuzzy=kwargs.get('name_fuzzy'),
+            )
 
         committees = filter_query(models.Committee, committees, list_filter_fields, kwargs)
 
@@ -84,6 +79,15 @@ class CommitteeList(utils.Resource):
         if kwargs.get('max_first_file_date'):
             committees = committees.filter(models.Committee.first_file_date <= kwargs['max_first_file_date'])
 
+        # Search last, so that ranked candidates are drawn from filtered rows
+        if kwargs.get('q'):
+            committees = utils.search_text_ranked(
+                committees,
+                models.Committee.committee_id,
+                models.CommitteeSearch,
+                kwargs['q'],
+            )
+
         return committees
 
 
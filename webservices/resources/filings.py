@@ -76,15 +76,26 @@ class FilingsList(BaseFilings):
         ('candidate_id', models.Filings.candidate_id),
     ]
 
-    @use_kwargs(args.paging)
-    @use_kwargs(args.filings)
-    @use_kwargs(args.entities)
-    @use_kwargs(
+    # Arguments shared by `GET` and `POST` searches
+    search_args = [
+        args.paging,
+        args.filings,
+        args.entities,
         args.make_sort_args(
             default=['-receipt_date'],
             validator=args.IndexValidator(models.Filings),
-        )
-    )
+        ),
+    ]
+
+    @use_kwargs(utils.extend(*search_args))
     @marshal_with(schemas.FilingsPageSchema())
     def get(self, **kwargs):
         return super().get(**kwargs)
+
+    @use_kwargs(utils.extend(*search_args), locations=('json', ))
+    @marshal_with(schemas.FilingsPageSchema())
+    def post(self, **kwargs):
+        """Search filings with arguments passed in a JSON body, for filters
+        with too many values to fit in a URL.
+        """
+        return super().get(**kwargs)
@@ -5,7 +5,9 @@ from webservices import args
 from webservices import docs
 from webservices import utils
 from webservices import schemas
+from webservices.common import util
 from webservices.common import models
+from webservices.common import committee_types
 from webservices.utils import use_kwargs
 
 
@@ -72,18 +74,18 @@ class ReportsView(utils.Resource):
         query = reports_class.query
 
         # Eagerly load committees if applicable
-        if hasattr(reports_class, 'committee'):
+        if hasattr(reports_class, 'committee') and self._committee_requested(kwargs):
             query = reports_class.query.options(sa.orm.joinedload(reports_class.committee))
 
         if committee_id is not None:
             query = query.filter_by(committee_id=committee_id)
 
         if kwargs.get('year'):
-            query = query.filter(reports_class.report_year.in_(kwargs['year']))
+            query = query.filter(util.any_of(reports_class.report_year, kwargs['year']))
         if kwargs.get('cycle'):
-            query = query.filter(reports_class.cycle.in_(kwargs['cycle']))
+            query = query.filter(util.any_of(reports_class.cycle, kwargs['cycle']))
         if kwargs.get('beginning_image_number'):
-            query = query.filter(reports_class.beginning_image_number.in_(kwargs['beginning_image_number']))
+            query = query.filter(util.any_of(reports_class.beginning_image_number, kwargs['beginning_image_number']))
 
         if kwargs.get('report_type'):
             include, exclude = parse_types(kwargs['report_type'])
@@ -98,18 +100,12 @@ class ReportsView(utils.Resource):
 
         return query, reports_class, reports_schema
 
+    def _committee_requested(self, kwargs):
+        fields = utils.requested_fields(kwargs.get('fields'))
+        return fields is None or 'committee_type' in fields
+
     def _resolve_committee_type(self, committee_id, committee_type, kwargs):
         if committee_id is not None:
-            query = models.CommitteeHistory.query.filter_by(committee_id=committee_id)
-            if kwargs.get('cycle'):
-                query = query.filter(models.CommitteeHistory.cycle.in_(kwargs['cycle']))
-            query = query.order_by(sa.desc(models.CommitteeHistory.cycle))
-            committee = (
-                query.first() or
-                models.CommitteeDetail.query.filter_by(
-                    committee_id=committee_id
-                ).first_or_404()
-            )
-            return committee.committee_type
+            return committee_types.resolve(committee_id, kwargs.get('cycle'))
         elif committee_type is not None:
             return reports_type_map.get(committee_type)
@@ -3,8 +3,10 @@ from flask_apispec import doc, marshal_with
 
 from webservices import args
 from webservices import docs
+from webservices import utils
 from webservices import filters
 from webservices import schemas
+from webservices.common import util
 from webservices.common import models
 from webservices.utils import use_kwargs
 from webservices.common.views import ItemizedResource
@@ -26,6 +28,7 @@ is_individual = sa.func.is_individual(
 class ScheduleAView(ItemizedResource):
 
     model = models.ScheduleA
+    schema = schemas.ScheduleASchema
 
     @property
     def year_column(self):
@@ -62,10 +65,11 @@ class ScheduleAView(ItemizedResource):
         sa.orm.joinedload(models.ScheduleA.contributor),
     ]
 
-    @use_kwargs(args.itemized)
-    @use_kwargs(args.schedule_a)
-    @use_kwargs(args.make_seek_args())
-    @use_kwargs(
+    # Arguments shared by `GET` and `POST` searches
+    search_args = [
+        args.itemized,
+        args.schedule_a,
+        args.make_seek_args(),
         args.make_sort_args(
             validator=args.OptionValidator([
                 'contribution_receipt_date',
@@ -73,13 +77,34 @@ class ScheduleAView(ItemizedResource):
                 'contributor_aggregate_ytd',
             ]),
             multiple=False,
-        )
-    )
+        ),
+    ]
+
+    @use_kwargs(utils.extend(*search_args))
     @marshal_with(schemas.ScheduleAPageSchema())
     def get(self, **kwargs):
         return super().get(**kwargs)
 
+    @use_kwargs(utils.extend(*search_args), locations=('json', ))
+    @marshal_with(schemas.ScheduleAPageSchema())
+    def post(self, **kwargs):
+        """Search receipts with arguments passed in a JSON body, for filters
+        with too many values to fit in a URL. Any number of values may be
+        passed for `committee_id`.
+        """
+        return self.search(kwargs)
+
     def build_query(self, **kwargs):
         query = super().build_query(**kwargs)
+        query = self.filter_cycle(query, kwargs)
         query = filters.filter_contributor_type(query, self.model.entity_type, kwargs)
         return query
+
+    def filter_cycle(self, query, kwargs):
+        """Restrict to the report years of the requested two-year cycles, which
+        skips the partitions for other cycles.
+        """
+        if kwargs.get('cycle'):
+            years = [year for cycle in kwargs['cycle'] for year in (cycle - 1, cycle)]
+            query = query.filter(util.any_of(self.year_column, years))
+        return query
@@ -16,6 +16,7 @@ from webservices.common.views import ItemizedResource
 class ScheduleBView(ItemizedResource):
 
     model = models.ScheduleB
+    schema = schemas.ScheduleBSchema
 
     @property
     def year_column(self):
@@ -17,6 +17,7 @@ from webservices.common.views import ItemizedResource
 class ScheduleEView(ItemizedResource):
 
     model = models.ScheduleE
+    schema = schemas.ScheduleESchema
 
     @property
     def year_column(self):
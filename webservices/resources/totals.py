@@ -1,4 +1,3 @@
-import sqlalchemy as sa
 from flask_apispec import doc, marshal_with
 
 from webservices import args
@@ -6,6 +5,7 @@ from webservices import docs
 from webservices import utils
 from webservices import schemas
 from webservices.common import models
+from webservices.common import committee_types
 from webservices.utils import use_kwargs
 
 
@@ -48,14 +48,4 @@ class TotalsView(utils.Resource):
         return totals
 
     def _resolve_committee_type(self, committee_id, kwargs):
-        query = models.CommitteeHistory.query.filter_by(committee_id=committee_id)
-        if kwargs.get('cycle'):
-            query = query.filter(models.CommitteeHistory.cycle.in_(kwargs['cycle']))
-        query = query.order_by(sa.desc(models.CommitteeHistory.cycle))
-        committee = (
-            query.first() or
-            models.CommitteeDetail.query.filter_by(
-                committee_id=committee_id
-            ).first_or_404()
-        )
-        return committee.committee_type
+        return committee_types.resolve(committee_id, kwargs.get('cycle'))
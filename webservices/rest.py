@@ -6,6 +6,8 @@ import os
 import http
 import logging
 
+import sqlalchemy as sa
+
 from flask import abort
 from flask import request
 from flask import jsonify
@@ -29,6 +31,8 @@ from webservices import schemas
 from webservices import exceptions
 from webservices.common import util
 from webservices.common import models
+from webservices.common import committee_types
+from webservices.common import typeahead
 from webservices.utils import use_kwargs
 from webservices.common.models import db
 from webservices.resources import totals
@@ -43,6 +47,7 @@ from webservices.resources import committees
 from webservices.resources import elections
 from webservices.resources import filings
 from webservices.resources import dates
+from webservices.resources import batch
 
 speedlogger = logging.getLogger('speed')
 speedlogger.setLevel(logging.CRITICAL)
@@ -62,6 +67,9 @@ app = Flask(__name__)
 app.debug = True
 app.config['SQLALCHEMY_DATABASE_URI'] = sqla_conn_string()
 app.config['APISPEC_FORMAT_RESPONSE'] = None
+app.config['RESPONSE_CACHE_ENABLED'] = os.getenv('FEC_RESPONSE_CACHE', 'true') not in ('False', 'false', 'f')
+app.config['PARALLEL_COUNTS'] = os.getenv('FEC_PARALLEL_COUNTS', 'true') not in ('False', 'false', 'f')
+app.config['TYPEAHEAD_INDEX'] = os.getenv('FEC_TYPEAHEAD_INDEX', 'true') not in ('False', 'false', 'f')
 # app.config['SQLALCHEMY_ECHO'] = True
 db.init_app(app)
 cors.CORS(app)
@@ -116,6 +124,21 @@ def limit_remote_addr():
                 abort(403)
 
 
+@app.before_first_request
+def preload_metadata():
+    """Warm metadata caches so that catalog and committee type lookups and
+    typeahead indexes stay out of the request path.
+    """
+    try:
+        args.preload_indexed_columns()
+        committee_types.preload()
+        if app.config['TYPEAHEAD_INDEX']:
+            typeahead.preload()
+    except sa.exc.SQLAlchemyError:
+        logger.exception('Failed to preload metadata')
+        db.session.rollback()
+
+
 @app.after_request
 def add_caching_headers(response):
     max_age = os.getenv('FEC_CACHE_AGE')
@@ -129,6 +152,15 @@ def search_typeahead_text(model, text):
     query = query.limit(20)
     return {'results': query.all()}
 
+
+def search_typeahead(model, text):
+    """Search names using the in-memory index if `TYPEAHEAD_INDEX` is enabled,
+    else in the database.
+    """
+    if app.config['TYPEAHEAD_INDEX']:
+        return {'results': typeahead.search(model, text)}
+    return search_typeahead_text(model, text)
+
 @doc(
     tags=['search'],
     description=docs.NAME_SEARCH,
@@ -142,7 +174,7 @@ class CandidateNameSearch(utils.Resource):
     @use_kwargs(args.names)
     @marshal_with(schemas.CandidateSearchListSchema())
     def get(self, **kwargs):
-        return search_typeahead_text(models.CandidateSearch, kwargs['q'])
+        return search_typeahead(models.CandidateSearch, kwargs['q'])
 
 
 @doc(
@@ -158,7 +190,7 @@ class CommitteeNameSearch(utils.Resource):
     @use_kwargs(args.names)
     @marshal_with(schemas.CommitteeSearchListSchema())
     def get(self, **kwargs):
-        return search_typeahead_text(models.CommitteeSearch, kwargs['q'])
+        return search_typeahead(models.CommitteeSearch, kwargs['q'])
 
 
 api.add_resource(candidates.CandidateList, '/candidates/')
@@ -201,12 +233,21 @@ api.add_resource(elections.ElectionSummary, '/elections/summary/')
 api.add_resource(dates.ElectionDatesView, '/election-dates/')
 api.add_resource(dates.ReportingDatesView, '/reporting-dates/')
 
+export_resources = []
+
 def add_aggregate_resource(api, view, schedule, label):
     api.add_resource(
         view,
         '/schedules/schedule_{schedule}/by_{label}/'.format(**locals()),
         '/committee/<committee_id>/schedules/schedule_{schedule}/by_{label}/'.format(**locals()),
     )
+    export = aggregates.make_export_resource(view, ['schedules/schedule_{0}'.format(schedule)])
+    api.add_resource(
+        export,
+        '/schedules/schedule_{schedule}/by_{label}/export/'.format(**locals()),
+        '/committee/<committee_id>/schedules/schedule_{schedule}/by_{label}/export/'.format(**locals()),
+    )
+    export_resources.append(export)
 
 add_aggregate_resource(api, aggregates.ScheduleABySizeView, 'a', 'size')
 add_aggregate_resource(api, aggregates.ScheduleAByStateView, 'a', 'state')
@@ -241,45 +282,60 @@ api.add_resource(
     '/candidate/<candidate_id>/filings/',
 )
 api.add_resource(filings.FilingsList, '/filings/')
+api.add_resource(batch.BatchView, '/batch/')
+
+
+documented_resources = [
+    CandidateNameSearch,
+    CommitteeNameSearch,
+    candidates.CandidateView,
+    candidates.CandidateList,
+    candidates.CandidateSearch,
+    candidates.CandidateHistoryView,
+    committees.CommitteeView,
+    committees.CommitteeList,
+    committees.CommitteeHistoryView,
+    reports.ReportsView,
+    totals.TotalsView,
+    sched_a.ScheduleAView,
+    sched_b.ScheduleBView,
+    sched_e.ScheduleEView,
+    aggregates.ScheduleABySizeView,
+    aggregates.ScheduleAByStateView,
+    aggregates.ScheduleAByZipView,
+    aggregates.ScheduleAByEmployerView,
+    aggregates.ScheduleAByOccupationView,
+    aggregates.ScheduleAByContributorView,
+    aggregates.ScheduleBByRecipientView,
+    aggregates.ScheduleBByRecipientIDView,
+    aggregates.ScheduleBByPurposeView,
+    aggregates.ScheduleEByCandidateView,
+    aggregates.CommunicationCostByCandidateView,
+    aggregates.ElectioneeringByCandidateView,
+] + export_resources + [
+    candidate_aggregates.ScheduleABySizeCandidateView,
+    candidate_aggregates.ScheduleAByStateCandidateView,
+    filings.FilingsView,
+    filings.FilingsList,
+    elections.ElectionList,
+    elections.ElectionView,
+    elections.ElectionSummary,
+    dates.ReportingDatesView,
+    batch.BatchView,
+]
+
+
+def register_docs(app, resources):
+    """Add `resources` to the spec. Deferred until the spec is first built,
+    since converting every resource is the bulk of the spec's cost.
+    """
+    from flask_apispec.apidoc import Documentation
+    apidoc = Documentation(app, spec.spec)
+    for resource in resources:
+        apidoc.register(resource, blueprint='v1')
 
 
-from flask_apispec.apidoc import Documentation
-docs = Documentation(app, spec.spec)
-
-docs.register(CandidateNameSearch, blueprint='v1')
-docs.register(CommitteeNameSearch, blueprint='v1')
-docs.register(candidates.CandidateView, blueprint='v1')
-docs.register(candidates.CandidateList, blueprint='v1')
-docs.register(candidates.CandidateSearch, blueprint='v1')
-docs.register(candidates.CandidateHistoryView, blueprint='v1')
-docs.register(committees.CommitteeView, blueprint='v1')
-docs.register(committees.CommitteeList, blueprint='v1')
-docs.register(committees.CommitteeHistoryView, blueprint='v1')
-docs.register(reports.ReportsView, blueprint='v1')
-docs.register(totals.TotalsView, blueprint='v1')
-docs.register(sched_a.ScheduleAView, blueprint='v1')
-docs.register(sched_b.ScheduleBView, blueprint='v1')
-docs.register(sched_e.ScheduleEView, blueprint='v1')
-docs.register(aggregates.ScheduleABySizeView, blueprint='v1')
-docs.register(aggregates.ScheduleAByStateView, blueprint='v1')
-docs.register(aggregates.ScheduleAByZipView, blueprint='v1')
-docs.register(aggregates.ScheduleAByEmployerView, blueprint='v1')
-docs.register(aggregates.ScheduleAByOccupationView, blueprint='v1')
-docs.register(aggregates.ScheduleAByContributorView, blueprint='v1')
-docs.register(aggregates.ScheduleBByRecipientView, blueprint='v1')
-docs.register(aggregates.ScheduleBByRecipientIDView, blueprint='v1')
-docs.register(aggregates.ScheduleBByPurposeView, blueprint='v1')
-docs.register(aggregates.ScheduleEByCandidateView, blueprint='v1')
-docs.register(aggregates.CommunicationCostByCandidateView, blueprint='v1')
-docs.register(aggregates.ElectioneeringByCandidateView, blueprint='v1')
-docs.register(candidate_aggregates.ScheduleABySizeCandidateView, blueprint='v1')
-docs.register(candidate_aggregates.ScheduleAByStateCandidateView, blueprint='v1')
-docs.register(filings.FilingsView, blueprint='v1')
-docs.register(filings.FilingsList, blueprint='v1')
-docs.register(elections.ElectionList, blueprint='v1')
-docs.register(elections.ElectionView, blueprint='v1')
-docs.register(elections.ElectionSummary, blueprint='v1')
-docs.register(dates.ReportingDatesView, blueprint='v1')
+spec.defer(register_docs, app, documented_resources)
 
 
 # Adapted from https://github.com/noirbizarre/flask-restplus
@@ -294,7 +350,7 @@ docs = Blueprint(
 
 @docs.route('/swagger')
 def api_spec():
-    return jsonify(spec.spec.to_dict())
+    return jsonify(spec.build().to_dict())
 
 
 @docs.add_app_template_global
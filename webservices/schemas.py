@@ -1,23 +1,138 @@
 import re
 import functools
 
+import flask
+import ujson
 import marshmallow as ma
-from marshmallow_sqlalchemy import ModelSchema
+import marshmallow_sqlalchemy as ma_sqla
+from marshmallow.decorators import PRE_DUMP, POST_DUMP
 from marshmallow_pagination import schemas as paging_schemas
 
 from webservices import utils
-from webservices.spec import spec
+from webservices import serializers
+from webservices import spec
+from webservices.common import util
 from webservices.common import models
 from webservices import __API_VERSION__
 
 
-spec.definition('OffsetInfo', schema=paging_schemas.OffsetInfoSchema)
-spec.definition('SeekInfo', schema=paging_schemas.SeekInfoSchema)
+class OffsetInfoSchema(paging_schemas.OffsetInfoSchema):
+    next_cursor = ma.fields.Str()
+
+
+@functools.lru_cache(maxsize=256)
+def sparse_schema(schema_class, names):
+    """Get a shared instance of `schema_class` that serializes only the
+    declared fields among `names`.
+    """
+    return schema_class(only=tuple(sorted(name for name in names if name in schema_class._declared_fields)))
+
+
+@functools.lru_cache(maxsize=256)
+def _page_info_schema(page_schema_class):
+    return page_schema_class(exclude=('results', ))
+
+
+def _restrict(data, names):
+    return {key: value for key, value in data.items() if key in names}
+
+
+class SparsePageSchema(ma.Schema):
+    """Page schema mixin that restricts results to the fields requested with
+    the `fields` argument, as recorded on the page by `utils.sparse_page`.
+    Results are serialized with a results schema limited to those fields; see
+    `sparse_schema`. Streaming pages are serialized one result at a time as
+    the response is written.
+    """
+
+    def dump(self, obj, *args, **kwargs):
+        names = getattr(obj, 'fields', None)
+        if isinstance(obj, utils.StreamingPage):
+            return ma.schema.MarshalResult(util.StreamingJson(self._iter_streaming(obj, names)), {})
+        if names is None:
+            return super().dump(obj, *args, **kwargs)
+        result = super(SparsePageSchema, _page_info_schema(type(self))).dump(obj, *args, **kwargs)
+        schema = sparse_schema(self.Meta.results_schema_class, frozenset(names))
+        result.data['results'] = [
+            _restrict(each, names)
+            for each in schema.dump(list(obj.results), many=True).data
+        ]
+        return result
+
+    def _iter_streaming(self, page, names):
+        """Encode a streaming page as JSON, writing the pagination info after
+        the results so that the count is known without a separate query.
+        """
+        settings = flask.current_app.config.get('RESTFUL_JSON', {})
+        if names is None:
+            schema = self.Meta.results_schema_class()
+        else:
+            schema = sparse_schema(self.Meta.results_schema_class, frozenset(names))
+        yield '{{"api_version":{0},"results":['.format(ujson.dumps(__API_VERSION__))
+        count = 0
+        for row in page:
+            data = schema.dump(row).data
+            if names is not None:
+                data = _restrict(data, names)
+            yield (',' if count else '') + ujson.dumps(data, **settings)
+            count += 1
+        info = {'count': count, 'page': 1, 'pages': 1, 'per_page': 0}
+        yield '],"pagination":{0}}}\n'.format(ujson.dumps(info, **settings))
+
+
+class OffsetPageSchema(SparsePageSchema, paging_schemas.OffsetPageSchema):
+    pagination = ma.fields.Nested(OffsetInfoSchema, ref='#/definitions/OffsetInfo', attribute='info')
+
+
+class SeekInfoSchema(paging_schemas.SeekInfoSchema):
+    next_cursor = ma.fields.Str()
+
+
+class SeekPageSchema(SparsePageSchema, paging_schemas.SeekPageSchema):
+    pagination = ma.fields.Nested(SeekInfoSchema, ref='#/definitions/SeekInfo', attribute='info')
+
+
+spec.defer(spec.spec.definition, 'OffsetInfo', schema=OffsetInfoSchema)
+spec.defer(spec.spec.definition, 'SeekInfo', schema=SeekInfoSchema)
+
+
+class ModelSchema(ma_sqla.ModelSchema):
+    """Model schema that dumps model instances through a generated serializer;
+    see `webservices.serializers`. Falls back to marshmallow for other objects,
+    field errors, and schemas with dump processors.
+    """
+
+    def dump(self, obj, many=None, update_fields=True, **kwargs):
+        many = self.many if many is None else bool(many)
+        objs = list(obj) if many and obj is not None else [obj]
+        if not self._can_serialize(objs):
+            return super().dump(objs if many else obj, many=many, update_fields=update_fields, **kwargs)
+        serializer = self._get_serializer()
+        try:
+            data = [serializer(each) for each in objs]
+        except ma.ValidationError:
+            return super().dump(objs if many else obj, many=many, update_fields=update_fields, **kwargs)
+        result = self._postprocess(data if many else data[0], many, obj=obj)
+        return ma.schema.MarshalResult(result, {})
+
+    def _can_serialize(self, objs):
+        if self.prefix or self.opts.model is None:
+            return False
+        if any(self.__processors__[(tag, pass_many)] for tag in (PRE_DUMP, POST_DUMP) for pass_many in (True, False)):
+            return False
+        model = self.opts.model
+        return all(type(each) is model for each in objs)
+
+    def _get_serializer(self):
+        serializer = getattr(self, '_serializer', None)
+        if serializer is None:
+            serializer = self._serializer = serializers.make_serializer(self)
+        return serializer
 
 
 def register_schema(schema, definition_name=None):
     definition_name = definition_name or re.sub(r'Schema$', '', schema.__name__)
-    spec.definition(definition_name, schema=schema)
+    spec.defer(spec.spec.definition, definition_name, schema=schema)
 
 
 def make_schema(model, class_name=None, fields=None, options=None):
@@ -36,14 +151,15 @@ def make_schema(model, class_name=None, fields=None, options=None):
         )
     )
 
-    return type(
+    schema = type(
         class_name,
         (ModelSchema, ),
         utils.extend({'Meta': Meta}, fields or {}),
     )
+    return schema
 
 
-def make_page_schema(schema, page_type=paging_schemas.OffsetPageSchema, class_name=None,
+def make_page_schema(schema, page_type=OffsetPageSchema, class_name=None,
                      definition_name=None):
     class_name = class_name or '{0}PageSchema'.format(re.sub(r'Schema$', '', schema.__name__))
 
@@ -110,6 +226,11 @@ class CommitteeSearchListSchema(ApiSchema):
     )
 
 
+class BatchSchema(ApiSchema):
+    results = ma.fields.Dict()
+
+
+register_schema(BatchSchema)
 register_schema(CandidateSearchSchema)
 register_schema(CandidateSearchListSchema)
 register_schema(CommitteeSearchSchema)
@@ -232,7 +353,7 @@ ScheduleASchema = make_schema(
         ),
     }
 )
-ScheduleAPageSchema = make_page_schema(ScheduleASchema, page_type=paging_schemas.SeekPageSchema)
+ScheduleAPageSchema = make_page_schema(ScheduleASchema, page_type=SeekPageSchema)
 register_schema(ScheduleASchema)
 register_schema(ScheduleAPageSchema)
 
@@ -295,7 +416,7 @@ ScheduleBSchema = make_schema(
         ),
     }
 )
-ScheduleBPageSchema = make_page_schema(ScheduleBSchema, page_type=paging_schemas.SeekPageSchema)
+ScheduleBPageSchema = make_page_schema(ScheduleBSchema, page_type=SeekPageSchema)
 register_schema(ScheduleBSchema)
 register_schema(ScheduleBPageSchema)
 
@@ -318,7 +439,7 @@ ScheduleESchema = make_schema(
         ),
     }
 )
-ScheduleEPageSchema = make_page_schema(ScheduleESchema, page_type=paging_schemas.SeekPageSchema)
+ScheduleEPageSchema = make_page_schema(ScheduleESchema, page_type=SeekPageSchema)
 register_schema(ScheduleESchema)
 register_schema(ScheduleEPageSchema)
 
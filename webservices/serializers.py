@@ -0,0 +1,105 @@
+"""Generated serializers for model schemas.
+
+Dumping a page of results through marshmallow dispatches through
+`Marshaller`, `Field.serialize`, and `utils.get_value` for every field of
+every row. For schemas generated from models, most fields read a mapped column
+and format it with the field's `_serialize`, so we generate a function per
+schema that does exactly that, and defer to `Field.serialize` for everything
+else (nested, related, and computed fields). Output is identical to
+`Schema.dump`; see `tests/test_serializers.py`.
+"""
+
+import keyword
+import threading
+
+import sqlalchemy as sa
+from marshmallow import fields
+from marshmallow.utils import missing
+
+
+_factories = {}
+_lock = threading.Lock()
+
+
+def is_simple(field, attribute, columns):
+    """Check whether `field` can be serialized by calling `_serialize` on the
+    mapped column `attribute` directly.
+    """
+    return all([
+        attribute in columns,
+        getattr(field, '_CHECK_ATTRIBUTE', True),
+        type(field).serialize in (fields.Field.serialize, fields.Number.serialize),
+        not getattr(field, 'as_string', False),
+    ])
+
+
+def _getter(attribute):
+    if attribute.isidentifier() and not keyword.iskeyword(attribute):
+        return 'obj.{0}'.format(attribute)
+    return 'getattr(obj, {0!r})'.format(attribute)
+
+
+def generate(spec):
+    """Generate source for a serializer factory.
+
+    :param tuple spec: Tuples of (key, attribute, simple) in output order
+    """
+    lines = ['def factory(simple, other, accessor, dict_class, missing):']
+    simple_count = sum(1 for _, _, is_simple_field in spec if is_simple_field)
+    other_count = len(spec) - simple_count
+    if simple_count:
+        lines.append('    {0}, = simple'.format(', '.join('s{0}'.format(idx) for idx in range(simple_count))))
+    if other_count:
+        lines.append('    {0}, = other'.format(', '.join('o{0}'.format(idx) for idx in range(other_count))))
+    lines.append('    def serialize(obj):')
+    lines.append('        items = [')
+    simple_idx, other_idx = 0, 0
+    for key, attribute, is_simple_field in spec:
+        if is_simple_field:
+            lines.append('            ({0!r}, s{1}({2}, {0!r}, obj)),'.format(key, simple_idx, _getter(attribute)))
+            simple_idx += 1
+        else:
+            lines.append('            ({0!r}, o{1}.serialize({0!r}, obj, accessor=accessor)),'.format(key, other_idx))
+            other_idx += 1
+    lines.append('        ]')
+    if other_count:
+        lines.append('        return dict_class(item for item in items if item[1] is not missing)')
+    else:
+        lines.append('        return dict_class(items)')
+    lines.append('    return serialize')
+    return '\n'.join(lines) + '\n'
+
+
+def compile_factory(spec):
+    factory = _factories.get(spec)
+    if factory is None:
+        namespace = {}
+        exec(compile(generate(spec), '<serializer>', 'exec'), namespace)
+        factory = namespace['factory']
+        with _lock:
+            if len(_factories) > 1024:
+                _factories.clear()
+            _factories[spec] = factory
+    return factory
+
+
+def make_spec(schema):
+    """Describe the fields of a bound schema instance for code generation."""
+    columns = set(prop.key for prop in sa.inspect(schema.opts.model).column_attrs)
+    return tuple(
+        (key, field.attribute or key, is_simple(field, field.attribute or key, columns))
+        for key, field in schema.fields.items()
+        if not getattr(field, 'load_only', False)
+    )
+
+
+def make_serializer(schema):
+    """Build a function that serializes a single model instance as `schema`
+    would, using the fields bound to `schema`.
+    """
+    spec = make_spec(schema)
+    factory = compile_factory(spec)
+    fields = [schema.fields[key] for key, _, _ in spec]
+    simple = tuple(field._serialize for field, (_, _, flag) in zip(fields, spec) if flag)
+    other = tuple(field for field, (_, _, flag) in zip(fields, spec) if not flag)
+    return factory(simple, other, schema.get_attribute, schema.dict_class, missing)
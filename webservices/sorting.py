@@ -68,3 +68,34 @@ def sort(query, options, model, join_columns=None, clear=False, hide_null=False,
             query = query.filter(column != None)  # noqa
         columns.append((column, order))
     return query, columns
+
+
+def _after(column, order, value, nulls_large):
+    """Build a condition matching rows that sort after `value` on `column`."""
+    nulls_last = nulls_large ^ (order is sa.desc)
+    if value is None:
+        return column != None if not nulls_last else sa.false()  # noqa
+    clause = column > value if order is sa.asc else column < value
+    return sa.or_(clause, column == None) if nulls_last else clause  # noqa
+
+
+def _equal(column, value):
+    return column == None if value is None else column == value  # noqa
+
+
+def seek(query, columns, values, nulls_large=True):
+    """Restrict a sorted query to rows following the row with sort key `values`,
+    for keyset pagination over multiple columns. Nulls are treated as large or
+    small as in `sort`.
+
+    :param query: Query sorted on `columns`
+    :param columns: List of (column, order) pairs as returned by `sort`
+    :param values: Sort key values of the last row on the previous page
+    :param nulls_large: Treat null values as large on sorted column(s)
+    """
+    clauses = []
+    for index, (column, order) in enumerate(columns):
+        conditions = [_equal(prefix, value) for (prefix, _), value in zip(columns[:index], values)]
+        conditions.append(_after(column, order, values[index], nulls_large))
+        clauses.append(sa.and_(*conditions))
+    return query.filter(sa.or_(*clauses))
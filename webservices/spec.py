@@ -1,3 +1,5 @@
+import threading
+
 from apispec import APISpec
 
 from webservices import docs
@@ -66,3 +68,23 @@ spec = APISpec(
         },
     ]
 )
+
+
+# Registrations queued until the spec is first requested; building the spec
+# converts every schema and resource, which is too slow to do at import
+_deferred = []
+_lock = threading.Lock()
+
+
+def defer(func, *args, **kwargs):
+    """Queue `func(*args, **kwargs)` to run when the spec is built."""
+    _deferred.append((func, args, kwargs))
+
+
+def build():
+    """Run any queued registrations, in order, and return the spec."""
+    with _lock:
+        while _deferred:
+            func, args, kwargs = _deferred.pop(0)
+            func(*args, **kwargs)
+    return spec
@@ -1,5 +1,7 @@
 import os
 import re
+import math
+import datetime
 import functools
 
 import six
@@ -7,24 +9,107 @@ import sqlalchemy as sa
 from sqlalchemy.orm import foreign
 from sqlalchemy.ext.declarative import declared_attr
 
+import flask
+from werkzeug.http import http_date, quote_etag
+from werkzeug.wrappers import Response as ResponseBase
 from flask.ext import restful
+from flask.ext.restful.utils import unpack
 from marshmallow_pagination import paginators
 
 from webargs import fields
+from webargs import flaskparser
+from flask_apispec import utils as apispec_utils
 from flask_apispec import use_kwargs as use_kwargs_original
 from flask_apispec.views import MethodResourceMeta
 
 from webservices import docs
+from webservices import cursors
 from webservices import sorting
 from webservices import decoders
 from webservices import exceptions
+from webservices.common import cache
+from webservices.common import ranking
+from webservices.common import util
+from webservices.common import exports
 
 
 use_kwargs = functools.partial(use_kwargs_original, locations=('query', ))
 
 
 class Resource(six.with_metaclass(MethodResourceMeta, restful.Resource)):
-    pass
+    """Base resource. Successful `GET` responses carry an `ETag` and
+    `Last-Modified` derived from the refresh generation, and are cached on the
+    request path and parsed arguments until the next data refresh; see
+    `webservices.common.cache`. Conditional requests that match the current
+    generation get a `304` without touching the database.
+    """
+
+    uncached_args = ('api_key', )
+
+    def dispatch_request(self, *args, **kwargs):
+        if flask.request.method != 'GET':
+            return super().dispatch_request(*args, **kwargs)
+        generation = cache.current_generation()
+        if generation is None:
+            return super().dispatch_request(*args, **kwargs)
+        key = self.cache_key(generation)
+        headers = validator_headers(key, generation)
+        if not_modified(key, generation):
+            return flask.Response(status=304, headers=headers)
+        use_cache = flask.current_app.config.get('RESPONSE_CACHE_ENABLED')
+        data = cache.responses.get(key) if use_cache else None
+        if data is None:
+            resp = super().dispatch_request(*args, **kwargs)
+            if isinstance(resp, ResponseBase):
+                return resp
+            data, code, extra = unpack(resp)
+            if code != 200 or extra:
+                return resp
+            if use_cache and not isinstance(data, util.StreamingJson):
+                cache.responses.set(key, data)
+        return data, 200, headers
+
+    def cache_key(self, generation):
+        parsed = {
+            key: value
+            for key, value in parse_kwargs(self, self.get).items()
+            if key not in self.uncached_args
+        }
+        return cache.make_key(generation.number, flask.request.path, parsed)
+
+
+def validator_headers(key, generation):
+    return {
+        'ETag': quote_etag(key),
+        'Last-Modified': http_date(generation.refreshed_at),
+    }
+
+
+def not_modified(key, generation):
+    """Evaluate conditional request headers against the current generation.
+    As in RFC 7232, `If-Modified-Since` is ignored when `If-None-Match` is sent.
+    """
+    request = flask.request
+    if request.if_none_match:
+        return request.if_none_match.contains(key) or request.if_none_match.star_tag
+    since = request.if_modified_since
+    if since is not None:
+        refreshed = generation.refreshed_at.astimezone(datetime.timezone.utc)
+        return refreshed.replace(tzinfo=None, microsecond=0) <= since.replace(tzinfo=None)
+    return False
+
+
+def parse_kwargs(resource, method):
+    """Parse request arguments declared on `method` using `use_kwargs`, as
+    `flask_apispec` does before calling the view.
+    """
+    parser = flask.current_app.config.get('APISPEC_WEBARGS_PARSER', flaskparser.parser)
+    annotation = apispec_utils.resolve_annotations(method, 'args', resource)
+    parsed = {}
+    for option in annotation.options:
+        schema = apispec_utils.resolve_instance(option['args'])
+        parsed.update(parser.parse(schema, locations=option['kwargs']['locations']))
+    return parsed
 
 API_KEY_ARG = fields.Str(
     required=True,
@@ -44,20 +129,168 @@ def check_cap(kwargs, cap):
             )
 
 
+def requested_fields(values):
+    """Get the set of result fields named in `values`, the parsed `fields`
+    argument, or `None` if all fields should be returned.
+    """
+    names = set(
+        name.strip()
+        for value in values or ()
+        for name in value.split(',')
+        if name.strip()
+    )
+    return names or None
+
+
+def sparse_page(page, names):
+    """Record the requested field `names` on `page`, so that page schemas
+    restrict results to those fields; see `schemas.SparsePageSchema`.
+    """
+    page.fields = names
+    return page
+
+
+def _option_key(option):
+    path = getattr(option, 'path', None)
+    if not path:
+        return None
+    return getattr(path[0], 'key', path[0])
+
+
+def filter_options(options, names):
+    """Drop loader options such as `joinedload` for relationships that are not
+    in the requested field `names`.
+    """
+    if names is None:
+        return options
+    return [
+        option for option in options
+        if _option_key(option) is None or _option_key(option) in names
+    ]
+
+
+def load_fields(query, model, names, extra=()):
+    """Restrict the columns loaded for `model` to the requested field `names`,
+    plus `extra` column names. Columns are not restricted if any requested
+    field is not a column or relationship, since computed fields may depend on
+    any column.
+    """
+    if names is None or model is None:
+        return query
+    mapper = sa.inspect(model)
+    columns = set(prop.key for prop in mapper.column_attrs)
+    relationships = set(prop.key for prop in mapper.relationships)
+    if not names <= columns | relationships:
+        return query
+    primary_keys = set(mapper.get_property_by_column(column).key for column in mapper.primary_key)
+    load = (names & columns) | (set(extra) & columns) | primary_keys
+    return query.options(sa.orm.load_only(*sorted(load)))
+
+
 def fetch_page(query, kwargs, model=None, join_columns=None, clear=False, count=None, cap=100):
+    """Fetch a page of results. If `cap` is falsy and `per_page` is 0, return a
+    `StreamingPage` over all results instead.
+    """
     check_cap(kwargs, cap)
+    if kwargs.get('cursor') is not None:
+        return fetch_cursor_page(query, kwargs, model=model, join_columns=join_columns, clear=clear, count=count)
+    names = requested_fields(kwargs.get('fields'))
     sort, hide_null, nulls_large = kwargs.get('sort'), kwargs.get('sort_hide_null'), kwargs.get('sort_nulls_large')
-    query, _ = sorting.sort(query, sort, model=model, join_columns=join_columns, clear=clear, hide_null=hide_null, nulls_large=nulls_large)
+    query, _ = sorting.sort(query, sort, model=model, join_columns=join_columns, clear=clear,
+                            hide_null=hide_null, nulls_large=nulls_large)
+    query = load_fields(query, model, names)
+    if not cap and not kwargs.get('per_page'):
+        return sparse_page(StreamingPage(query), names)
     paginator = paginators.OffsetPaginator(query, kwargs['per_page'], count=count)
-    return paginator.get_page(kwargs['page'])
+    return sparse_page(paginator.get_page(kwargs['page']), names)
+
+
+class CursorPage(object):
+    """Page of results fetched by `fetch_cursor_page`, exposing the same
+    `results` and `info` attributes as pages from `marshmallow_pagination`.
+    """
+    def __init__(self, results, info):
+        self.results = results
+        self.info = info
+
+    def __getitem__(self, index):
+        return self.results[index]
+
+    def __len__(self):
+        return len(self.results)
+
+
+class StreamingPage(object):
+    """All results of a query, fetched lazily through a server-side cursor.
+    Page schemas serialize streaming pages incrementally; see
+    `schemas.SparsePageSchema`.
+    """
+    def __init__(self, query):
+        self.query = query
+
+    def __iter__(self):
+        return iter(exports.stream_query(self.query))
+
+
+def fetch_cursor_page(query, kwargs, model=None, join_columns=None, clear=False, count=None):
+    """Fetch a page of results following `kwargs['cursor']` using keyset
+    pagination on the requested sort columns, with the primary key of `model`
+    as a tiebreaker. An empty cursor fetches the first page.
+    """
+    sort, hide_null, nulls_large = kwargs.get('sort'), kwargs.get('sort_hide_null'), kwargs.get('sort_nulls_large')
+    options = sorting.ensure_list(sort)
+    joined = set(option.lstrip('-') for option in options) & set(join_columns or {})
+    if model is None or (query._order_by and not clear) or joined:
+        raise exceptions.ApiError(
+            'Parameter "cursor" is not supported for this query',
+            status_code=422,
+        )
+    nulls_large = True if nulls_large is None else nulls_large
+    query, columns = sorting.sort(query, options, model=model, clear=clear,
+                                  hide_null=hide_null, nulls_large=nulls_large)
+    sorted_keys = set(column.key for column, _ in columns)
+    mapper = sa.inspect(model)
+    for primary_key in mapper.primary_key:
+        key = mapper.get_property_by_column(primary_key).key
+        if key not in sorted_keys:
+            column = getattr(model, key)
+            query = query.order_by(column)
+            columns.append((column, sa.asc))
+    if count is None:
+        count = query.order_by(None).count()
+    names = requested_fields(kwargs.get('fields'))
+    query = load_fields(query, model, names, extra=[column.key for column, _ in columns])
+    if kwargs['cursor']:
+        values = cursors.decode(kwargs['cursor'], kwargs, length=len(columns))
+        query = sorting.seek(query, columns, values, nulls_large=nulls_large)
+    per_page = kwargs['per_page']
+    results = query.limit(per_page + 1).all()
+    info = {
+        'count': count,
+        'pages': int(math.ceil(count / per_page)),
+        'per_page': per_page,
+        'next_cursor': None,
+    }
+    if len(results) > per_page:
+        results = results[:per_page]
+        info['next_cursor'] = cursors.encode([getattr(results[-1], column.key) for column, _ in columns], kwargs)
+    return sparse_page(CursorPage(results, info), names)
 
 
 def fetch_seek_page(query, kwargs, index_column, clear=False, count=None, cap=100, eager=True):
+    """Fetch a page of results following the cursor in `kwargs['cursor']`,
+    or following `last_index` and `last_<sort column>` if no cursor is given.
+    Eagerly fetched pages include `next_cursor` in their pagination info.
+    """
     check_cap(kwargs, cap)
     model = index_column.class_
     sort, hide_null, nulls_large = kwargs['sort'], kwargs['sort_hide_null'], kwargs['sort_nulls_large']
     query, sort_columns = sorting.sort(query, sort, model=model, clear=clear, hide_null=hide_null, nulls_large=nulls_large)
     sort_column = sort_columns[0] if sort_columns else None
+    names = requested_fields(kwargs.get('fields'))
+    if eager:
+        extra = [index_column.key] + ([sort_column[0].key] if sort_column is not None else [])
+        query = load_fields(query, model, names, extra=extra)
     paginator = paginators.SeekPaginator(
         query,
         kwargs['per_page'],
@@ -65,11 +298,26 @@ def fetch_seek_page(query, kwargs, index_column, clear=False, count=None, cap=10
         sort_column=sort_column,
         count=count,
     )
-    if sort_column is not None:
-        sort_index = kwargs['last_{0}'.format(sort_column[0].key)]
+    if kwargs.get('cursor'):
+        sort_index, last_index = cursors.decode(kwargs['cursor'], kwargs, length=2)
     else:
-        sort_index = None
-    return paginator.get_page(last_index=kwargs['last_index'], sort_index=sort_index, eager=eager)
+        last_index = kwargs['last_index']
+        sort_index = kwargs['last_{0}'.format(sort_column[0].key)] if sort_column is not None else None
+    page = paginator.get_page(last_index=last_index, sort_index=sort_index, eager=eager)
+    if not eager:
+        return page
+    results = list(page.results)
+    next_cursor = None
+    if results and len(results) >= kwargs['per_page']:
+        last = results[-1]
+        next_cursor = cursors.encode(
+            [
+                getattr(last, sort_column[0].key) if sort_column is not None else None,
+                getattr(last, index_column.key),
+            ],
+            kwargs,
+        )
+    return sparse_page(CursorPage(results, extend(page.info, {'next_cursor': next_cursor})), names)
 
 
 def extend(*dicts):
@@ -79,14 +327,23 @@ def extend(*dicts):
     return ret
 
 
+SEARCH_CANDIDATES = int(os.getenv('FEC_SEARCH_CANDIDATES', 500))
+
+
+def make_tsquery_text(text):
+    """Build `to_tsquery` input matching all terms in `text`, with the last
+    term matched as a prefix.
+    """
+    return sa.func.concat(' & '.join(text.split()), ':*')
+
+
 def search_text(query, column, text, order=True):
     """
 
     :param order: Order results by text similarity, descending; prohibitively
         slow for large collections
     """
-    vector = ' & '.join(text.split())
-    vector = sa.func.concat(vector, ':*')
+    vector = make_tsquery_text(text)
     query = query.filter(column.match(vector))
     if order:
         query = query.order_by(
@@ -100,6 +357,67 @@ def search_text(query, column, text, order=True):
     return query
 
 
+def search_text_ranked(query, column, search_model, text, candidates=SEARCH_CANDIDATES):
+    """Two-phase alternative to `search_text(order=True)` for a fulltext view.
+    Restrict `query` to rows whose `search_model` row matches `text`, then
+    fetch the `candidates` matches with the highest `receipts`, rank them by
+    text similarity in Python, and order them first by rank. The remaining
+    matches follow in order of receipts, so that rank is never computed for
+    the full set of matches. Apply any other filters to `query` first, so that
+    candidates are drawn from the filtered matches.
+
+    :param column: Column of `query` matching `search_model.id`
+    """
+    vector = make_tsquery_text(text)
+    query = query.join(
+        search_model,
+        search_model.id == column,
+    ).filter(
+        search_model.fulltxt.match(vector),
+    )
+    rows = query.with_entities(
+        search_model.id,
+        sa.cast(search_model.fulltxt, sa.Text),
+        sa.cast(sa.func.to_tsquery(vector), sa.Text),
+    ).order_by(
+        None,
+    ).order_by(
+        sa.desc(search_model.receipts).nullslast(),
+    ).limit(candidates).all()
+    if not rows:
+        return query
+    items = ranking.parse_query(rows[0][2])
+    ranked = [
+        (row_id, ranking.rank_items(ranking.parse_vector(fulltxt), items))
+        for row_id, fulltxt, _ in rows
+    ]
+    # Sorting is stable, so rows with equal ranks stay in order of receipts
+    ranked.sort(key=lambda pair: -pair[1])
+    return query.order_by(
+        sa.case(
+            {row_id: idx for idx, (row_id, _) in enumerate(ranked)},
+            value=search_model.id,
+            else_=len(ranked),
+        ),
+        sa.desc(search_model.receipts).nullslast(),
+    )
+
+
+def search_name(query, column, text, fuzzy=False):
+    """Filter `query` to rows where `column` contains `text`; both forms of
+    match are served by trigram indexes.
+
+    :param fuzzy: Also match misspellings of `text` by trigram similarity, and
+        order results by similarity, descending
+    """
+    pattern = '%{}%'.format(text)
+    if not fuzzy:
+        return query.filter(column.ilike(pattern))
+    # The pg_trgm similarity operator `%`, doubled for psycopg2
+    query = query.filter(sa.or_(column.ilike(pattern), column.op('%%')(text)))
+    return query.order_by(sa.desc(sa.func.similarity(column, text)))
+
+
 office_args_required = ['office', 'cycle']
 office_args_map = {
     'house': ['state', 'district'],